@@ -2,18 +2,30 @@
 from __future__ import annotations
 
 import os
+import json
 import time
-from typing import Optional, Dict, List, Any
+import asyncio
+from typing import Optional, Dict, AsyncIterator, List, Any
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, EmailStr
 from supabase import create_client, Client
 
+from apps.backend.api.deps.auth import get_bearer_token
+from apps.backend.lib.supabase import get_sb, as_user
 from apps.backend.services.matcher import (
-    rank_posts_for_seeker,
+    arank_posts_for_seeker,
+    aiter_rank_posts_for_seeker,
+    rank_seekers_for_post,
     get_seeker_id_by_email,
+    STAGE_FINAL,
 )
-from apps.backend.services.data_storer import persist_matcher_results
+from apps.backend.services.persist_queue import enqueue_matcher_results
+from apps.backend.services.materializer import read_cached_matches
+from apps.backend.services import seeker_snapshot, aio
+from apps.backend.services.post_filters import normalize_filters, SENIORITY_LEVELS
+from apps.backend.services.seeker_snapshot import SeekerSnapshot
 
 # ✅ Import the actual functions your embed_worker.py exposes
 try:
@@ -44,28 +56,17 @@ _sb: Client = create_client(_SUPABASE_URL, _SUPABASE_KEY)
 # --------------------------------------------------------------------
 _ALLOWED_REASONS = {"insert", "update", "manual"}  # Fixed: removed 'backfill'
 
-def _fetch_seeker_row(job_seeker_id: str) -> Optional[dict]:
-    try:
-        resp = (
-            _sb.table("job_seeker")
-            .select("pinecone_id, embedding_checksum, search_document")
-            .eq("job_seeker_id", job_seeker_id)
-            .limit(1)
-            .execute()
-        )
-        rows = resp.data or []
-        return rows[0] if rows else None
-    except Exception as e:
-        print(f"[WARN] _fetch_seeker_row failed: {e}")
-        return None
+def _fetch_seeker_row(job_seeker_id: str, refresh: bool = False) -> Optional[dict]:
+    """Seeker row from the request's snapshot (the one job_seeker read shared with the matcher)."""
+    return seeker_snapshot.current_or_new().row(job_seeker_id, refresh=refresh)
 
 def _pick_reason_for_seeker(row: dict) -> str:
     """If pinecone_id or embedding_checksum is missing => 'insert', else 'update'."""
     reason = "insert" if (not row.get("pinecone_id") or not row.get("embedding_checksum")) else "update"
     return reason if reason in _ALLOWED_REASONS else "insert"
 
-def _has_embeddings_for_seeker(job_seeker_id: str) -> bool:
-    row = _fetch_seeker_row(job_seeker_id)
+def _has_embeddings_for_seeker(job_seeker_id: str, refresh: bool = False) -> bool:
+    row = _fetch_seeker_row(job_seeker_id, refresh=refresh)
     if not row:
         return False
     return bool(row.get("pinecone_id")) and bool(row.get("embedding_checksum"))
@@ -142,16 +143,18 @@ def _run_worker_passes(eager_passes: int = 2) -> None:
     except Exception as e:
         print(f"[WARN] _run_worker_passes failed: {e}")
 
-def _poll_until_seeker_embedded(job_seeker_id: str, timeout_s: int = 8, interval_s: float = 0.8) -> bool:
+async def _poll_until_seeker_embedded(job_seeker_id: str, timeout_s: int = 8, interval_s: float = 0.8) -> bool:
     """
     Poll briefly for the just-enqueued seeker to be embedded.
     Returns True if embedded appears; False on timeout.
     """
     deadline = time.time() + max(1, timeout_s)
+    refresh = False  # the first check uses the snapshot row; later ones must re-read
     while time.time() < deadline:
-        if _has_embeddings_for_seeker(job_seeker_id):
+        if await aio.run_io(_has_embeddings_for_seeker, job_seeker_id, refresh):
             return True
-        time.sleep(interval_s)
+        refresh = True
+        await asyncio.sleep(interval_s)
     return False
 
 # ---------------------- Response Schemas ----------------------
@@ -186,10 +189,94 @@ class MatchItem(BaseModel):
         None, description="Required vs seeker skill breakdown and LLM explanations"
     )
 
+class StageReport(BaseModel):
+    budget_ms: Optional[float] = Field(None, description="Latency budget given to the pipeline (ms)")
+    elapsed_ms: Optional[float] = Field(None, description="Time the pipeline took (ms)")
+    ran: List[str] = Field(default_factory=list, description="Stages that ran: materialized, cache, vector, rerank, llm_judge")
+    skipped: List[str] = Field(default_factory=list, description="Stages skipped to fit the budget")
+    failed: List[str] = Field(default_factory=list, description="Stages that ran but failed (results fall back)")
+    rerank_top_k: Optional[int] = Field(None, description="Posts rescored by the cross-encoder")
+    judge_top_k: Optional[int] = Field(None, description="Posts sent to the LLM judge")
+    degraded: bool = Field(False, description="True when the budget shrank or skipped a stage")
+
 class MatchResponse(BaseModel):
     job_seeker_id: str = Field(..., description="Resolved seeker UUID")
     count: int = Field(..., description="Number of posts returned")
     matches: List[MatchItem]
+    stages: Optional[StageReport] = Field(None, description="Which pipeline stages ran for this response")
+
+class CandidateItem(BaseModel):
+    job_seeker_id: str = Field(..., description="UUID of the job seeker")
+    confidence: float = Field(..., ge=0, le=100, description="Final strict score (0..100)")
+    section_scores: SectionScores = Field(..., description="Per-section scores (0..100)")
+    job_seeker: Optional[dict] = Field(
+        None, description="Seeker profile fields (included when include_details=true)"
+    )
+    analysis: Optional[SkillAnalysis] = Field(
+        None, description="Post's required skills vs the seeker's skills"
+    )
+
+class CandidatesResponse(BaseModel):
+    job_post_id: str = Field(..., description="Job post UUID")
+    count: int = Field(..., description="Number of seekers returned")
+    candidates: List[CandidateItem]
+
+def _persist_results(job_seeker_id: str, results: List[Dict[str, Any]], reason: str) -> None:
+    """Queue results for write-behind persistence (the response doesn't wait on the insert)."""
+    try:
+        enqueue_matcher_results(
+            auth_user_id=None,
+            job_seeker_id=job_seeker_id,
+            matcher_results=results,
+            default_weights=None,
+            method=f"rag-llm strict (reason={reason})",
+            model_version="api-endpoint",
+        )
+    except Exception as e:
+        print(f"[WARN] Failed to persist matcher results: {e}")
+
+async def _stream_match_events(
+    job_seeker_id: str,
+    reason: str,
+    top_k: int,
+    include_details: bool,
+    min_sections: int,
+    budget_ms: Optional[float] = None,
+    snapshot: Optional[SeekerSnapshot] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """
+    NDJSON stream: one line per pipeline stage ("vector", "reranked", "final"), each a full
+    MatchResponse plus {"stage", "final"}. Clients render the first event and replace it in place.
+    Results are persisted once, after the final stage (unfiltered requests only: a filtered
+    ranking isn't the seeker's match snapshot). Failures are emitted as {"stage": "error"}.
+    The final event carries the stage report. The generator runs after the endpoint returns,
+    so the request's seeker snapshot is handed over explicitly.
+    """
+    report: Dict[str, Any] = {}
+    try:
+        async for stage, results in aiter_rank_posts_for_seeker(
+            job_seeker_id=job_seeker_id,
+            top_k_per_section=top_k,
+            include_job_details=include_details,
+            min_sections=min_sections,
+            budget_ms=budget_ms,
+            stage_report=report,
+            snapshot=snapshot,
+            filters=filters,
+        ):
+            is_final = stage == STAGE_FINAL
+            if is_final and not filters:
+                await aio.run_io(_persist_results, job_seeker_id, results, reason)
+            body = MatchResponse(
+                job_seeker_id=job_seeker_id,
+                count=len(results),
+                matches=[MatchItem.model_validate(r) for r in results],
+                stages=StageReport.model_validate(report) if is_final else None,
+            ).model_dump(mode="json")
+            yield json.dumps({"stage": stage, "final": is_final, **body}, ensure_ascii=False) + "\n"
+    except Exception as e:
+        yield json.dumps({"stage": "error", "final": True, "detail": str(e)}) + "\n"
 
 # ---------------------- Endpoint ----------------------
 @router.get(
@@ -199,10 +286,16 @@ class MatchResponse(BaseModel):
     description=(
         "Retrieves candidate job posts from Pinecone (per-section vectors) and scores them "
         "with an LLM using retrieved context (RAG). The final score is a strict, section-driven "
-        "weighted mean with harsh penalties for experience and required-skill gaps."
+        "weighted mean with harsh penalties for experience and required-skill gaps. "
+        "With stream=true the response is NDJSON (application/x-ndjson): one MatchResponse per "
+        "stage tagged with \"stage\" (vector → reranked → final). "
+        "With budget_ms the reranker window and LLM judge are shrunk or skipped to answer within the "
+        "budget; the response's \"stages\" field reports what ran. "
+        "location / seniority / posted_within_days filter posts inside the vector "
+        "query, before scoring; filtered results are not persisted as the seeker's match snapshot."
     ),
 )
-def match_seeker_to_jobs(
+async def match_seeker_to_jobs(
     job_seeker_id: Optional[str] = Query(
         None, description="UUID of the job seeker (leave empty if using email)"
     ),
@@ -234,6 +327,44 @@ def match_seeker_to_jobs(
         description="If true, run a few quick embed-worker passes after enqueueing (best-effort).",
         example=True,
     ),
+    stream: bool = Query(
+        False,
+        description="If true, stream NDJSON events per stage (vector, reranked, final) instead of one response.",
+        example=False,
+    ),
+    prefer_cached: bool = Query(
+        False,
+        description=(
+            "If true, return materialized matches from job_match_scores_cache when they are newer than the "
+            "seeker's profile (no retrieval/LLM); falls back to the live pipeline otherwise."
+        ),
+        example=False,
+    ),
+    budget_ms: Optional[int] = Query(
+        None,
+        ge=100, le=120000,
+        description=(
+            "Latency budget for the whole request (ms). Stages are sized from observed latencies to fit: "
+            "the rerank window and judge top-K shrink, or the judge is skipped. Omit for the full pipeline."
+        ),
+        example=3000,
+    ),
+    location: Optional[str] = Query(
+        None,
+        description=(
+            "Only posts in any of these places (comma-separated). Matched by place name per location "
+            "part, ignoring case and City/Province/Metro qualifiers: Makati = Makati City, Manila = Metro Manila"
+        ),
+        example="Makati City, Remote",
+    ),
+    seniority: Optional[str] = Query(
+        None,
+        description=f"Only posts at any of these levels (comma-separated: {', '.join(SENIORITY_LEVELS)})",
+        example="junior,mid",
+    ),
+    posted_within_days: Optional[int] = Query(
+        None, ge=1, le=3650, description="Only posts posted within the last N days", example=30,
+    ),
 ):
     """
     Flow:
@@ -241,54 +372,168 @@ def match_seeker_to_jobs(
       2) Enqueue seeker + any stale posts (with a valid NOT-NULL 'reason').
       3) (Optional) Run 1–2 quick worker passes and briefly poll for the seeker's embeddings.
       4) Run strict matcher (vectors + LLM sections), then apply harsh penalties with uniform rescale.
+         With stream=true, each stage's ranking is sent as soon as it is ready.
+    Runs on the event loop: Supabase/Pinecone calls (and the eager embed-worker passes) go to the
+    I/O executor, reranker inference to the CPU executor, and the LLM judge is awaited on async clients.
     """
-    # 1) Resolve seeker id
-    if email and not job_seeker_id:
-        job_seeker_id = get_seeker_id_by_email(str(email))
+    t_request = time.perf_counter()
+    try:
+        filters = normalize_filters(location, seniority, posted_within_days)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    def _budget_left() -> Optional[float]:
+        if budget_ms is None:
+            return None
+        return max(0.0, budget_ms - (time.perf_counter() - t_request) * 1000.0)
+
+    # One job_seeker read for the whole request: id/email lookup, enqueue checks, matcher stages
+    with seeker_snapshot.scope() as snap:
+        # 1) Resolve seeker id
+        if email and not job_seeker_id:
+            job_seeker_id = await aio.run_io(get_seeker_id_by_email, str(email))
+            if not job_seeker_id:
+                raise HTTPException(status_code=404, detail=f"No job_seeker found for email {email}")
+
         if not job_seeker_id:
-            raise HTTPException(status_code=404, detail=f"No job_seeker found for email {email}")
+            raise HTTPException(status_code=400, detail="Provide job_seeker_id or email")
 
-    if not job_seeker_id:
-        raise HTTPException(status_code=400, detail="Provide job_seeker_id or email")
+        # Cheap read of materialized matches (written by the batch job / post-upsert materializer)
+        if prefer_cached and not stream and not filters:
+            cached = await aio.run_io(read_cached_matches, job_seeker_id, include_job_details=include_details)
+            if cached:
+                return MatchResponse(
+                    job_seeker_id=job_seeker_id,
+                    count=len(cached),
+                    matches=[MatchItem.model_validate(r) for r in cached],
+                    stages=StageReport(ran=["materialized"]),
+                )
 
-    # 2) Enqueue
-    reason = _ensure_seeker_enqueued(job_seeker_id)
-    _enqueue_stale_posts_if_any()
+        # 2) Enqueue
+        reason, _ = await asyncio.gather(
+            aio.run_io(_ensure_seeker_enqueued, job_seeker_id),
+            aio.run_io(_enqueue_stale_posts_if_any),
+        )
 
-    # 3) Eager embed (best-effort)
-    if eager_embed:
+        # 3) Eager embed (best-effort)
+        if eager_embed:
+            try:
+                # Mostly Supabase/Pinecone round-trips: the I/O executor, so concurrent requests don't
+                # queue on (or block the cross-encoder in) the small CPU executor
+                await aio.run_io(_run_worker_passes, eager_passes=2)
+                left = _budget_left()
+                # Under a budget, spend at most half of what is left waiting for the embedding
+                poll_s = 8 if left is None else min(8, left / 2000.0)
+                _ = await _poll_until_seeker_embedded(job_seeker_id, timeout_s=poll_s, interval_s=0.8)
+            except Exception as e:
+                print(f"[WARN] eager embed pipeline failed (non-fatal): {e}")
+
+        # 4) Run matcher
+        if stream:
+            return StreamingResponse(
+                _stream_match_events(
+                    job_seeker_id, reason, top_k, include_details, min_sections, _budget_left(), snap, filters
+                ),
+                media_type="application/x-ndjson",
+            )
+
+        report: Dict[str, Any] = {}
         try:
-            _run_worker_passes(eager_passes=2)
-            _ = _poll_until_seeker_embedded(job_seeker_id, timeout_s=8, interval_s=0.8)
+            results: List[Dict[str, Any]] = await arank_posts_for_seeker(
+                job_seeker_id=job_seeker_id,
+                top_k_per_section=top_k,
+                include_job_details=include_details,
+                min_sections=min_sections,
+                budget_ms=_budget_left(),
+                stage_report=report,
+                snapshot=snap,
+                filters=filters,
+            )
         except Exception as e:
-            print(f"[WARN] eager embed pipeline failed (non-fatal): {e}")
+            raise HTTPException(status_code=500, detail=str(e))
 
-    # 4) Run matcher
-    try:
-        results: List[Dict[str, Any]] = rank_posts_for_seeker(
+        if not filters:
+            await aio.run_io(_persist_results, job_seeker_id, results, reason)
+
+        return MatchResponse(
             job_seeker_id=job_seeker_id,
-            top_k_per_section=top_k,
-            include_job_details=include_details,
-            min_sections=min_sections,
+            count=len(results),
+            matches=[MatchItem.model_validate(r) for r in results],
+            stages=StageReport.model_validate(report),
         )
+
+def _caller_owns_post(user_jwt: str, job_post_id: str) -> bool:
+    """True when the JWT's user is the employer of the job post (checked on an RLS-scoped client)."""
+    c = as_user(get_sb(), user_jwt)
+    try:
+        user = c.auth.get_user(user_jwt)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid bearer token")
+    uid = getattr(getattr(user, "user", None), "id", None)
+    if not uid:
+        raise HTTPException(status_code=401, detail="Invalid bearer token")
+    res = (
+        c.table("job_post")
+        .select("job_post_id, employer!inner(auth_user_id)")
+        .eq("job_post_id", job_post_id)
+        .eq("employer.auth_user_id", uid)
+        .limit(1)
+        .execute()
+    )
+    return bool(res.data)
+
+@router.get(
+    "/match/candidates",
+    response_model=CandidatesResponse,
+    summary="Rank Seekers For Job Post",
+    description=(
+        "Employer view: uses the job post's per-section vectors to retrieve seekers from Pinecone, "
+        "then applies the same strict aggregation, reranker and harsh penalties as /match with roles "
+        "swapped. Cached per post embedding checksum until seekers are re-embedded. "
+        "Only the employer who owns the job post may call it."
+    ),
+    responses={
+        401: {"description": "Missing/invalid bearer token"},
+        404: {"description": "Job post not found or not owned by the caller"},
+    },
+)
+async def rank_candidates_for_post(
+    job_post_id: str = Query(..., description="UUID of the job post"),
+    top_k: int = Query(
+        20, ge=1, le=200, description="Top K per section to retrieve from Pinecone", example=20
+    ),
+    include_details: bool = Query(
+        False, description="If true, attach seeker profile fields to each candidate", example=False
+    ),
+    min_sections: int = Query(
+        2, ge=1, le=4,
+        description="Require at least N sections to contribute to a seeker's score",
+        example=2,
+    ),
+    user_jwt: str = Depends(get_bearer_token),
+):
+    try:
+        owned = await aio.run_io(_caller_owns_post, user_jwt, job_post_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if not owned:
+        raise HTTPException(status_code=404, detail=f"No job_post {job_post_id} owned by the caller")
 
-    # Persist results to Supabase (optional; matcher also persists)
     try:
-        persist_matcher_results(
-            auth_user_id=None,
-            job_seeker_id=job_seeker_id,
-            matcher_results=results,
-            default_weights=None,
-            method=f"rag-llm strict (reason={reason})",
-            model_version="api-endpoint",
+        results = await aio.run_io(
+            rank_seekers_for_post,
+            job_post_id=job_post_id,
+            top_k_per_section=top_k,
+            include_seeker_details=include_details,
+            min_sections=min_sections,
         )
     except Exception as e:
-        print(f"[WARN] Failed to persist matcher results: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-    return MatchResponse(
-        job_seeker_id=job_seeker_id,
+    return CandidatesResponse(
+        job_post_id=job_post_id,
         count=len(results),
-        matches=[MatchItem.model_validate(r) for r in results],
+        candidates=[CandidateItem.model_validate(r) for r in results],
     )
@@ -12,7 +12,7 @@ from pydantic import (
 )
 from typing import Optional, Dict, Any, List
 
-from apps.backend.services.orchestrator import orchestrate_user_update
+from apps.backend.services.orchestrator import aorchestrate_user_update
 
 router = APIRouter()
 
@@ -309,13 +309,13 @@ class OrchestratorResponse(BaseModel):
         "The weights object may include an eta_summary array for unfinished milestones."
     ),
 )
-def run_orchestrator(
+async def run_orchestrator(
     email: EmailStr = Query(..., description="Job seeker’s email"),
     role: Optional[str] = Query(None, description="Target role/job title (defaults to seeker.target_role if not provided)"),
     force: bool = Query(False, description="Force refresh regardless of profile/cache state"),
 ) -> OrchestratorResponse:
     try:
-        result = orchestrate_user_update(email=email, role=role, force=force) or {}
+        result = await aorchestrate_user_update(email=email, role=role, force=force) or {}
 
         # Map calculated_at_iso -> calculated_at for schema stability
         ms = result.get("milestone_status") or {}
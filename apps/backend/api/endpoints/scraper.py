@@ -10,11 +10,12 @@ from pydantic import BaseModel, Field
 
 # Local imports from the services module
 from ...services.scraper import (
-    _llm_generate_roadmap,
-    search_sections_for_milestone,
+    _allm_generate_roadmap,
+    asearch_sections_for_milestones,
     CERT_ALLOWED_DOMAINS,
 )
 from ...services.data_storer import persist_scraper_roadmap_with_resources
+from ...services import aio
 
 router = APIRouter()
 
@@ -76,13 +77,13 @@ def _coerce_items(items: list[Any]) -> list[ResourceItem]:
         "The roadmap and milestone resources are also persisted into Supabase."
     ),
 )
-def scrape(
+async def scrape(
     keyword: str = Query(..., description="Target role, e.g. 'software engineer'"),
     max_milestones: int = Query(10, le=10, description="Maximum milestones (hard limit 10)"),
 ) -> ScraperResponse:
     try:
         # 1) Ask LLM for milestones + 3 cert names per milestone
-        roadmap = _llm_generate_roadmap(
+        roadmap = await _allm_generate_roadmap(
             role=keyword,
             max_milestones=max_milestones,
             provider=LLM_PROVIDER,
@@ -110,27 +111,24 @@ def scrape(
                 ]},
             ]
 
-        # 2) For each milestone, fetch sections (dedup globally)
+        # 2) For each milestone, fetch sections (dedup globally; searches run concurrently)
         bundles: list[MilestoneBundle] = []
         used_urls: Set[str] = set()
         used_cert_names: Set[str] = set()
-        milestone_resources: list[tuple] = []
+        wanted = [
+            (
+                (m.get("milestone") or "").strip(),
+                [str(x).strip() for x in (m.get("cert_names") or [])][:3],
+            )
+            for m in roadmap[:max_milestones]
+        ]
+        milestone_resources: list[tuple] = await asearch_sections_for_milestones(
+            wanted, used_urls, used_cert_names, serpapi_key=SERPAPI_KEY
+        )
 
-        for m in roadmap[:max_milestones]:
-            title = (m.get("milestone") or "").strip()
+        for m, (title, _), (resources, certs, groups) in zip(roadmap[:max_milestones], wanted, milestone_resources):
             level = (m.get("level") or "Basic").strip().title()
-            cert_names = [str(x).strip() for x in (m.get("cert_names") or [])][:3]
-
             print(f'\n[milestone] {title}  (Level: {level})')
-            resources, certs, groups = search_sections_for_milestone(
-                milestone_title=title,
-                cert_names=cert_names,
-                used_urls=used_urls,
-                used_cert_names=used_cert_names,
-                serpapi_key=SERPAPI_KEY,
-            )
-
-            milestone_resources.append((resources, certs, groups))
 
             bundles.append(
                 MilestoneBundle(
@@ -143,7 +141,8 @@ def scrape(
             )
 
         # 3) Persist roadmap + resources into Supabase
-        roadmap_id = persist_scraper_roadmap_with_resources(
+        roadmap_id = await aio.run_io(
+            persist_scraper_roadmap_with_resources,
             role=keyword,
             provider=LLM_PROVIDER,
             model=(GEMINI_MODEL if LLM_PROVIDER == "gemini" else OPENAI_MODEL),
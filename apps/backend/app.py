@@ -2,8 +2,10 @@
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 # ---- Load environment variables early (local only) ----
 def _load_local_env_if_present() -> None:
@@ -33,6 +35,7 @@ from apps.backend.api.endpoints import (  # noqa: E402
     orchestrator,
     applications,  # applications API (prefix="/applications")
 )
+from apps.backend.services import warmup, metrics, aio, persist_queue  # noqa: E402
 
 # ---- App config ----
 app = FastAPI(
@@ -59,6 +62,19 @@ app.include_router(orchestrator.router, prefix="/api", tags=["Orchestrator"])
 # Applications API (router already uses prefix="/applications")
 app.include_router(applications.router)
 
+# ---- Startup prewarm ----
+# Load models, open Pinecone/Supabase connections and run a dummy inference in the background,
+# so the first real request after a deploy/scale-up isn't the one paying for it.
+@app.on_event("startup")
+def _prewarm() -> None:
+    warmup.start_background()
+
+# Flush queued match snapshots, then close the shared async HTTP clients and executors
+@app.on_event("shutdown")
+async def _close_async_clients() -> None:
+    await aio.run_io(persist_queue.shutdown)
+    await aio.aclose()
+
 # ---- Root & Health ----
 @app.get("/")
 def root():
@@ -67,3 +83,33 @@ def root():
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Ready only once prewarm has finished and Supabase + the vector index are reachable."""
+    if warmup.is_ready():
+        return {"status": "ready", **warmup.status()}
+    warmup.start_background()  # retry after a failed warmup (no-op while one is running)
+    return JSONResponse(status_code=503, content={"status": "warming", **warmup.status()})
+
+# ---- Metrics ----
+# Per-route request latency (route template, not raw path, to keep label cardinality bounded);
+# stage-level timings are recorded inside the services.
+_HTTP_SECONDS = metrics.histogram("http_request_duration_seconds", "HTTP request latency by route")
+
+@app.middleware("http")
+async def _time_requests(request, call_next):
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        _HTTP_SECONDS.observe(time.perf_counter() - t0, method=request.method, route=route, status=status)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Prometheus text exposition (histograms, counters, stage error counts)."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,109 @@
+# apps/backend/services/aio.py
+from __future__ import annotations
+
+import os
+import asyncio
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# ============================== CONFIG ==============================
+# Async request path. Coroutines never block the event loop: calls into the sync SDKs
+# (Supabase, Pinecone, and the I/O-bound embed-worker passes) run on a dedicated I/O executor,
+# reranker inference on a small CPU executor, and outbound HTTP (LLM, SerpAPI, page checks) goes
+# through async clients. A request waiting on the network holds no thread, so concurrency per worker is
+# bounded by these limits rather than the default threadpool (~40 threads).
+ASYNC_IO_WORKERS           = int(os.getenv("ASYNC_IO_WORKERS", "64"))
+ASYNC_CPU_WORKERS          = int(os.getenv("ASYNC_CPU_WORKERS", "2"))
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200"))
+ASYNC_HTTP_TIMEOUT_S       = float(os.getenv("ASYNC_HTTP_TIMEOUT_S", "30"))
+
+try:
+    import httpx
+except Exception:
+    httpx = None  # type: ignore
+
+_LOCK = threading.Lock()
+_EXECUTORS: Dict[str, ThreadPoolExecutor] = {}
+_LOOP_LOCAL: Dict[Tuple[int, str], Tuple[asyncio.AbstractEventLoop, Any]] = {}
+
+# ============================== EXECUTORS ===========================
+
+def _executor(kind: str) -> ThreadPoolExecutor:
+    ex = _EXECUTORS.get(kind)
+    if ex is not None:
+        return ex
+    with _LOCK:
+        if kind not in _EXECUTORS:
+            workers = ASYNC_CPU_WORKERS if kind == "cpu" else ASYNC_IO_WORKERS
+            _EXECUTORS[kind] = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"aio-{kind}")
+    return _EXECUTORS[kind]
+
+async def _run(kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # Copy the caller's context so request-scoped state (seeker snapshot) is visible in the worker
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_executor(kind), call)
+
+async def run_io(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking SDK call (Supabase, Pinecone, sync HTTP) on the I/O executor."""
+    return await _run("io", fn, *args, **kwargs)
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run CPU-bound inference on the CPU executor (sized to the cores, not to the request count)."""
+    return await _run("cpu", fn, *args, **kwargs)
+
+# ============================== LOOP-LOCAL CLIENTS ==================
+
+def loop_local(name: str, factory: Callable[[], Any]) -> Any:
+    """
+    One object per running event loop (async HTTP clients, semaphores): they bind to the loop
+    they are first used on, so a new loop (tests, a restarted worker) gets a fresh one.
+    """
+    loop = asyncio.get_running_loop()
+    key = (id(loop), name)
+    hit = _LOOP_LOCAL.get(key)
+    if hit is not None and hit[0] is loop:
+        return hit[1]
+    obj = factory()
+    _LOOP_LOCAL[key] = (loop, obj)
+    return obj
+
+def http_client() -> Any:
+    """Shared httpx.AsyncClient for this loop, or None when httpx is not installed."""
+    if httpx is None:
+        return None
+    return loop_local("httpx", lambda: httpx.AsyncClient(
+        timeout=ASYNC_HTTP_TIMEOUT_S,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=ASYNC_HTTP_MAX_CONNECTIONS // 2),
+    ))
+
+async def aclose() -> None:
+    """Close this loop's clients and stop the executors (app shutdown)."""
+    loop = asyncio.get_running_loop()
+    for key, (owner, obj) in list(_LOOP_LOCAL.items()):
+        if owner is not loop:
+            continue
+        _LOOP_LOCAL.pop(key, None)
+        close = getattr(obj, "aclose", None) or getattr(obj, "close", None)
+        if close is None:
+            continue
+        try:
+            res = close()
+            if asyncio.iscoroutine(res):
+                await res
+        except Exception as e:
+            print(f"[WARN] closing {key[1]} client failed: {e}")
+    with _LOCK:
+        for ex in _EXECUTORS.values():
+            ex.shutdown(wait=False)
+        _EXECUTORS.clear()
+
+__all__ = [
+    "ASYNC_IO_WORKERS", "ASYNC_CPU_WORKERS",
+    "run_io", "run_cpu", "loop_local", "http_client", "aclose",
+]
@@ -0,0 +1,322 @@
+# apps/backend/services/batch_matcher.py
+"""
+Nightly bulk matching: score every seeker against every job post with blocked matrix products.
+
+  python -m apps.backend.services.batch_matcher
+  python -m apps.backend.services.batch_matcher --top-n 30 --workers 4 --block 128
+  python -m apps.backend.services.batch_matcher --seekers <uuid> <uuid> --dry-run
+  python -m apps.backend.services.batch_matcher --snapshot /data/index.npz --fresh
+
+Section vectors for both namespaces are loaded once (from --snapshot, the local vector backend, or by
+listing Pinecone). Every section is scored exactly (like MATCHER_RETRIEVAL_MODE=two_stage, not top-k
+per section), then the matcher's calibration, weights, min_sections gate and harsh penalties are
+applied (required-skill coverage via skill_utils, since there is no LLM judge here). The top-N per
+seeker are written with store_match_scores_bulk.
+
+Finished seekers are appended to the checkpoint file, so a killed run resumes where it stopped
+(--fresh starts over). A full run (no --seekers) that finishes without failed blocks removes the
+checkpoint, so the next night scores everyone again. --dry-run neither marks nor clears it.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from . import matcher
+from . import vector_index
+from .skill_utils import analyze_required_vs_seeker
+
+# ============================== CONFIG ==============================
+
+BATCH_TOP_N       = int(os.getenv("BATCH_MATCH_TOP_N", "20"))
+BATCH_BLOCK       = int(os.getenv("BATCH_MATCH_BLOCK", "128"))     # seekers per matmul block
+BATCH_WORKERS     = int(os.getenv("BATCH_MATCH_WORKERS", "2"))
+BATCH_OVERSAMPLE  = 3          # vector-stage candidates per kept result (penalties reorder)
+BATCH_CHECKPOINT  = os.getenv("BATCH_MATCH_CHECKPOINT", ".batch_matcher.checkpoint")
+BATCH_METHOD      = "batch-matrix"
+
+# ============================== CORPUS ==============================
+
+class Corpus:
+    """Unit-normalized section matrices for both namespaces, aligned to owner ids."""
+
+    def __init__(self, index: vector_index.LocalVectorIndex):
+        self.post_ids: List[str] = []
+        self.seeker_ids: List[str] = []
+        post_row: Dict[str, int] = {}
+        seeker_row: Dict[str, int] = {}
+        # scope -> (owner rows, matrix)
+        self.posts: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.seekers: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        for scope in matcher.VALID_SCOPES:
+            flt = {"scope": {"$eq": scope}}
+            for ns, rows_of, ids_out, dest in (
+                (matcher.POST_NS, post_row, self.post_ids, self.posts),
+                (matcher.SEEKER_NS, seeker_row, self.seeker_ids, self.seekers),
+            ):
+                ids, mat, _ = index.namespace_matrix(ns, flt)
+                owners = []
+                for vid in ids:
+                    owner = vid.split(":", 1)[0]
+                    if owner not in rows_of:
+                        rows_of[owner] = len(ids_out)
+                        ids_out.append(owner)
+                    owners.append(rows_of[owner])
+                dest[scope] = (np.asarray(owners, dtype=np.intp), mat.astype(np.float32, copy=False))
+        self.seeker_row = seeker_row
+
+def load_corpus(snapshot: Optional[str] = None) -> Corpus:
+    if snapshot:
+        idx = vector_index.LocalVectorIndex.load(snapshot, use_hnsw=False)
+    elif vector_index.enabled():
+        idx = vector_index.get_local_index()
+    else:
+        idx = vector_index.load_from_pinecone(matcher._get_pinecone_index(), (matcher.SEEKER_NS, matcher.POST_NS))
+    corpus = Corpus(idx)
+    print(f"[INFO] corpus: seekers={len(corpus.seeker_ids)} posts={len(corpus.post_ids)}")
+    return corpus
+
+def _fetch_rows(table: str, id_col: str, columns: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    _, sb = matcher._get_clients()
+    out: Dict[str, Dict[str, Any]] = {}
+    for i in range(0, len(ids), 200):
+        resp = sb.table(table).select(columns).in_(id_col, ids[i:i+200]).execute()
+        for row in resp.data or []:
+            out[str(row.get(id_col))] = row
+    return out
+
+# ============================== SCORING =============================
+
+def score_block(
+    corpus: Corpus,
+    seeker_rows: np.ndarray,
+    weights: Dict[str, float],
+    min_sections: int,
+) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Calibrated section scores (scope -> B x P), presence mask (B x P, sections counted) and
+    vector-stage confidence (B x P) for a block of seekers against every post.
+    Confidence of posts failing the min_sections gate is -1.
+    """
+    n_b, n_p = len(seeker_rows), len(corpus.post_ids)
+    block_pos = np.full(len(corpus.seeker_ids), -1, dtype=np.intp)
+    block_pos[seeker_rows] = np.arange(n_b)
+    weight_sum = sum(float(weights.get(s, 0.0)) for s in matcher.VALID_SCOPES) or 1.0
+
+    sections: Dict[str, np.ndarray] = {}
+    present = np.zeros((n_b, n_p), dtype=np.int8)
+    weighted = np.zeros((n_b, n_p), dtype=np.float64)
+    for scope in matcher.VALID_SCOPES:
+        cal = np.zeros((n_b, n_p), dtype=np.float32)  # 2-dp values; float32 halves the block footprint
+        s_owner, s_mat = corpus.seekers[scope]
+        p_owner, p_mat = corpus.posts[scope]
+        dest_all = block_pos[s_owner] if len(s_owner) else np.zeros(0, dtype=np.intp)
+        sel = np.flatnonzero(dest_all >= 0)
+        if len(sel) and len(p_owner):
+            dest = dest_all[sel]
+            scores = matcher._calibrate_cosine_array(s_mat[sel] @ p_mat.T)  # rows are unit vectors
+            cal[np.ix_(dest, p_owner)] = scores
+            present[np.ix_(dest, p_owner)] += 1
+            weighted[np.ix_(dest, p_owner)] += float(weights.get(scope, 0.0)) * scores
+        sections[scope] = cal
+    confidence = np.round(weighted / weight_sum, 2)
+    confidence[present < max(1, int(min_sections))] = -1.0
+    return sections, present, confidence
+
+def finalize_for_seeker(
+    b: int,
+    sections: Dict[str, np.ndarray],
+    confidence: np.ndarray,
+    corpus: Corpus,
+    posts: Dict[str, Dict[str, Any]],
+    seeker_skills: List[str],
+    weights: Dict[str, float],
+    top_n: int,
+) -> List[Dict[str, Any]]:
+    """Top-N results for block row b, with the matcher's harsh penalties (vector-only path)."""
+    row = confidence[b]
+    k = min(len(row), max(1, top_n * BATCH_OVERSAMPLE))
+    cand = np.argpartition(-row, k - 1)[:k] if k < len(row) else np.arange(len(row))
+    out: List[Dict[str, Any]] = []
+    for j in cand[np.argsort(-row[cand], kind="stable")]:
+        if row[j] < 0:
+            break
+        pid = corpus.post_ids[j]
+        post = posts.get(pid)
+        if post is None:
+            continue  # vector exists but the job_post row is gone
+        vec_sections = {s: round(float(sections[s][b, j]), 2) for s in matcher.VALID_SCOPES}
+        required = {
+            "education": bool(post.get("job_education")),
+            "licenses": bool(post.get("job_licenses_certifications")),
+        }
+        blended, overall = matcher._finalize_scores(vec_sections, None, weights, required)
+        skills = analyze_required_vs_seeker(matcher._coerce_to_list(post.get("job_skills")), seeker_skills)
+        harsh = matcher._compute_penalized_overall(
+            overall=overall,
+            blended_sections=blended,
+            required_skills=skills["required_skills"],
+            matched_skills=skills["matched_skills"],
+        )
+        out.append({
+            "job_post_id": pid,
+            "confidence": harsh,
+            "section_scores": matcher._rescale_sections_uniform(blended, overall, harsh),
+            "analysis": {
+                "required_skills": skills["required_skills"],
+                "matched_skills": skills["matched_skills"],
+                "missing_skills": skills["missing_skills"],
+                "skills_match_rate": skills["skills_match_rate"],
+            },
+        })
+    out.sort(key=lambda d: d["confidence"], reverse=True)
+    return out[:top_n]
+
+# ============================ CHECKPOINT ============================
+
+class Checkpoint:
+    """Append-only file of finished seeker ids (one per line)."""
+
+    def __init__(self, path: str, fresh: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        if fresh and os.path.exists(path):
+            os.remove(path)
+        self.done: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = {line.strip() for line in f if line.strip()}
+
+    def mark(self, seeker_ids: Iterable[str]) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for sid in seeker_ids:
+                f.write(sid + "\n")
+                self.done.add(sid)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.done.clear()
+
+# =============================== RUN ================================
+
+def run_batch(
+    seeker_ids: Optional[List[str]] = None,
+    top_n: int = BATCH_TOP_N,
+    block: int = BATCH_BLOCK,
+    workers: int = BATCH_WORKERS,
+    min_sections: int = 2,
+    weights: Optional[Dict[str, float]] = None,
+    checkpoint_path: str = BATCH_CHECKPOINT,
+    fresh: bool = False,
+    snapshot: Optional[str] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    t0 = time.time()
+    weights_eff = matcher._effective_weights(weights)
+    corpus = load_corpus(snapshot)
+    ckpt = Checkpoint(checkpoint_path, fresh=fresh)
+
+    todo = [s for s in (seeker_ids or corpus.seeker_ids) if s in corpus.seeker_row and s not in ckpt.done]
+    print(f"[INFO] batch: {len(todo)} seekers to score ({len(ckpt.done)} already checkpointed)")
+    if not todo or not corpus.post_ids:
+        if not todo and seeker_ids is None and not dry_run:
+            ckpt.clear()  # a killed run had already finished every seeker
+        return {"seekers": 0, "rows": 0, "seconds": round(time.time() - t0, 1)}
+
+    posts = _fetch_rows(
+        "job_post", "job_post_id",
+        "job_post_id,job_skills,job_education,job_licenses_certifications",
+        corpus.post_ids,
+    )
+    if not dry_run:
+        from .data_storer import store_match_scores_bulk
+
+    def _run_block(ids: List[str]) -> int:
+        rows = np.asarray([corpus.seeker_row[s] for s in ids], dtype=np.intp)
+        sections, _, confidence = score_block(corpus, rows, weights_eff, min_sections)
+        seekers = _fetch_rows("job_seeker", "job_seeker_id", "job_seeker_id,skills", ids)
+        written = 0
+        for b, sid in enumerate(ids):
+            skills = matcher._coerce_to_list((seekers.get(sid) or {}).get("skills"))
+            results = finalize_for_seeker(b, sections, confidence, corpus, posts, skills, weights_eff, top_n)
+            if results and not dry_run:
+                store_match_scores_bulk(
+                    auth_user_id=None,
+                    job_seeker_id=sid,
+                    items=results,
+                    default_weights=weights_eff,
+                    method=BATCH_METHOD,
+                    model_version="batch_matcher",
+                )
+            written += len(results)
+        if not dry_run:
+            ckpt.mark(ids)  # nothing was written on a dry run, so the next real run must score them
+        return written
+
+    blocks = [todo[i:i+max(1, block)] for i in range(0, len(todo), max(1, block))]
+    total_rows = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch-match") as pool:
+        futs = {pool.submit(_run_block, ids): ids for ids in blocks}
+        for n, fut in enumerate(as_completed(futs), 1):
+            try:
+                total_rows += fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] block of {len(futs[fut])} seekers failed (will retry next run): {e}")
+            if n % 10 == 0 or n == len(blocks):
+                print(f"[INFO] batch: {n}/{len(blocks)} blocks, {total_rows} rows, {time.time() - t0:.1f}s")
+
+    # Only an interrupted or partly failed run should resume; a clean full one starts over next time
+    # (a --seekers subset leaves an interrupted full run's checkpoint alone)
+    if failed == 0 and seeker_ids is None and not dry_run:
+        ckpt.clear()
+
+    return {
+        "seekers": len(todo),
+        "blocks": len(blocks),
+        "failed_blocks": failed,
+        "rows": total_rows,
+        "seconds": round(time.time() - t0, 1),
+    }
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Bulk seeker→post matching (matrix scoring)")
+    ap.add_argument("--seekers", nargs="*", help="Only these job_seeker_ids (default: every seeker with vectors)")
+    ap.add_argument("--top-n", type=int, default=BATCH_TOP_N)
+    ap.add_argument("--block", type=int, default=BATCH_BLOCK, help="Seekers per matrix block")
+    ap.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Blocks scored in parallel")
+    ap.add_argument("--min-sections", type=int, default=2)
+    ap.add_argument("--checkpoint", default=BATCH_CHECKPOINT)
+    ap.add_argument("--fresh", action="store_true", help="Ignore and reset the checkpoint")
+    ap.add_argument("--snapshot", help="Load vectors from a LocalVectorIndex .npz snapshot")
+    ap.add_argument("--dry-run", action="store_true", help="Score but don't write job_match_scores")
+    return ap.parse_args(argv)
+
+if __name__ == "__main__":
+    a = _parse_args(sys.argv[1:])
+    summary = run_batch(
+        seeker_ids=a.seekers or None,
+        top_n=a.top_n,
+        block=a.block,
+        workers=a.workers,
+        min_sections=a.min_sections,
+        checkpoint_path=a.checkpoint,
+        fresh=a.fresh,
+        snapshot=a.snapshot,
+        dry_run=a.dry_run,
+    )
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,105 @@
+# apps/backend/services/bm25_store.py
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ============================== CONFIG ==============================
+# One BM25 parameter set for both sides of hybrid retrieval. The embed worker fits the encoder on
+# job_post.search_document (document side) and, when BM25_PARAMS_PATH is set, dumps the fitted
+# parameters there; the matcher loads the same file to encode queries (reloaded when it changes).
+# Without the file, the matcher fits its own encoder from the same corpus once per process.
+BM25_PARAMS_PATH = os.getenv("BM25_PARAMS_PATH", "")
+
+try:
+    from pinecone_text.sparse import BM25Encoder
+except Exception:
+    BM25Encoder = None  # type: ignore
+
+_LOCK = threading.Lock()
+_QUERY_ENC: Any = None
+_QUERY_ENC_MTIME: Optional[float] = None
+
+def available() -> bool:
+    return BM25Encoder is not None
+
+# ============================== FIT / SHARE =========================
+
+def fit(corpus: List[str]) -> Any:
+    enc = BM25Encoder()
+    enc.fit(corpus)
+    return enc
+
+def save(enc: Any, path: str = BM25_PARAMS_PATH) -> bool:
+    """Dump fitted params (atomic replace, so readers never see a half-written file)."""
+    if not path or enc is None:
+        return False
+    tmp = f"{path}.tmp"
+    try:
+        enc.dump(tmp)
+        os.replace(tmp, path)
+        return True
+    except Exception as e:
+        print(f"[WARN] BM25 params dump to {path} failed: {e}")
+        return False
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def get_query_encoder(fit_corpus: Callable[[], List[str]]) -> Any:
+    """
+    Encoder for hybrid queries: the worker's dumped params when present (reloaded if the file
+    changed), otherwise one fitted here from fit_corpus(). None if pinecone-text is missing.
+    """
+    global _QUERY_ENC, _QUERY_ENC_MTIME
+    if BM25Encoder is None:
+        return None
+    mtime = _mtime(BM25_PARAMS_PATH) if BM25_PARAMS_PATH else None
+    if _QUERY_ENC is not None and mtime == _QUERY_ENC_MTIME:
+        return _QUERY_ENC
+    with _LOCK:
+        if _QUERY_ENC is not None and mtime == _QUERY_ENC_MTIME:
+            return _QUERY_ENC
+        try:
+            if mtime is not None:
+                enc = BM25Encoder().load(BM25_PARAMS_PATH)
+                print(f"[DIAG] BM25 query params loaded from {BM25_PARAMS_PATH}")
+            elif _QUERY_ENC is not None:
+                return _QUERY_ENC  # locally fitted; keep until the worker publishes a file
+            else:
+                corpus = fit_corpus()
+                enc = fit(corpus)
+                print(f"[DIAG] BM25 query params fitted locally on {len(corpus)} documents")
+        except Exception as e:
+            print(f"[WARN] BM25 query encoder unavailable: {e}")
+            return _QUERY_ENC
+        _QUERY_ENC, _QUERY_ENC_MTIME = enc, mtime
+        return enc
+
+# ============================== ENCODE ==============================
+
+def encode_query(enc: Any, text: str) -> Optional[Dict[str, List[Any]]]:
+    if enc is None or not (text or "").strip():
+        return None
+    sv = enc.encode_queries([text])[0]
+    if not sv.get("values"):
+        return None
+    return {"indices": list(sv["indices"]), "values": list(sv["values"])}
+
+def hybrid_scale(
+    dense: List[float],
+    sparse: Dict[str, List[Any]],
+    alpha: float,
+) -> Tuple[List[float], Dict[str, List[Any]]]:
+    """Convex dense/sparse weighting: alpha=1 -> dense only, alpha=0 -> sparse only."""
+    alpha = min(1.0, max(0.0, float(alpha)))
+    return (
+        [v * alpha for v in dense],
+        {"indices": sparse["indices"], "values": [v * (1.0 - alpha) for v in sparse["values"]]},
+    )
+
+__all__ = ["BM25_PARAMS_PATH", "available", "fit", "save", "get_query_encoder", "encode_query", "hybrid_scale"]
@@ -0,0 +1,241 @@
+# apps/backend/services/cache_store.py
+from __future__ import annotations
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# ============================== CONFIG ==============================
+
+# Optional SQLite file shared by the API processes and the embed worker on one host.
+# Empty -> caches are in-memory only, and the corpus version comes from the registered remote
+# source (see CORPUS VERSION), polled at most every CORPUS_VERSION_POLL_S.
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+CORPUS_VERSION_POLL_S = float(os.getenv("CORPUS_VERSION_POLL_S", "5"))
+
+# ============================ IN-MEMORY =============================
+
+class LRUTTLCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL.
+    Bounded by entry count and, optionally, by an approximate byte budget (sizeof(value)).
+    ttl_s <= 0 disables expiry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_s: float = 0.0,
+        max_bytes: int = 0,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self.max_bytes = int(max_bytes)
+        self.sizeof = sizeof
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, size, value = item
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                self._bytes -= size
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any, ttl_s: Optional[float] = None) -> None:
+        ttl = self.ttl_s if ttl_s is None else float(ttl_s)
+        size = int(self.sizeof(value)) if (self.max_bytes and self.sizeof) else 0
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (time.time() + ttl if ttl > 0 else 0.0, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes and len(self._data) > 1):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def pop(self, key: Any) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return None
+            self._bytes -= item[1]
+            return item[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+# ============================== SQLITE ==============================
+
+class SqliteStore:
+    """
+    Minimal persistent key/value table (JSON values, optional expiry) in a local SQLite file.
+    One connection per store, serialized with a lock; WAL so readers in other processes don't block.
+    """
+
+    def __init__(self, path: str, table: str):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "k TEXT PRIMARY KEY, v TEXT NOT NULL, expires_at REAL NOT NULL DEFAULT 0)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Any:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        now = time.time()
+        out: Dict[str, Any] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i+500]
+                marks = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT k, v, expires_at FROM {self.table} WHERE k IN ({marks})", chunk
+                ).fetchall()
+                for k, v, exp in rows:
+                    if exp and exp < now:
+                        continue
+                    out[k] = json.loads(v)
+        return out
+
+    def set(self, key: str, value: Any, ttl_s: float = 0.0) -> None:
+        self.set_many({key: value}, ttl_s=ttl_s)
+
+    def set_many(self, items: Dict[str, Any], ttl_s: float = 0.0) -> None:
+        if not items:
+            return
+        exp = time.time() + ttl_s if ttl_s and ttl_s > 0 else 0.0
+        rows = [(k, json.dumps(v, ensure_ascii=False, default=str), exp) for k, v in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (k, v, expires_at) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE k = ?", (key,))
+            self._conn.commit()
+
+_STORES: Dict[str, SqliteStore] = {}
+_STORES_LOCK = threading.Lock()
+
+def sqlite_store(table: str, path: Optional[str] = None) -> Optional[SqliteStore]:
+    """Shared SqliteStore for a table in CACHE_DB_PATH (None when no path is configured or it fails)."""
+    path = path if path is not None else CACHE_DB_PATH
+    if not path:
+        return None
+    key = f"{path}::{table}"
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            try:
+                store = _STORES[key] = SqliteStore(path, table)
+            except Exception as e:
+                print(f"[WARN] sqlite cache {path} ({table}) unavailable: {e}")
+                return None
+        return store
+
+# ========================= CORPUS VERSION ==========================
+# Monotonic counters, one per corpus name, bumped by the embed worker whenever that corpus's vectors
+# change ("job_posts" for posts, the matcher's seeker corpus for seekers). Ranking caches key on
+# them, so a post upsert/delete invalidates cached rankings without touching the seeker corpus.
+# The counters are shared through CACHE_DB_PATH. Without it a bump never leaves the embed worker's
+# process, so the API folds in a remote source instead: a monotonic number the worker's writes
+# advance (the matcher registers the embed queues' newest processed_at in Supabase).
+
+_CORPUS_KEY = "job_posts"
+_corpus_version_mem: Dict[str, int] = {}
+_corpus_lock = threading.Lock()
+_REMOTE_SOURCES: Dict[str, Callable[[], int]] = {}
+_REMOTE_SEEN: Dict[str, Tuple[float, int]] = {}  # name -> (polled_at, value)
+
+def register_corpus_source(name: str, source: Callable[[], int]) -> None:
+    """Remote, cross-process version for a corpus, used when no CACHE_DB_PATH is configured."""
+    _REMOTE_SOURCES[name] = source
+    _REMOTE_SEEN.pop(name, None)
+
+def _remote_version(name: str) -> int:
+    source = _REMOTE_SOURCES.get(name)
+    if source is None:
+        return 0
+    polled_at, value = _REMOTE_SEEN.get(name, (0.0, 0))
+    if time.monotonic() - polled_at < CORPUS_VERSION_POLL_S and polled_at:
+        return value
+    try:
+        value = max(value, int(source() or 0))
+    except Exception as e:
+        print(f"[WARN] remote corpus_version ({name}) read failed: {e}")
+    _REMOTE_SEEN[name] = (time.monotonic(), value)
+    return value
+
+def corpus_version(name: str = _CORPUS_KEY) -> int:
+    store = sqlite_store("corpus_version")
+    if store is not None:
+        try:
+            return int(store.get(name) or 0)
+        except Exception as e:
+            print(f"[WARN] corpus_version read failed: {e}")
+    # Both parts only grow, so their sum changes whenever either does
+    return _corpus_version_mem.get(name, 0) + _remote_version(name)
+
+def bump_corpus_version(name: str = _CORPUS_KEY) -> int:
+    with _corpus_lock:
+        local = _corpus_version_mem[name] = _corpus_version_mem.get(name, 0) + 1
+        store = sqlite_store("corpus_version")
+        if store is None:
+            return local + _remote_version(name)
+        try:
+            with store._lock:
+                store._conn.execute(
+                    "INSERT INTO corpus_version (k, v, expires_at) VALUES (?, '1', 0) "
+                    "ON CONFLICT(k) DO UPDATE SET v = CAST(v AS INTEGER) + 1",
+                    (name,),
+                )
+                store._conn.commit()
+            return int(store.get(name) or 0)
+        except Exception as e:
+            print(f"[WARN] corpus_version bump failed: {e}")
+            return local + _remote_version(name)
+
+__all__ = [
+    "CACHE_DB_PATH", "LRUTTLCache", "SqliteStore", "sqlite_store",
+    "corpus_version", "bump_corpus_version", "register_corpus_source",
+]
@@ -0,0 +1,262 @@
+# apps/backend/services/context_compactor.py
+from __future__ import annotations
+
+import os
+import re
+import json
+import math
+from typing import Any, Dict, Iterable, List
+
+# ============================== CONFIG ==============================
+# Token-budgeted contexts for the LLM judge. Counts use tiktoken when installed (LLM_TOKENIZER
+# encoding, o200k_base = gpt-4o family), otherwise a chars/4 estimate.
+LLM_TOKENIZER           = os.getenv("LLM_TOKENIZER", "o200k_base")
+LLM_JOB_TOKEN_BUDGET    = int(os.getenv("LLM_JOB_TOKEN_BUDGET", "320"))
+LLM_SEEKER_TOKEN_BUDGET = int(os.getenv("LLM_SEEKER_TOKEN_BUDGET", "700"))
+
+# Long free-text job fields and their share of what is left after the short fields
+_JOB_TEXT_SHARES: Dict[str, float] = {
+    "experience_req": 0.30,
+    "job_overview":   0.40,
+    "education_req":  0.15,
+    "licenses_req":   0.15,
+}
+_SEEKER_TEXT_SHARES: Dict[str, float] = {
+    "experience_text": 0.65,
+    "education_text":  0.20,
+    "search_document": 0.15,
+}
+# Keys dropped when flattening JSON blobs (row plumbing, not evidence)
+_NOISE_KEY = re.compile(r"(^id$|_id$|^uuid$|created_at|updated_at|^index$|^order$)", re.I)
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9+#]+")
+_ELLIPSIS = "…"
+
+# ============================== TOKENS ==============================
+
+_ENC: Any = None
+_ENC_LOADED = False
+
+def _encoding() -> Any:
+    global _ENC, _ENC_LOADED
+    if not _ENC_LOADED:
+        _ENC_LOADED = True
+        try:
+            import tiktoken
+            try:
+                _ENC = tiktoken.get_encoding(LLM_TOKENIZER)
+            except Exception:
+                _ENC = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _ENC = None
+    return _ENC
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Hard cut to max_tokens (on a word boundary without tiktoken), marked with an ellipsis."""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    enc = _encoding()
+    if enc is not None:
+        return enc.decode(enc.encode(text, disallowed_special=())[: max(1, max_tokens - 1)]).rstrip() + _ELLIPSIS
+    cut = text[: max(1, max_tokens * 4 - 1)]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > len(cut) // 2 else cut).rstrip() + _ELLIPSIS
+
+# ============================== TEXT ================================
+
+def _squash(text: str) -> str:
+    text = re.sub(r"<[^>]+>", " ", text)          # stray HTML
+    text = re.sub(r"[*_`#>]+", " ", text)         # markdown emphasis/headers
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    return re.sub(r"\n\s*\n+", "\n", text).strip()
+
+def _flatten_blob(value: Any, depth: int = 0) -> str:
+    """JSON blob -> terse 'key: value; ...' text, skipping empty values and id/timestamp plumbing."""
+    if value is None or value == "" or value == [] or value == {}:
+        return ""
+    if isinstance(value, dict):
+        parts = []
+        for k, v in value.items():
+            if _NOISE_KEY.search(str(k)):
+                continue
+            flat = _flatten_blob(v, depth + 1)
+            if flat:
+                parts.append(f"{k}: {flat}" if depth < 2 else flat)
+        return "; ".join(parts)
+    if isinstance(value, (list, tuple)):
+        return " | ".join(p for p in (_flatten_blob(v, depth + 1) for v in value) if p)
+    return _squash(str(value))
+
+def as_text(value: Any) -> str:
+    """Field value (raw, or JSON-stringified by _stringify) as compact plain text."""
+    if isinstance(value, str):
+        s = value.strip()
+        if s in ('""', "null", "[]", "{}"):
+            return ""
+        if s[:1] in ("[", "{"):
+            try:
+                return _flatten_blob(json.loads(s))
+            except Exception:
+                pass
+        return _squash(s)
+    return _flatten_blob(value)
+
+def _sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENT_SPLIT.split(text) if s and s.strip()]
+
+def _sent_key(s: str) -> str:
+    return " ".join(_WORD.findall(s.lower()))
+
+def dedupe_list(items: Iterable[Any]) -> List[str]:
+    seen, out = set(), []
+    for it in items or []:
+        s = str(it).strip()
+        k = s.lower()
+        if s and k not in seen:
+            seen.add(k)
+            out.append(s)
+    return out
+
+def extract_to_budget(text: str, max_tokens: int, keywords: Iterable[str] = ()) -> str:
+    """
+    Extractive summary: keep the first sentence, then the sentences with the most keyword hits,
+    in original order, until max_tokens. Falls back to a hard cut when one sentence is too long.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    sents = _sentences(text)
+    if len(sents) <= 1:
+        return truncate_to_tokens(text, max_tokens)
+    kw = {w for k in keywords for w in _WORD.findall(str(k).lower()) if len(w) > 2}
+    ranked = sorted(
+        range(len(sents)),
+        key=lambda i: (i != 0, -len(kw.intersection(_WORD.findall(sents[i].lower()))), i),
+    )
+    keep, used = [], 0
+    for i in ranked:
+        t = count_tokens(sents[i]) + 1
+        if used + t <= max_tokens:
+            keep.append(i)
+            used += t
+    if not keep:
+        return truncate_to_tokens(sents[0], max_tokens)
+    out = " ".join(sents[i] for i in sorted(keep))
+    return out if len(keep) == len(sents) else out + " " + _ELLIPSIS
+
+def _allocate(needs: Dict[str, int], shares: Dict[str, float], budget: int) -> Dict[str, int]:
+    """Split budget across fields by share; what a short field doesn't use flows to the others."""
+    alloc = {k: 0 for k in needs}
+    left = dict(needs)
+    remaining = max(0, budget)
+    while left and remaining > 0:
+        total_share = sum(shares.get(k, 0.1) for k in left) or 1.0
+        satisfied = {k: n for k, n in left.items() if n <= remaining * shares.get(k, 0.1) / total_share}
+        if not satisfied:
+            for k in left:
+                alloc[k] = int(remaining * shares.get(k, 0.1) / total_share)
+            break
+        for k, n in satisfied.items():
+            alloc[k] = n
+            remaining -= n
+            del left[k]
+    return alloc
+
+def _fit_text_fields(
+    out: Dict[str, Any],
+    texts: Dict[str, str],
+    shares: Dict[str, float],
+    budget: int,
+    keywords: Iterable[str],
+) -> None:
+    """
+    Drop sentences already said by an earlier field (or earlier in the same one), then extract
+    each field to its allocation.
+    """
+    seen = ""  # normalized text kept so far; containment catches "description: X" vs "X"
+    exact: set = set()
+    unique: Dict[str, str] = {}
+    for name, text in texts.items():
+        kept = []
+        for s in _sentences(text):
+            k = _sent_key(s)
+            # short fragments ("Python SQL") only dedupe on an exact repeat
+            dup = k in exact or (k.count(" ") >= 3 and k in seen)
+            if k and not dup:
+                exact.add(k)
+                seen += " | " + k
+                kept.append(s)
+        if kept:
+            unique[name] = " ".join(kept)
+    alloc = _allocate({k: count_tokens(v) for k, v in unique.items()}, shares, budget)
+    keywords = list(keywords)
+    for name, text in unique.items():
+        fitted = extract_to_budget(text, alloc.get(name, 0), keywords)
+        if fitted:
+            out[name] = fitted
+
+# ============================== CONTEXTS ============================
+
+def _short_tokens(d: Dict[str, Any]) -> int:
+    return count_tokens(json.dumps(d, ensure_ascii=False, separators=(",", ":")))
+
+def compact_job(ctx: Dict[str, Any], budget: int = LLM_JOB_TOKEN_BUDGET) -> Dict[str, Any]:
+    """
+    Judge context for one job within ~budget tokens: empty fields dropped, skills deduped,
+    JSON blobs flattened, sentences repeated across fields kept once, long text summarized.
+    """
+    if not ctx:
+        return {}
+    out: Dict[str, Any] = {"job_post_id": ctx.get("job_post_id")}
+    for k in ("job_title", "company", "location", "seniority"):
+        v = as_text(ctx.get(k))
+        if v:
+            out[k] = truncate_to_tokens(v, 24)
+    skills = dedupe_list(ctx.get("job_skills") or [])
+    if skills:
+        out["job_skills"] = skills
+    out["education_required"] = bool(ctx.get("education_required"))
+    out["license_required"] = bool(ctx.get("license_required"))
+
+    # Most specific requirement text first, so the overview loses its restatements of it
+    texts = {k: as_text(ctx.get(k)) for k in ("experience_req", "education_req", "licenses_req", "job_overview")}
+    texts = {k: v for k, v in texts.items() if v}
+    left = budget - _short_tokens(out)
+    _fit_text_fields(out, texts, _JOB_TEXT_SHARES, left, skills + [out.get("job_title", "")])
+    return out
+
+def compact_seeker(ctx: Dict[str, Any], budget: int = LLM_SEEKER_TOKEN_BUDGET) -> Dict[str, Any]:
+    """
+    Seeker context within ~budget tokens. The email never helps the judge and is dropped;
+    search_document (a concatenation of the structured fields) only fills leftover budget.
+    """
+    if not ctx:
+        return {}
+    out: Dict[str, Any] = {}
+    if ctx.get("full_name"):
+        out["full_name"] = str(ctx["full_name"]).strip()
+    for k in ("skills", "licenses_certifications"):
+        items = dedupe_list(ctx.get(k) or [])
+        if items:
+            out[k] = items
+    texts = {k: as_text(ctx.get(k)) for k in ("experience_text", "education_text", "search_document")}
+    texts = {k: v for k, v in texts.items() if v}
+    left = budget - _short_tokens(out)
+    _fit_text_fields(out, texts, _SEEKER_TEXT_SHARES, left, out.get("skills", []))
+    return out
+
+__all__ = [
+    "LLM_JOB_TOKEN_BUDGET", "LLM_SEEKER_TOKEN_BUDGET",
+    "count_tokens", "truncate_to_tokens", "as_text", "dedupe_list", "extract_to_budget",
+    "compact_job", "compact_seeker",
+]
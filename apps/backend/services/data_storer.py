@@ -107,35 +107,112 @@ def store_match_scores_bulk(
     Bulk helper: items = list of results from matcher (one per job_post).
     Each item may contain: job_post_id, confidence, section_scores, analysis{...}
     """
-    rows: List[Dict[str, Any]] = []
-    for it in items or []:
-        analysis = _ensure_dict(it.get("analysis"))
-        row = {
-            "job_seeker_id": job_seeker_id,
-            "job_post_id": it["job_post_id"],
-            "auth_user_id": auth_user_id,
-            "confidence": round(float(it["confidence"]), 2),
-            "section_scores": _ensure_dict(it.get("section_scores")),
-            "weights": _ensure_dict(it.get("weights") or default_weights or {}),
-            "rerank_enabled": bool(it.get("rerank_enabled", False)),
-            "method": method,
-            "model_version": model_version,
-            "calculated_at": _now_iso(),
-            "matched_skills": _ensure_list(analysis.get("matched_skills")),
-            "missing_skills": _ensure_list(analysis.get("missing_skills")),
-            "matched_explanations": _ensure_dict(analysis.get("matched_explanations")),
-            "overall_summary": analysis.get("overall_summary"),
-        }
-        # Remove 'analysis' key if present (should not be in DB row)
-        if "analysis" in row:
-            del row["analysis"]
-        rows.append(row)
+    rows = match_score_rows(
+        auth_user_id=auth_user_id,
+        job_seeker_id=job_seeker_id,
+        items=items,
+        default_weights=default_weights,
+        method=method,
+        model_version=model_version,
+    )
+    return insert_match_score_rows(rows)
+
+
+def _match_score_row(
+    it: Dict[str, Any],
+    *,
+    job_seeker_id: str,
+    job_post_id: str,
+    auth_user_id: Optional[str],
+    default_weights: Optional[Dict[str, float]],
+    method: Optional[str],
+    model_version: Optional[str],
+    calculated_at_iso: str,
+) -> Dict[str, Any]:
+    """One job_match_scores row from a matcher result item (its 'analysis' is flattened)."""
+    analysis = _ensure_dict(it.get("analysis"))
+    return {
+        "job_seeker_id": job_seeker_id,
+        "job_post_id": job_post_id,
+        "auth_user_id": auth_user_id,
+        "confidence": round(float(it["confidence"]), 2),
+        "section_scores": _ensure_dict(it.get("section_scores")),
+        "weights": _ensure_dict(it.get("weights") or default_weights or {}),
+        "rerank_enabled": bool(it.get("rerank_enabled", False)),
+        "method": method,
+        "model_version": model_version,
+        "calculated_at": calculated_at_iso,
+        "matched_skills": _ensure_list(analysis.get("matched_skills")),
+        "missing_skills": _ensure_list(analysis.get("missing_skills")),
+        "matched_explanations": _ensure_dict(analysis.get("matched_explanations")),
+        "overall_summary": analysis.get("overall_summary"),
+    }
+
+
+def match_score_rows(
+    *,
+    auth_user_id: Optional[str],
+    job_seeker_id: str,
+    items: List[Dict[str, Any]],
+    default_weights: Optional[Dict[str, float]] = None,
+    method: Optional[str] = "pinecone",
+    model_version: Optional[str] = None,
+    calculated_at_iso: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """job_match_scores rows for one seeker's matcher results (no DB call)."""
+    now = calculated_at_iso or _now_iso()
+    return [
+        _match_score_row(
+            it,
+            job_seeker_id=job_seeker_id,
+            job_post_id=it["job_post_id"],
+            auth_user_id=auth_user_id,
+            default_weights=default_weights,
+            method=method,
+            model_version=model_version,
+            calculated_at_iso=now,
+        )
+        for it in items or []
+    ]
+
+
+def insert_match_score_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One insert for any number of job_match_scores rows (possibly several seekers)."""
     if not rows:
         return []
     res = _sb.table("job_match_scores").insert(rows).execute()
     return res.data or rows
 
 
+def store_post_match_scores_bulk(
+    *,
+    job_post_id: str,
+    items: List[Dict[str, Any]],
+    default_weights: Optional[Dict[str, float]] = None,
+    method: Optional[str] = "materialized",
+    model_version: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Post-side bulk helper: one job_post scored against many seekers, written in a single insert.
+    items = results from matcher.rank_seekers_for_post (job_seeker_id, confidence, section_scores, analysis{...}).
+    """
+    now = _now_iso()
+    rows = [
+        _match_score_row(
+            it,
+            job_seeker_id=it["job_seeker_id"],
+            job_post_id=job_post_id,
+            auth_user_id=it.get("auth_user_id"),
+            default_weights=default_weights,
+            method=method,
+            model_version=model_version,
+            calculated_at_iso=now,
+        )
+        for it in items or []
+    ]
+    return insert_match_score_rows(rows)
+
+
 # =========================================================
 #                    ROLE ROADMAP (MASTER)
 # =========================================================
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import os
+import sys
 import time
 import hashlib
 import json
@@ -12,7 +13,23 @@ from pathlib import Path
 
 import numpy as np
 from supabase import create_client, Client
-from sentence_transformers import SentenceTransformer
+
+try:
+    from . import vector_index as local_index
+    from . import metrics
+    from . import bm25_store
+    from . import seeker_vector_cache
+    from . import seeker_snapshot
+    from .cache_store import bump_corpus_version
+    from .post_filters import post_filter_metadata
+except ImportError:  # run as a plain script from services/
+    import vector_index as local_index  # type: ignore
+    import metrics  # type: ignore
+    import bm25_store  # type: ignore
+    import seeker_vector_cache  # type: ignore
+    import seeker_snapshot  # type: ignore
+    from cache_store import bump_corpus_version  # type: ignore
+    from post_filters import post_filter_metadata  # type: ignore
 
 # ---------------------- .env loading (robust) ----------------------
 def _load_env() -> None:
@@ -97,6 +114,12 @@ E5_PASSAGE_PREFIX = os.getenv("E5_PASSAGE_PREFIX", "passage: ")
 # Optional: toggle attaching sparse vectors (defaults to on)
 ENABLE_SPARSE = os.getenv("ENABLE_SPARSE", "1") == "1"
 
+# Prometheus exposition for the worker (GET :<port>/metrics); 0 disables
+EMBED_METRICS_PORT = int(os.getenv("EMBED_METRICS_PORT", "0"))
+
+# Queue rows by kind (seeker|post) and result (embedded|unchanged|metadata|missing|failed)
+_ROWS = metrics.counter("embed_rows_total", "Embed queue rows handled")
+
 # ---------------------- Env validation (nice errors) ----------------------
 def _require_env() -> None:
     missing = [k for k in ("SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "PINECONE_API_KEY") if not os.getenv(k)]
@@ -140,21 +163,32 @@ def _init_pinecone():
         raise
 
 index = _init_pinecone()
-model = SentenceTransformer(EMBED_MODEL_NAME)
 
-# ---------------------- Hybrid (BM25) encoder for sparse vectors ----------------------
-try:
-    from pinecone_text.sparse import BM25Encoder
-except Exception:
-    BM25Encoder = None  # type: ignore
+# Embedding model is loaded on first use (or by the API's startup prewarm), not at import:
+# the /match endpoint imports this module and must not block on a model load.
+_MODEL = None
 
-_BM25: Optional["BM25Encoder"] = None
+def get_model():
+    global _MODEL
+    if _MODEL is None:
+        from sentence_transformers import SentenceTransformer
+        _MODEL = SentenceTransformer(EMBED_MODEL_NAME)
+    return _MODEL
+
+# Local vector backend (MATCHER_VECTOR_BACKEND=local): mirror every upsert so the in-process
+# index (and its LOCAL_INDEX_PATH snapshot) stays current without a full reload.
+local_index.configure_warm_source(lambda: index, (JOB_SEEKERS_NAMESPACE, JOB_POSTS_NAMESPACE))
+
+# ---------------------- Hybrid (BM25) encoder for sparse vectors ----------------------
+_BM25: Optional[Any] = None
 
 def _fit_bm25_from_db() -> None:
     """
     Fit a BM25 encoder on your current job_post corpus (search_document).
     Called at startup. If pinecone-text isn't installed or ENABLE_SPARSE=0,
-    this is a no-op and the worker runs dense-only.
+    this is a no-op and the worker runs dense-only. The fitted params are
+    published to BM25_PARAMS_PATH (when set) so the matcher encodes hybrid
+    queries with the same vocabulary/IDF.
     """
     global _BM25
     if not ENABLE_SPARSE:
@@ -162,7 +196,7 @@ def _fit_bm25_from_db() -> None:
         _BM25 = None
         return
 
-    if BM25Encoder is None:
+    if not bm25_store.available():
         print("[DIAG] pinecone-text not installed; skipping BM25 fit (dense-only upserts)")
         _BM25 = None
         return
@@ -170,10 +204,10 @@ def _fit_bm25_from_db() -> None:
     try:
         res = sb.table("job_post").select("search_document").limit(100000).execute()
         corpus = [(r.get("search_document") or "") for r in (res.data or [])]
-        enc = BM25Encoder()
-        enc.fit(corpus)
-        _BM25 = enc
+        _BM25 = bm25_store.fit(corpus)
         print(f"[DIAG] BM25 fitted on {len(corpus)} job_post documents")
+        if bm25_store.save(_BM25):
+            print(f"[DIAG] BM25 params published to {bm25_store.BM25_PARAMS_PATH}")
     except Exception as e:
         print(f"[WARN] BM25 fit failed: {e}")
         _BM25 = None
@@ -194,11 +228,12 @@ def normalize(vec: List[float]) -> List[float]:
     n = np.linalg.norm(v)
     return (v / (n + 1e-12)).astype(np.float32).tolist()
 
+@metrics.timed("embed_worker", "encode")
 def embed_passage(text: str) -> List[float]:
     text = (text or "").strip()
     if E5_USE_PREFIX:
         text = f"{E5_PASSAGE_PREFIX}{text}"
-    emb = model.encode(text, convert_to_numpy=True)
+    emb = get_model().encode(text, convert_to_numpy=True)
     return normalize(emb.tolist())
 
 def checksum(text: str) -> str:
@@ -260,6 +295,11 @@ def upsert_job_seeker_vectors(js: Dict[str, Any]) -> None:
     except Exception as e:
         print(f"[ERROR] pinecone upsert (seeker {jsid}) failed: {e}")
         raise
+    local_index.mirror_upsert(vectors, JOB_SEEKERS_NAMESPACE)
+    bump_corpus_version("job_seekers")  # invalidates cached post->seekers rankings
+    emb_checksum = checksum(sections["full"])
+    # Write through before the checksum flips, so the matcher's first lookup under it is a hit
+    seeker_vector_cache.put(str(jsid), emb_checksum, {v["id"].split(":", 1)[1]: v["values"] for v in vectors})
 
     # Persist marker back to Supabase
     _safe_update(
@@ -268,10 +308,13 @@ def upsert_job_seeker_vectors(js: Dict[str, Any]) -> None:
         row_id_val=jsid,
         data={
             "pinecone_id": str(jsid),
-            "embedding_checksum": checksum(sections["full"]),
+            "embedding_checksum": emb_checksum,
         },
     )
+    # Eager passes run inside a /match request: its snapshot row now has a stale checksum
+    seeker_snapshot.forget(str(jsid))
 
+@metrics.timed("embed_worker", "seeker_batch")
 def process_job_seeker_batch() -> int:
     try:
         q = (
@@ -310,20 +353,25 @@ def process_job_seeker_batch() -> int:
 
         if not js:
             _mark_processed(EMBED_QUEUE_TABLE_SEEKER, rid)
+            _ROWS.inc(kind="seeker", result="missing")
             continue
 
         full_text = js.get("search_document") or ""
         chksum = checksum(full_text)
         if chksum == (js.get("embedding_checksum") or ""):
             _mark_processed(EMBED_QUEUE_TABLE_SEEKER, rid)
+            _ROWS.inc(kind="seeker", result="unchanged")
             processed += 1
             continue
 
         try:
-            upsert_job_seeker_vectors(js)
+            with metrics.timed("embed_worker", "seeker_upsert"):
+                upsert_job_seeker_vectors(js)
             _mark_processed(EMBED_QUEUE_TABLE_SEEKER, rid)
+            _ROWS.inc(kind="seeker", result="embedded")
             processed += 1
         except Exception as e:
+            _ROWS.inc(kind="seeker", result="failed")
             print(f"[ERROR] seeker upsert failed for {jsid}: {e}")
 
     return processed
@@ -345,10 +393,14 @@ def upsert_job_post_vectors(post: Dict[str, Any]) -> None:
     """
     pid = post["job_post_id"]
     sections = build_job_post_section_texts(post)
+    post_checksum = checksum(sections["full"])
+    filter_md = post_filter_metadata(post)  # location/seniority/posted, for matcher pre-filters
 
     vectors = []
+    post_vecs: Dict[str, List[float]] = {}
     for scope, text in sections.items():
         vec = embed_passage(text)
+        post_vecs[scope] = vec
 
         item: Dict[str, Any] = {
             "id": f"{pid}:{scope}",
@@ -358,6 +410,8 @@ def upsert_job_post_vectors(post: Dict[str, Any]) -> None:
                 "scope": scope,
                 "posted_by": (post.get("posted_by") or ""),
                 "updated_at": post.get("updated_at"),
+                "embedding_checksum": post_checksum,  # lets the matcher validate cached post rows
+                **filter_md,
             }
         }
 
@@ -374,6 +428,8 @@ def upsert_job_post_vectors(post: Dict[str, Any]) -> None:
     except Exception as e:
         print(f"[ERROR] pinecone upsert (post {pid}) failed: {e}")
         raise
+    local_index.mirror_upsert(vectors, JOB_POSTS_NAMESPACE)
+    bump_corpus_version()  # invalidates cached rankings
 
     _safe_update(
         table="job_post",
@@ -381,10 +437,90 @@ def upsert_job_post_vectors(post: Dict[str, Any]) -> None:
         row_id_val=pid,
         data={
             "pinecone_id": str(pid),
-            "embedding_checksum": checksum(sections["full"]),
+            "embedding_checksum": post_checksum,
         },
     )
+    _materialize_post(pid, post_vecs)
+
+_MATERIALIZER_WARNED = False
+
+def _materialize_post(pid: Any, post_vecs: Dict[str, List[float]]) -> None:
+    """Push the new post's matches to existing seekers (materializer.MATERIALIZE_ON_UPSERT; best-effort)."""
+    global _MATERIALIZER_WARNED
+    try:
+        from . import materializer
+    except ImportError:
+        if not _MATERIALIZER_WARNED:
+            _MATERIALIZER_WARNED = True
+            print("[WARN] materializer needs the package import path (python -m apps.backend.services.embed_worker)")
+        return
+    except Exception as e:  # the matcher validates its env at import
+        if not _MATERIALIZER_WARNED:
+            _MATERIALIZER_WARNED = True
+            print(f"[WARN] materializer unavailable: {e}")
+        return
+    if materializer.MATERIALIZE_ON_UPSERT:
+        materializer.materialize_post(str(pid), post_vecs=post_vecs)
+
+def refresh_job_post_metadata(post: Dict[str, Any]) -> bool:
+    """
+    Re-sync the filter metadata of an unchanged post (moved, re-levelled, or embedded before the
+    filter fields existed: the text and vectors are the same). Returns True when anything changed.
+    """
+    pid = post["job_post_id"]
+    filter_md = post_filter_metadata(post)
+    ids = [f"{pid}:{scope}" for scope in build_job_post_section_texts(post)]
+    res = index.fetch(ids=ids[:1], namespace=JOB_POSTS_NAMESPACE)
+    vecs = res.get("vectors", {}) if isinstance(res, dict) else (getattr(res, "vectors", None) or {})
+    current = vecs.get(ids[0])
+    current_md = (current.get("metadata") if isinstance(current, dict) else getattr(current, "metadata", None)) or {}
+    if current is None or all(current_md.get(k) == v for k, v in filter_md.items()):
+        return False
+    for vid in ids:
+        index.update(id=vid, set_metadata=filter_md, namespace=JOB_POSTS_NAMESPACE)
+        local_index.mirror_update(vid, filter_md, JOB_POSTS_NAMESPACE)
+    bump_corpus_version()  # filtered rankings may change
+    return True
 
+def backfill_job_post_metadata(page_size: int = 500) -> int:
+    """
+    One-off pass over every job_post: write the filter metadata onto vectors that predate it
+    (or carry stale values), without re-embedding. Returns the number of posts updated.
+    """
+    updated = scanned = 0
+    offset = 0
+    while True:
+        rows = (
+            sb.table("job_post").select("*")
+            .order("job_post_id")
+            .range(offset, offset + page_size - 1)
+            .execute()
+        ).data or []
+        for post in rows:
+            try:
+                updated += int(refresh_job_post_metadata(post))
+            except Exception as e:
+                print(f"[WARN] metadata backfill failed for post {post.get('job_post_id')}: {e}")
+        scanned += len(rows)
+        print(f"[INFO] metadata backfill: {updated}/{scanned} posts updated")
+        if len(rows) < page_size:
+            break
+        offset += page_size
+    local_index.save_snapshot_if_dirty()
+    return updated
+
+def delete_job_post_vectors(job_post_id: Any) -> None:
+    """Remove a post's section vectors (e.g. the job_post row was deleted)."""
+    ids = [f"{job_post_id}:{scope}" for scope in ("full", "skills", "experience", "education", "licenses")]
+    try:
+        index.delete(ids=ids, namespace=JOB_POSTS_NAMESPACE)
+    except Exception as e:
+        print(f"[ERROR] pinecone delete (post {job_post_id}) failed: {e}")
+        raise
+    local_index.mirror_delete(ids, JOB_POSTS_NAMESPACE)
+    bump_corpus_version()
+
+@metrics.timed("embed_worker", "post_batch")
 def process_job_post_batch() -> int:
     try:
         q = (
@@ -422,21 +558,37 @@ def process_job_post_batch() -> int:
         post = by_id.get(pid)
 
         if not post:
+            # Queued post no longer exists: drop its vectors so it stops being matched
+            try:
+                delete_job_post_vectors(pid)
+            except Exception:
+                pass
             _mark_processed(EMBED_QUEUE_TABLE_POST, rid)
+            _ROWS.inc(kind="post", result="missing")
             continue
 
         full_text = post.get("search_document") or ""
         chksum = checksum(full_text)
         if chksum == (post.get("embedding_checksum") or ""):
+            # Same text, but the row changed: location/seniority may have
+            refreshed = False
+            try:
+                refreshed = refresh_job_post_metadata(post)
+            except Exception as e:
+                print(f"[WARN] metadata refresh failed for post {pid}: {e}")
             _mark_processed(EMBED_QUEUE_TABLE_POST, rid)
+            _ROWS.inc(kind="post", result="metadata" if refreshed else "unchanged")
             processed += 1
             continue
 
         try:
-            upsert_job_post_vectors(post)
+            with metrics.timed("embed_worker", "post_upsert"):
+                upsert_job_post_vectors(post)
             _mark_processed(EMBED_QUEUE_TABLE_POST, rid)
+            _ROWS.inc(kind="post", result="embedded")
             processed += 1
         except Exception as e:
+            _ROWS.inc(kind="post", result="failed")
             print(f"[ERROR] post upsert failed for {pid}: {e}")
 
     return processed
@@ -448,18 +600,27 @@ def main():
         f"ns_seekers={JOB_SEEKERS_NAMESPACE} ns_posts={JOB_POSTS_NAMESPACE} "
         f"model={EMBED_MODEL_NAME}"
     )
+    if EMBED_METRICS_PORT:
+        metrics.start_http_server(EMBED_METRICS_PORT)
+        print(f"[INFO] metrics on :{EMBED_METRICS_PORT}/metrics")
+    get_model()
     # Fit BM25 on job_post corpus once (no-op if disabled/missing)
     _fit_bm25_from_db()
 
     while True:
-        c_seekers = process_job_seeker_batch()
-        c_posts = process_job_post_batch()
-
-        if c_seekers or c_posts:
-            print(f"Processed: job_seekers={c_seekers}, job_posts={c_posts}")
-        else:
-            print("No pending rows. Sleeping...")
+        with metrics.timed("embed_worker", "loop"):
+            c_seekers = process_job_seeker_batch()
+            c_posts = process_job_post_batch()
+
+            if c_seekers or c_posts:
+                print(f"Processed: job_seekers={c_seekers}, job_posts={c_posts}")
+                local_index.save_snapshot_if_dirty()
+            else:
+                print("No pending rows. Sleeping...")
         time.sleep(SLEEP)
 
 if __name__ == "__main__":
-    main()
+    if "--backfill-metadata" in sys.argv[1:]:
+        backfill_job_post_metadata()
+    else:
+        main()
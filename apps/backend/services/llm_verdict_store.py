@@ -0,0 +1,144 @@
+# apps/backend/services/llm_verdict_store.py
+from __future__ import annotations
+
+import os
+import time
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cache_store import LRUTTLCache, sqlite_store
+
+# ============================== CONFIG ==============================
+# Raw LLM judge verdicts (section scores, overall, skills, summary) keyed by
+# (seeker embedding_checksum, job_post_id, post embedding_checksum, model, prompt version).
+# Any change to either document, the model or the prompt yields a new key.
+#
+# Backends:
+#   "supabase" (default) -> table LLM_VERDICT_TABLE:
+#        verdict_key text primary key, job_post_id uuid, model text,
+#        prompt_version text, verdict jsonb, created_at timestamptz default now()
+#   "sqlite"             -> CACHE_DB_PATH (table llm_verdicts)
+#   "off"                -> in-memory LRU only
+# If a Supabase call fails, the store uses the SQLite fallback for LLM_VERDICT_BACKOFF_S and then
+# tries Supabase again; only a missing table disables it for the process lifetime.
+LLM_VERDICT_STORE     = os.getenv("LLM_VERDICT_STORE", "supabase").lower()
+LLM_VERDICT_TABLE     = os.getenv("LLM_VERDICT_TABLE", "llm_judge_verdicts")
+LLM_VERDICT_MEM       = int(os.getenv("LLM_VERDICT_MEM", "4096"))
+LLM_VERDICT_BACKOFF_S = float(os.getenv("LLM_VERDICT_BACKOFF_S", "60"))
+
+_MEM = LRUTTLCache(max_entries=LLM_VERDICT_MEM)
+_SB = None
+_SUPABASE_OK = LLM_VERDICT_STORE == "supabase"
+_SUPABASE_RETRY_AT = 0.0  # monotonic time before which Supabase is skipped after an error
+
+# PostgREST / Postgres errors meaning the table isn't there (not worth retrying)
+_MISSING_TABLE_MARKERS = ("42p01", "pgrst205", "does not exist", "could not find the table")
+
+def _get_sb():
+    global _SB
+    if _SB is None:
+        from supabase import create_client
+        _SB = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    return _SB
+
+def _supabase_ok() -> bool:
+    return _SUPABASE_OK and time.monotonic() >= _SUPABASE_RETRY_AT
+
+def _disable_supabase(err: Exception) -> None:
+    global _SUPABASE_OK, _SUPABASE_RETRY_AT
+    if any(m in str(err).lower() for m in _MISSING_TABLE_MARKERS):
+        _SUPABASE_OK = False
+        print(f"[WARN] verdict store: Supabase table {LLM_VERDICT_TABLE} missing ({err}); using local fallback")
+        return
+    _SUPABASE_RETRY_AT = time.monotonic() + LLM_VERDICT_BACKOFF_S
+    print(f"[WARN] verdict store: Supabase table {LLM_VERDICT_TABLE} unavailable ({err}); "
+          f"using local fallback for {LLM_VERDICT_BACKOFF_S:.0f}s")
+
+def verdict_key(
+    *,
+    seeker_checksum: str,
+    job_post_id: str,
+    post_checksum: str,
+    model: str,
+    prompt_version: str,
+) -> str:
+    raw = "|".join([seeker_checksum or "", str(job_post_id), post_checksum or "", model or "", prompt_version or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def get_verdicts(keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Look up verdicts: memory first, then Supabase (or SQLite). Returns key -> raw verdict."""
+    keys = [k for k in dict.fromkeys(keys) if k]
+    out: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for k in keys:
+        v = _MEM.get(k)
+        if v is None:
+            missing.append(k)
+        else:
+            out[k] = v
+
+    if missing and _supabase_ok():
+        try:
+            for i in range(0, len(missing), 200):
+                resp = (
+                    _get_sb().table(LLM_VERDICT_TABLE)
+                    .select("verdict_key, verdict")
+                    .in_("verdict_key", missing[i:i+200])
+                    .execute()
+                )
+                for row in resp.data or []:
+                    if isinstance(row.get("verdict"), dict):
+                        out[row["verdict_key"]] = row["verdict"]
+        except Exception as e:
+            _disable_supabase(e)
+
+    still = [k for k in missing if k not in out]
+    store = sqlite_store("llm_verdicts") if (still and LLM_VERDICT_STORE != "off") else None
+    if store is not None:
+        try:
+            out.update(store.get_many(still))
+        except Exception as e:
+            print(f"[WARN] verdict store sqlite read failed: {e}")
+
+    for k in missing:
+        if k in out:
+            _MEM.set(k, out[k])
+    return out
+
+def put_verdicts(
+    items: Dict[str, Dict[str, Any]],
+    *,
+    model: Optional[str] = None,
+    prompt_version: Optional[str] = None,
+) -> None:
+    """Write verdicts through to memory and the configured persistent backend (best-effort)."""
+    if not items:
+        return
+    for k, v in items.items():
+        _MEM.set(k, v)
+
+    if _supabase_ok():
+        rows = [
+            {
+                "verdict_key": k,
+                "job_post_id": str(v.get("job_post_id") or "") or None,
+                "model": model,
+                "prompt_version": prompt_version,
+                "verdict": v,
+            }
+            for k, v in items.items()
+        ]
+        try:
+            _get_sb().table(LLM_VERDICT_TABLE).upsert(rows, on_conflict="verdict_key").execute()
+            return
+        except Exception as e:
+            _disable_supabase(e)
+
+    store = sqlite_store("llm_verdicts") if LLM_VERDICT_STORE != "off" else None
+    if store is not None:
+        try:
+            store.set_many(items)
+        except Exception as e:
+            print(f"[WARN] verdict store sqlite write failed: {e}")
+
+__all__ = ["verdict_key", "get_verdicts", "put_verdicts"]
@@ -3,9 +3,32 @@ from __future__ import annotations
 
 import os
 import sys
+import copy
 import json
 import math
-from typing import Dict, List, Any, Iterable, Optional, Tuple
+import time
+import hashlib
+import asyncio
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, AsyncIterator, Generator, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from . import vector_index
+from .cache_store import LRUTTLCache, sqlite_store, corpus_version, register_corpus_source
+from . import llm_verdict_store
+from . import reranker_service
+from . import metrics
+from . import context_compactor
+from . import bm25_store
+from . import seeker_vector_cache
+from . import seeker_snapshot
+from . import aio
+from . import post_filters
+from .seeker_snapshot import SeekerSnapshot
+from .skill_utils import analyze_required_vs_seeker
 
 # Best-effort: load .env (harmless if already loaded by app.py)
 try:
@@ -20,6 +43,7 @@ except Exception:
 SEEKER_NS = os.getenv("PINECONE_NS_JOB_SEEKERS", "job_seekers")
 POST_NS   = os.getenv("PINECONE_NS_JOB_POSTS", "job_posts")
 VALID_SCOPES: Tuple[str, ...] = ("skills", "experience", "education", "licenses")
+FULL_SCOPE = "full"  # whole-document vector the embed worker writes alongside the sections
 
 # Default section weights for hybrid cosine aggregation
 DEFAULT_WEIGHTS: Dict[str, float] = {
@@ -34,12 +58,43 @@ RERANK_ENABLE = True
 RERANK_MODEL  = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 RERANK_ALPHA  = 0.65     # 0..1 — higher = trust Pinecone more
 RERANK_TOP_K  = 50       # rerank up to this many from the hybrid list
+# "torch" (sentence_transformers.CrossEncoder) or "onnx" (onnxruntime, int8 unless RERANK_ONNX_QUANTIZE=0)
+RERANK_BACKEND = os.getenv("RERANK_BACKEND", "torch").lower()
+# Raw cross-encoder scores cached per (model id, sha(seeker text), sha(post text)):
+# memory LRU, plus the CACHE_DB_PATH SQLite file when set. Only misses reach predict().
+RERANK_CACHE_ENABLE = os.getenv("RERANK_CACHE_ENABLE", "1") == "1"
+RERANK_CACHE_MAX    = int(os.getenv("RERANK_CACHE_MAX", "50000"))
 
 # LLM judge (strict, context-aware) to refine top results
 LLM_ENABLE       = True            # on by default
 LLM_JUDGE_TOP_K  = 15              # how many hybrid+reranked to send to LLM
 OPENAI_MODEL     = "gpt-4o-mini"
 GEMINI_MODEL     = "gemini-2.5-flash"
+# Bump whenever the judge SYSTEM prompt / schema / context shape changes: cached verdicts are keyed on it
+LLM_PROMPT_VERSION = "judge-v2"
+# Compact seeker/job contexts to LLM_SEEKER_TOKEN_BUDGET / LLM_JOB_TOKEN_BUDGET (context_compactor)
+LLM_COMPACT_CONTEXT = os.getenv("LLM_COMPACT_CONTEXT", "1") == "1"
+LLM_VERDICT_CACHE  = os.getenv("LLM_VERDICT_CACHE", "1") == "1"
+# Judge the top-K in shards of this many jobs, at most LLM_JUDGE_MAX_CONCURRENCY in flight per
+# request; the shared shard pool (LLM_JUDGE_POOL_WORKERS threads) serves all concurrent requests.
+# Latency tracks the slowest shard; a malformed shard only loses its own verdicts.
+LLM_JUDGE_SHARD_SIZE      = int(os.getenv("LLM_JUDGE_SHARD_SIZE", "5"))
+LLM_JUDGE_MAX_CONCURRENCY = int(os.getenv("LLM_JUDGE_MAX_CONCURRENCY", "3"))
+LLM_JUDGE_POOL_WORKERS    = int(os.getenv("LLM_JUDGE_POOL_WORKERS", "32"))
+
+# Deadline-aware degradation (budget_ms on rank_posts_for_seeker and /match). Rerank and judge
+# costs are estimated from EWMAs of observed latency (ms per predicted pair; ms per job in a
+# judge shard), seeded with these priors; the plan shrinks the rerank window, then shrinks or
+# skips the judge, to fit the remaining budget. Degraded rankings are never written to the cache.
+BUDGET_RERANK_MS_PER_PAIR = float(os.getenv("BUDGET_RERANK_MS_PER_PAIR", "4"))
+BUDGET_JUDGE_MS_PER_JOB   = float(os.getenv("BUDGET_JUDGE_MS_PER_JOB", "1200"))
+BUDGET_EWMA_ALPHA         = float(os.getenv("BUDGET_EWMA_ALPHA", "0.2"))
+BUDGET_SAFETY             = 0.85  # plan against this fraction of the remaining time
+BUDGET_MIN_RERANK_K       = 10    # below this the reranker is skipped rather than shrunk
+BUDGET_MIN_JUDGE_K        = 3     # below this the judge is skipped rather than shrunk
+# A judge skipped for the budget produces no new latency sample; when the estimate is older than
+# this, one budgeted request runs a minimal judge anyway so a stale (too slow) estimate recovers.
+BUDGET_PROBE_INTERVAL_S   = float(os.getenv("BUDGET_PROBE_INTERVAL_S", "60"))
 
 # Per-section blending: mix vector section scores with LLM section scores
 BLEND_SECTION_SCORES = True
@@ -49,6 +104,71 @@ LLM_SECTION_ALPHA    = 0.50
 # Retrieval sizes
 DEFAULT_TOP_K_PER_SECTION = 30
 
+# Retrieval mode:
+#   "sections"  -> one filtered Pinecone query per scope (default)
+#   "two_stage" -> recall candidates once with the seeker's `full` vector, bulk-fetch their
+#                  section vectors and score every section exactly (no 0s for top-k misses)
+RETRIEVAL_MODE      = os.getenv("MATCHER_RETRIEVAL_MODE", "sections").lower()
+TWO_STAGE_RECALL_MULT = int(os.getenv("MATCHER_RECALL_MULT", "4"))  # recall top_k * mult posts
+TWO_STAGE_RECALL_MAX  = 1000  # Pinecone top_k ceiling when metadata is included
+FETCH_CHUNK           = 100   # ids per INDEX.fetch call
+
+# Hybrid sparse+dense retrieval against job_posts (Pinecone only; the index must use the dotproduct
+# metric). Post vectors carry BM25 sparse_values from the embed worker; with MATCHER_HYBRID=1 each
+# section query (and the two-stage `full` recall) also sends the seeker's section text encoded with
+# the same BM25 params (bm25_store), weighted convexly: dense * alpha + sparse * (1 - alpha).
+# MATCHER_HYBRID_ALPHA: "0.8" for every scope, or per scope, e.g. "skills=0.6,licenses=0.6,default=0.85".
+# alpha=1 keeps a scope dense-only.
+HYBRID_ENABLE = os.getenv("MATCHER_HYBRID", "0") == "1"
+
+def _parse_scope_alphas(spec: str) -> Dict[str, float]:
+    out: Dict[str, float] = {"default": 1.0}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, _, val = part.rpartition("=")
+        try:
+            out[key.strip() or "default"] = min(1.0, max(0.0, float(val)))
+        except ValueError:
+            print(f"[WARN] ignoring MATCHER_HYBRID_ALPHA entry {part!r}")
+    return out
+
+HYBRID_ALPHA = _parse_scope_alphas(os.getenv("MATCHER_HYBRID_ALPHA", "skills=0.7,licenses=0.7,default=0.85"))
+
+# Ranking result cache: keyed by (seeker embedding_checksum, post-corpus version, weights,
+# min_sections, top_k, ...). Memory LRU+TTL, plus the CACHE_DB_PATH SQLite file when set.
+RANK_CACHE_ENABLE  = os.getenv("RANK_CACHE_ENABLE", "1") == "1"
+RANK_CACHE_TTL_S   = float(os.getenv("RANK_CACHE_TTL_S", "900"))
+RANK_CACHE_MAX     = int(os.getenv("RANK_CACHE_MAX", "512"))
+
+# Job-post row cache for _fetch_posts_map. Entries are validated against the version the vector
+# metadata reports for each post (updated_at + embedding_checksum), with a TTL as a backstop for
+# edits that don't re-embed. Misses fetch only JOB_POST_COLUMNS (the full row when details are requested).
+# The default projection is every field the reranker text, judge context and penalties read; if the
+# table lacks one of them the fetch falls back to "*" for the rest of the process.
+POST_CACHE_ENABLE    = os.getenv("POST_CACHE_ENABLE", "1") == "1"
+POST_CACHE_TTL_S     = float(os.getenv("POST_CACHE_TTL_S", "600"))
+POST_CACHE_MAX       = int(os.getenv("POST_CACHE_MAX", "20000"))
+POST_CACHE_MAX_BYTES = int(os.getenv("POST_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_POST_READ_FIELDS = (
+    "job_post_id", "job_title", "title", "company", "employer", "job_overview", "job_skills",
+    "job_experience", "job_education", "job_licenses_certifications", "job_location", "location",
+    "seniority", "updated_at", "embedding_checksum",
+)
+JOB_POST_COLUMNS = os.getenv("JOB_POST_COLUMNS", ",".join(_POST_READ_FIELDS))
+
+# Reverse matching (post -> seekers) caches per post embedding_checksum + seeker-corpus version
+SEEKER_CORPUS = "job_seekers"  # corpus_version() counter the embed worker bumps on seeker upserts
+
+# Embed queues (same env as the embed worker); their newest processed_at versions the corpora
+# across processes when CACHE_DB_PATH is not set
+EMBED_QUEUE_TABLE_SEEKER = os.getenv("EMBED_QUEUE_TABLE_SEEKER", "embedding_queue")
+EMBED_QUEUE_TABLE_POST   = os.getenv("EMBED_QUEUE_TABLE_POST", "embedding_queue_post")
+
+# Concurrent retrieval: per-section queries (and seeker prefetches) share one bounded pool
+RETRIEVAL_MAX_WORKERS = int(os.getenv("MATCHER_RETRIEVAL_WORKERS", "8"))
+
 # ---------------- STRONGER CALIBRATION (HARSHER) -------------------
 # Push mid cosines down: steeper S-curve + right shift
 CAL_K = 16.0
@@ -58,7 +178,11 @@ CAL_M = 0.72
 
 def _require_env() -> None:
     missing = []
-    for k in ("PINECONE_API_KEY", "PINECONE_INDEX", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY"):
+    required = ["SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY"]
+    # A local backend serving from a snapshot never talks to Pinecone
+    if not (vector_index.enabled() and vector_index.LOCAL_INDEX_PATH):
+        required = ["PINECONE_API_KEY", "PINECONE_INDEX"] + required
+    for k in required:
         if not os.getenv(k):
             missing.append(k)
 
@@ -77,20 +201,69 @@ _PC = None
 _INDEX = None
 _SB = None
 _CE = None  # cross encoder (lazy)
+_POOL: Optional[ThreadPoolExecutor] = None  # retrieval pool (lazy)
+_POOL_LOCK = threading.Lock()
+_LLM_POOL: Optional[ThreadPoolExecutor] = None  # judge shard pool (lazy)
+_RANK_CACHE = LRUTTLCache(max_entries=RANK_CACHE_MAX, ttl_s=RANK_CACHE_TTL_S)
+_PAIR_CACHE = LRUTTLCache(max_entries=RERANK_CACHE_MAX)
+_POST_COLUMNS_OK = True  # False once the projection was rejected (missing column) -> select "*"
+_POST_CACHE = LRUTTLCache(
+    max_entries=POST_CACHE_MAX,
+    ttl_s=POST_CACHE_TTL_S,
+    max_bytes=POST_CACHE_MAX_BYTES,
+    sizeof=lambda entry: len(json.dumps(entry[2], ensure_ascii=False, default=str)),
+)
+
+def _get_pinecone_index():
+    """Create and cache the Pinecone index handle lazily."""
+    global _PC, _INDEX
+    if _INDEX is None:
+        from pinecone import Pinecone
+        _PC = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        _INDEX = _PC.Index(os.getenv("PINECONE_INDEX"))
+    return _INDEX
+
+def _get_index():
+    """
+    Vector backend for retrieval, chosen by MATCHER_VECTOR_BACKEND:
+    "pinecone" (default) or "local" (in-process float32 index, see vector_index.py).
+    Both expose the same query/fetch surface.
+    """
+    if vector_index.enabled():
+        return vector_index.get_local_index()
+    return _get_pinecone_index()
 
 def _get_clients():
-    """Create and cache Pinecone index + Supabase client lazily."""
-    global _PC, _INDEX, _SB
-    if _INDEX is not None and _SB is not None:
-        return _INDEX, _SB
-
-    from pinecone import Pinecone
-    from supabase import create_client
+    """Create and cache the vector index + Supabase client lazily."""
+    global _SB
+    if _SB is None:
+        from supabase import create_client
+        _SB = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    return _get_index(), _SB
+
+vector_index.configure_warm_source(_get_pinecone_index, (SEEKER_NS, POST_NS))
+seeker_snapshot.configure_client(lambda: _get_clients()[1])
+
+def _embed_queue_version(table: str) -> int:
+    """Newest processed_at in an embed queue (unix microseconds): advances whenever the worker
+    writes vectors, so it versions the corpus across processes without CACHE_DB_PATH."""
+    _, SB_real = _get_clients()
+    res = (
+        SB_real.table(table)
+        .select("processed_at")
+        .not_.is_("processed_at", "null")
+        .order("processed_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    ts = ((res.data or [{}])[0] or {}).get("processed_at")
+    if not ts:
+        return 0
+    dt = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+    return int((dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp() * 1_000_000)
 
-    _PC = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    _INDEX = _PC.Index(os.getenv("PINECONE_INDEX"))
-    _SB = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
-    return _INDEX, _SB
+register_corpus_source("job_posts", lambda: _embed_queue_version(EMBED_QUEUE_TABLE_POST))
+register_corpus_source(SEEKER_CORPUS, lambda: _embed_queue_version(EMBED_QUEUE_TABLE_SEEKER))
 
 class _SBProxy:
     def __getattr__(self, name: str):
@@ -98,59 +271,333 @@ class _SBProxy:
         return getattr(sb, name)
 SB = _SBProxy()
 
-# ========================= RETRIEVAL LAYER =========================
+def _get_pool() -> ThreadPoolExecutor:
+    """Shared bounded executor for concurrent Pinecone/Supabase round-trips."""
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(
+                max_workers=max(1, RETRIEVAL_MAX_WORKERS),
+                thread_name_prefix="matcher-io",
+            )
+    return _POOL
+
+def _get_llm_pool() -> ThreadPoolExecutor:
+    """Separate executor for judge shards so slow LLM calls never starve retrieval I/O."""
+    global _LLM_POOL
+    if _LLM_POOL is not None:
+        return _LLM_POOL
+    with _POOL_LOCK:
+        if _LLM_POOL is None:
+            _LLM_POOL = ThreadPoolExecutor(
+                max_workers=max(1, LLM_JUDGE_POOL_WORKERS, LLM_JUDGE_MAX_CONCURRENCY),
+                thread_name_prefix="matcher-llm",
+            )
+    return _LLM_POOL
 
-def get_seeker_vectors(job_seeker_id: str, scopes: Iterable[str] = VALID_SCOPES) -> Dict[str, List[float]]:
-    """Fetch the seeker's per-section vectors from Pinecone."""
-    INDEX, _ = _get_clients()
-    ids = [f"{job_seeker_id}:{s}" for s in scopes]
-    fetch_res = INDEX.fetch(ids=ids, namespace=SEEKER_NS)
+# ========================= RETRIEVAL LAYER =========================
 
+def _fetch_vectors(
+    ids: List[str],
+    namespace: str,
+    metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, List[float]]:
+    """Fetch vectors by id (chunked; chunks run concurrently). Returns id -> values; fills
+    `metadata` (id -> vector metadata) when given."""
+    if not ids:
+        return {}
+    INDEX = _get_index()
     out: Dict[str, List[float]] = {}
 
     def _add(vid: Optional[str], vobj: Any):
         if not vid:
             vid = (vobj.get("id") if isinstance(vobj, dict) else getattr(vobj, "id", None))
-        if not vid or ":" not in vid:
-            return
-        scope = vid.split(":", 1)[1]
-        if scope not in VALID_SCOPES:
+        if not vid:
             return
         vals = (vobj.get("values") if isinstance(vobj, dict) else getattr(vobj, "values", None)) or []
         if vals:
-            out[scope] = list(vals)
-
-    vectors_obj = getattr(fetch_res, "vectors", None)
-    if isinstance(vectors_obj, dict):
-        for vid, v in vectors_obj.items():
-            _add(vid, v)
-    elif isinstance(vectors_obj, list):
-        for v in vectors_obj:
-            _add(None, v)
-    elif isinstance(fetch_res, dict):
-        v = fetch_res.get("vectors", {})
-        if isinstance(v, dict):
-            for vid, vv in v.items():
-                _add(vid, vv)
-        elif isinstance(v, list):
-            for vv in v:
-                _add(None, vv)
+            out[vid] = list(vals)
+            if metadata is not None:
+                metadata[vid] = (vobj.get("metadata") if isinstance(vobj, dict) else getattr(vobj, "metadata", None)) or {}
+
+    def _collect(fetch_res: Any):
+        vectors_obj = getattr(fetch_res, "vectors", None)
+        if isinstance(vectors_obj, dict):
+            for vid, v in vectors_obj.items():
+                _add(vid, v)
+        elif isinstance(vectors_obj, list):
+            for v in vectors_obj:
+                _add(None, v)
+        elif isinstance(fetch_res, dict):
+            v = fetch_res.get("vectors", {})
+            if isinstance(v, dict):
+                for vid, vv in v.items():
+                    _add(vid, vv)
+            elif isinstance(v, list):
+                for vv in v:
+                    _add(None, vv)
+
+    chunks = [ids[i:i+FETCH_CHUNK] for i in range(0, len(ids), FETCH_CHUNK)]
+    if len(chunks) == 1:
+        _collect(INDEX.fetch(ids=chunks[0], namespace=namespace))
+    else:
+        pool = _get_pool()
+        for fut in [pool.submit(INDEX.fetch, ids=c, namespace=namespace) for c in chunks]:
+            _collect(fut.result())
     return out
 
-def _query_section(scope: str, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
-    """Query job_posts for one section vector."""
+def get_seeker_vectors(
+    job_seeker_id: str,
+    scopes: Iterable[str] = VALID_SCOPES,
+    checksum: Optional[str] = None,
+) -> Dict[str, List[float]]:
+    """
+    Fetch the seeker's per-section vectors from Pinecone. With the seeker's embedding_checksum,
+    the local seeker vector cache is tried first and filled on a miss.
+    """
+    scopes = tuple(scopes)
+    if checksum and seeker_vector_cache.SEEKER_VEC_CACHE_ENABLE:
+        cached = seeker_vector_cache.get(job_seeker_id, checksum, scopes)
+        metrics.cache_event("seeker_vectors", cached is not None)
+        if cached is not None:
+            return cached
+    fetched = _fetch_vectors([f"{job_seeker_id}:{s}" for s in scopes], SEEKER_NS)
+
+    out: Dict[str, List[float]] = {}
+    for vid, vals in fetched.items():
+        if ":" not in vid:
+            continue
+        scope = vid.split(":", 1)[1]
+        if scope in scopes:
+            out[scope] = vals
+    if checksum and out:
+        seeker_vector_cache.put(job_seeker_id, checksum, out)
+    return out
+
+def _query_section(
+    scope: str,
+    vector: List[float],
+    top_k: int,
+    namespace: str = POST_NS,
+    sparse: Optional[Dict[str, List[Any]]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Query one namespace (job_posts by default) for one section vector. With a BM25 `sparse`
+    query vector the recall is hybrid, convexly weighted by the scope's HYBRID_ALPHA, and the
+    recalled matches are rescored with exact dense cosines (the calibration is tuned for cosine).
+    `filters` (a post_filters.normalize_filters spec) is pushed into the query's metadata
+    filter, so excluded posts never reach aggregation, the reranker or the judge.
+    """
+    global _HYBRID_FAILED
     if not vector:
         return []
-    INDEX, _ = _get_clients()
-    res = INDEX.query(
-        vector=vector,
-        top_k=top_k,
-        namespace=POST_NS,
-        filter={"scope": {"$eq": scope}},
-        include_metadata=True,
-    )
+    INDEX = _get_index()
+    kwargs: Dict[str, Any] = {
+        "vector": vector,
+        "top_k": top_k,
+        "namespace": namespace,
+        "filter": post_filters.pinecone_filter(scope, filters),
+        "include_metadata": True,
+    }
+    if sparse and not _HYBRID_FAILED:
+        dense_w, sparse_w = bm25_store.hybrid_scale(vector, sparse, _hybrid_alpha(scope))
+        try:
+            res = INDEX.query(**{**kwargs, "vector": dense_w, "sparse_vector": sparse_w, "include_values": True})
+            matches = res.get("matches", []) if isinstance(res, dict) else (getattr(res, "matches", None) or [])
+            return _rescore_dense(matches, vector, namespace)
+        except Exception as e:
+            # A cosine-metric index rejects sparse queries (they need dotproduct): stay dense-only
+            # from here on. Anything else falls back for this query only.
+            msg = str(e).lower()
+            if any(w in msg for w in ("sparse", "dotproduct", "metric")):
+                _HYBRID_FAILED = True
+            print(f"[WARN] hybrid query failed, falling back to dense-only retrieval: {e}")
+    res = INDEX.query(**kwargs)
     return res.get("matches", []) if isinstance(res, dict) else (getattr(res, "matches", None) or [])
 
+def _rescore_dense(matches: List[Any], vector: List[float], namespace: str) -> List[Dict[str, Any]]:
+    """Hybrid matches rescored by exact cosine against the dense query vector (best first)."""
+    ids: List[str] = []
+    metas: Dict[str, Any] = {}
+    values: Dict[str, List[float]] = {}
+    for m in matches:
+        mid = (m.get("id") if isinstance(m, dict) else getattr(m, "id", "")) or ""
+        if not mid or mid in metas:
+            continue
+        ids.append(mid)
+        metas[mid] = (m.get("metadata") if isinstance(m, dict) else getattr(m, "metadata", None)) or {}
+        vals = (m.get("values") if isinstance(m, dict) else getattr(m, "values", None)) or []
+        if vals:
+            values[mid] = list(vals)
+    missing = [mid for mid in ids if mid not in values]
+    if missing:
+        values.update(_fetch_vectors(missing, namespace))
+    ids = [mid for mid in ids if mid in values]
+    if not ids:
+        return []
+    sims = _cosine_rows(np.asarray([values[mid] for mid in ids], dtype=np.float32), np.asarray(vector, dtype=np.float32))
+    order = np.argsort(-sims, kind="stable")
+    return [{"id": ids[i], "score": float(sims[i]), "metadata": metas[ids[i]]} for i in order]
+
+def _query_sections(
+    seeker_vecs: Dict[str, List[float]],
+    top_k: int,
+    namespace: str = POST_NS,
+    sparse_by_scope: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Issue all per-section queries concurrently on the retrieval pool.
+    Results are keyed in seeker_vecs order, so aggregation merges exactly as the serial loop did;
+    latency is the slowest single query instead of the sum.
+    """
+    if not seeker_vecs:
+        return {}
+    sparse_by_scope = sparse_by_scope or {}
+    pool = _get_pool()
+    futures = {
+        scope: pool.submit(_query_section, scope, vec, top_k, namespace, sparse_by_scope.get(scope), filters)
+        for scope, vec in seeker_vecs.items()
+    }
+    return {scope: fut.result() for scope, fut in futures.items()}
+
+# ---- hybrid (BM25) query side ----
+
+_HYBRID_FAILED = False  # set once the index rejects sparse queries
+
+def _hybrid_alpha(scope: str) -> float:
+    return HYBRID_ALPHA.get(scope, HYBRID_ALPHA.get("default", 1.0))
+
+def _hybrid_active() -> bool:
+    """Hybrid needs Pinecone (the local index is dense-only), pinecone-text, and an index that accepts it."""
+    return HYBRID_ENABLE and not _HYBRID_FAILED and not vector_index.enabled() and bm25_store.available()
+
+def _bm25_corpus() -> List[str]:
+    """Same corpus the embed worker fits on (used only when no published params file exists)."""
+    _, SB_real = _get_clients()
+    res = SB_real.table("job_post").select("search_document").limit(100000).execute()
+    return [(r.get("search_document") or "") for r in (res.data or [])]
+
+def _seeker_sparse_vectors(job_seeker_id: str, snap: Optional[SeekerSnapshot] = None) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    BM25 query vectors for the seeker's section texts (built like the embed worker's section texts,
+    from the request's job_seeker snapshot), only for scopes whose alpha leaves room for the sparse
+    side. Best-effort: {} on any failure.
+    """
+    snap = snap or seeker_snapshot.current_or_new()
+    try:
+        enc = bm25_store.get_query_encoder(_bm25_corpus)
+        if enc is None:
+            return {}
+        texts = snap.derived(job_seeker_id, "bm25_texts", _seeker_sparse_texts_from_row, {})
+    except Exception as e:
+        print(f"[WARN] seeker sparse vectors unavailable: {e}")
+        return {}
+
+    out: Dict[str, Dict[str, List[Any]]] = {}
+    for scope, text in texts.items():
+        if _hybrid_alpha(scope) < 1.0:
+            sv = bm25_store.encode_query(enc, text)
+            if sv:
+                out[scope] = sv
+    return out
+
+def _seeker_sparse_texts_from_row(row: Dict[str, Any]) -> Dict[str, str]:
+    def _text(v: Any) -> str:
+        return v if isinstance(v, str) else json.dumps(v or [], ensure_ascii=False)
+
+    return {
+        FULL_SCOPE: row.get("search_document") or "",
+        "skills": _text(row.get("skills")),
+        "experience": _text(row.get("experience")),
+        "education": _text(row.get("education")),
+        "licenses": _text(row.get("licenses_certifications")),
+    }
+
+def _cosine_rows(mat: np.ndarray, vec: np.ndarray) -> np.ndarray:
+    """Exact cosine of every row in mat against vec."""
+    denom = np.linalg.norm(mat, axis=1) * float(np.linalg.norm(vec))
+    return (mat @ vec) / np.maximum(denom, 1e-12)
+
+def _two_stage_section_results(
+    seeker_vecs: Dict[str, List[float]],
+    full_vec: List[float],
+    top_k: int,
+    full_sparse: Optional[Dict[str, List[Any]]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Two-stage retrieval:
+      1) One `full`-scope query recalls top_k * TWO_STAGE_RECALL_MULT candidate posts.
+      2) One bulk fetch pulls every recalled post's section vectors.
+      3) Section cosines are computed locally, so each candidate gets a real score per section.
+    Output has the same shape as _query_sections (Pinecone-like matches per scope).
+    """
+    recall_k = max(1, min(TWO_STAGE_RECALL_MAX, int(top_k) * max(1, TWO_STAGE_RECALL_MULT)))
+    # Hybrid recall (when enabled) widens the candidate set lexically; scores below are exact dense cosines
+    # (_query_section already rescored the recall itself the same way)
+    # Filters apply to the recall query, so only admitted posts' section vectors are fetched
+    recalled = _query_section(FULL_SCOPE, full_vec, top_k=recall_k, sparse=full_sparse, filters=filters)
+
+    pids: List[str] = []
+    meta_by_pid: Dict[str, Any] = {}
+    for m in recalled:
+        mid = (m.get("id") if isinstance(m, dict) else getattr(m, "id", "")) or ""
+        if ":" not in mid:
+            continue
+        pid = mid.split(":", 1)[0]
+        if pid not in meta_by_pid:
+            pids.append(pid)
+            meta_by_pid[pid] = (m.get("metadata") if isinstance(m, dict) else getattr(m, "metadata", None)) or {}
+    if not pids:
+        return {}
+
+    post_vecs = _fetch_vectors([f"{pid}:{scope}" for pid in pids for scope in seeker_vecs], POST_NS)
+
+    section_results: Dict[str, List[Dict[str, Any]]] = {}
+    for scope, svec in seeker_vecs.items():
+        rows = [pid for pid in pids if f"{pid}:{scope}" in post_vecs]
+        if not rows or not svec:
+            section_results[scope] = []
+            continue
+        mat = np.asarray([post_vecs[f"{pid}:{scope}"] for pid in rows], dtype=np.float32)
+        sims = _cosine_rows(mat, np.asarray(svec, dtype=np.float32))
+        order = np.argsort(-sims, kind="stable")
+        section_results[scope] = [
+            {"id": f"{rows[i]}:{scope}", "score": float(sims[i]), "metadata": meta_by_pid.get(rows[i], {})}
+            for i in order
+        ]
+    return section_results
+
+def _retrieve_section_results(
+    seeker_vecs: Dict[str, List[float]],
+    top_k: int,
+    full_vec: Optional[List[float]] = None,
+    sparse_by_scope: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Dispatch on RETRIEVAL_MODE; two-stage falls back to per-section queries without a `full` vector."""
+    sparse_by_scope = sparse_by_scope or {}
+    if RETRIEVAL_MODE == "two_stage" and full_vec:
+        return _two_stage_section_results(
+            seeker_vecs, full_vec, top_k, full_sparse=sparse_by_scope.get(FULL_SCOPE), filters=filters
+        )
+    return _query_sections(seeker_vecs, top_k, sparse_by_scope=sparse_by_scope, filters=filters)
+
+def _get_seeker_retrieval_vectors(
+    job_seeker_id: str,
+    checksum: Optional[str] = None,
+) -> Tuple[Dict[str, List[float]], Optional[List[float]]]:
+    """Section vectors plus the `full` vector when the two-stage mode needs it (same single fetch)."""
+    if RETRIEVAL_MODE != "two_stage":
+        return get_seeker_vectors(job_seeker_id, checksum=checksum), None
+    vecs = get_seeker_vectors(job_seeker_id, scopes=VALID_SCOPES + (FULL_SCOPE,), checksum=checksum)
+    full_vec = vecs.pop(FULL_SCOPE, None)
+    return vecs, full_vec
+
 # ==================== CALIBRATION & AGGREGATION ====================
 
 def _clamp(v: float, lo: float = 0.0, hi: float = 100.0) -> float:
@@ -171,50 +618,76 @@ def _effective_weights(weights: Optional[Dict[str, float]]) -> Dict[str, float]:
         out[s] = float(weights.get(s, DEFAULT_WEIGHTS[s]))
     return out
 
+def _calibrate_cosine_array(raw: np.ndarray) -> np.ndarray:
+    """Vectorized _calibrate_cosine_to_100: same clamp, logistic and 2-dp rounding."""
+    s = np.clip(np.asarray(raw, dtype=np.float64), 0.0, 1.0)
+    p = 1.0 / (1.0 + np.exp(-CAL_K * (s - CAL_M)))
+    x = p * 100.0
+    out = np.round(x, 2)
+    # np.exp/np.round may differ from math.exp/round() in the last ulp; that only matters for
+    # values sitting on a 2-dp rounding boundary, so recompute those few exactly.
+    near = np.abs(np.mod(x * 100.0, 1.0) - 0.5) < 1e-6
+    for i in np.flatnonzero(near):
+        out.flat[i] = _calibrate_cosine_to_100(float(s.flat[i]))
+    return out
+
 def _aggregate_scores(
     section_results: Dict[str, List[Dict[str, Any]]],
     weights: Dict[str, float],
     min_sections: int = 1,
 ) -> List[Dict[str, Any]]:
     """
-    Weighted average of the *calibrated* best score per section per job_post.
-    Returns: [{"job_post_id", "confidence", "section_scores"}], sorted desc.
+    Weighted average of the *calibrated* best score per section per job_post (array path).
+    Builds a posts x scopes matrix, calibrates every match in one NumPy pass and applies the
+    weights column by column in VALID_SCOPES order, so output is identical to the per-match
+    reference loop (see test_aggregate_parity). Returns: [{"job_post_id", "confidence", "section_scores"}], sorted desc.
     """
-    per_post: Dict[str, Dict[str, float]] = {}  # pid -> {scope: best_calibrated_score_0..100}
-
-    for scope, matches in section_results.items():
-        for m in matches or []:
+    scopes = list(section_results.keys())
+    row_of: Dict[str, int] = {}  # pid -> row, in first-seen order (keeps tie order stable)
+    rows: List[int] = []
+    cols: List[int] = []
+    raws: List[float] = []
+    for j, scope in enumerate(scopes):
+        for m in section_results[scope] or []:
             mid = m.get("id", "")
             if ":" not in mid:
                 continue
             pid, _ = mid.split(":", 1)
-            raw = float(m.get("score", 0.0))
-            cal = _calibrate_cosine_to_100(raw)
-            bucket = per_post.setdefault(pid, {})
-            bucket[scope] = max(bucket.get(scope, 0.0), cal)
+            rows.append(row_of.setdefault(pid, len(row_of)))
+            cols.append(j)
+            raws.append(float(m.get("score", 0.0)))
+    if not row_of:
+        return []
 
-    ranked: List[Dict[str, Any]] = []
-    min_sections = max(1, int(min_sections))
+    weight_sum = sum(float(weights.get(s, 0.0)) for s in VALID_SCOPES)
+    if weight_sum <= 0:
+        return []
 
-    for pid, section_best in per_post.items():
-        if len(section_best) < min_sections:
-            continue
+    n_posts = len(row_of)
+    r_idx = np.asarray(rows, dtype=np.intp)
+    c_idx = np.asarray(cols, dtype=np.intp)
+    best = np.zeros((n_posts, len(scopes)), dtype=np.float64)
+    np.maximum.at(best, (r_idx, c_idx), _calibrate_cosine_array(np.asarray(raws, dtype=np.float64)))
+    present = np.zeros((n_posts, len(scopes)), dtype=bool)
+    present[r_idx, c_idx] = True
+
+    weighted = np.zeros(n_posts, dtype=np.float64)
+    for scope in VALID_SCOPES:
+        if scope in section_results:  # a missing section scores 0
+            weighted = weighted + float(weights.get(scope, 0.0)) * best[:, scopes.index(scope)]
+    confidence = weighted / weight_sum  # already 0..100 (calibrated per-section)
+    keep = present.sum(axis=1) >= max(1, int(min_sections))
 
-        weight_sum = sum(float(weights.get(s, 0.0)) for s in VALID_SCOPES)
-        if weight_sum <= 0:
+    ranked: List[Dict[str, Any]] = []
+    for pid, i in row_of.items():
+        if not keep[i]:
             continue
-
-        weighted = 0.0
-        for scope in VALID_SCOPES:
-            w = float(weights.get(scope, 0.0))
-            score_cal = float(section_best.get(scope, 0.0))  # 0 if section missing
-            weighted += w * score_cal
-
-        confidence = weighted / weight_sum  # already 0..100 (calibrated per-section)
         ranked.append({
             "job_post_id": pid,
-            "confidence": round(confidence, 2),
-            "section_scores": {k: round(v, 2) for k, v in section_best.items()},
+            "confidence": round(float(confidence[i]), 2),
+            "section_scores": {
+                scope: round(float(best[i, j]), 2) for j, scope in enumerate(scopes) if present[i, j]
+            },
         })
 
     ranked.sort(key=lambda d: d["confidence"], reverse=True)
@@ -228,6 +701,13 @@ def _get_cross_encoder():
         return _CE
     if not RERANK_ENABLE:
         return None
+    if RERANK_BACKEND == "onnx":
+        try:
+            from .onnx_reranker import OnnxCrossEncoder
+            _CE = OnnxCrossEncoder(RERANK_MODEL)
+            return _CE
+        except Exception as e:
+            print(f"[WARN] ONNX reranker unavailable, falling back to torch: {e}")
     try:
         from sentence_transformers import CrossEncoder
         _CE = CrossEncoder(RERANK_MODEL)  # downloads on first use
@@ -235,6 +715,68 @@ def _get_cross_encoder():
     except Exception:
         return None
 
+def _rerank_scores(ce: Any, pairs: List[Tuple[str, str]]) -> List[float]:
+    """Cross-encoder scores for pairs; routed through the shared micro-batcher when enabled."""
+    t0 = time.perf_counter()
+    if reranker_service.RERANK_MICROBATCH:
+        scores = reranker_service.get_batch_reranker(ce).predict(pairs)
+    else:
+        scores = [float(s) for s in ce.predict(pairs)]
+    if pairs:
+        _observe_latency("rerank_pair", (time.perf_counter() - t0) * 1000.0 / len(pairs))
+    return scores
+
+def _reranker_model_id(ce: Any) -> str:
+    """Identifies the scorer: model + backend (+ the exact ONNX file, since int8 scores differ)."""
+    onnx_path = getattr(ce, "onnx_path", None)
+    return f"{RERANK_MODEL}|{os.path.basename(onnx_path)}" if onnx_path else f"{RERANK_MODEL}|torch"
+
+def _text_digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _cached_rerank_scores(ce: Any, pairs: List[Tuple[str, str]]) -> List[float]:
+    """_rerank_scores with a pair-score cache in front; only uncached pairs are predicted."""
+    if not RERANK_CACHE_ENABLE:
+        return _rerank_scores(ce, pairs)
+
+    model_id = _reranker_model_id(ce)
+    digests: Dict[str, str] = {}  # memoize: the seeker text repeats for every pair
+    for text in {t for pair in pairs for t in pair}:
+        digests[text] = _text_digest(text)
+    keys = [f"{model_id}|{digests[a]}|{digests[b]}" for a, b in pairs]
+
+    scores: Dict[str, float] = {}
+    for k in keys:
+        v = _PAIR_CACHE.get(k)
+        if v is not None:
+            scores[k] = v
+
+    store = sqlite_store("rerank_pairs")
+    if store is not None and len(scores) < len(keys):
+        try:
+            for k, v in store.get_many([k for k in keys if k not in scores]).items():
+                scores[k] = float(v)
+                _PAIR_CACHE.set(k, float(v))
+        except Exception as e:
+            print(f"[WARN] rerank pair cache read failed: {e}")
+
+    miss_idx = [i for i, k in enumerate(keys) if k not in scores]
+    metrics.cache_event("rerank_pairs", True, len(keys) - len(miss_idx))
+    metrics.cache_event("rerank_pairs", False, len(miss_idx))
+    if miss_idx:
+        fresh = _rerank_scores(ce, [pairs[i] for i in miss_idx])
+        new_items = {keys[i]: float(v) for i, v in zip(miss_idx, fresh)}
+        for k, v in new_items.items():
+            _PAIR_CACHE.set(k, v)
+        scores.update(new_items)
+        if store is not None:
+            try:
+                store.set_many(new_items)
+            except Exception as e:
+                print(f"[WARN] rerank pair cache write failed: {e}")
+
+    return [scores[k] for k in keys]
+
 def _minmax_to_0_100(vals: List[float]) -> List[float]:
     if not vals:
         return []
@@ -244,23 +786,12 @@ def _minmax_to_0_100(vals: List[float]) -> List[float]:
         return [50.0 for _ in vals]
     return [ (v - vmin) / (vmax - vmin) * 100.0 for v in vals ]
 
-def _get_seeker_text(job_seeker_id: str) -> str:
-    _, SB_real = _get_clients()
-    cols = "full_name, email, skills, experience, education, licenses_certifications"
-    try:
-        resp = (
-            SB_real.table("job_seeker")
-            .select(cols)
-            .eq("job_seeker_id", job_seeker_id)
-            .limit(1)
-            .execute()
-        )
-    except Exception:
-        return ""
-    if not resp.data:
-        return ""
-    row = resp.data[0] or {}
+def _get_seeker_text(job_seeker_id: str, snap: Optional[SeekerSnapshot] = None) -> str:
+    """Reranker query text, derived once from the request's job_seeker snapshot."""
+    snap = snap or seeker_snapshot.current_or_new()
+    return snap.derived(job_seeker_id, "rerank_text", _seeker_text_from_row, "")
 
+def _seeker_text_from_row(row: Dict[str, Any]) -> str:
     def _coerce_list(x) -> List[str]:
         if x is None: return []
         if isinstance(x, list): return [str(t).strip() for t in x if str(t).strip()]
@@ -321,26 +852,41 @@ def _get_post_text(post_row: Dict[str, Any]) -> str:
         parts.append("Licenses/Certs: " + _str(post_row.get("job_licenses_certifications")))
     return " | ".join(parts)
 
-def _apply_reranker(job_seeker_id: str, ranked: List[Dict[str, Any]], posts_map: Dict[str, Any]) -> List[Dict[str, Any]]:
+def _apply_reranker(
+    job_seeker_id: str,
+    ranked: List[Dict[str, Any]],
+    posts_map: Dict[str, Any],
+    seeker_text: Optional[str] = None,
+    top_k: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     if not RERANK_ENABLE or not ranked:
         return ranked
     ce = _get_cross_encoder()
     if ce is None:
         return ranked
 
-    seeker_text = _get_seeker_text(job_seeker_id)
+    if seeker_text is None:
+        seeker_text = _get_seeker_text(job_seeker_id)
     if not seeker_text:
         return ranked
 
-    top = ranked[: max(1, min(RERANK_TOP_K, len(ranked)))]
+    top = ranked[: max(1, min(RERANK_TOP_K if top_k is None else top_k, len(ranked)))]
     pairs: List[Tuple[str, str]] = []
     for r in top:
         post_row = posts_map.get(r["job_post_id"]) or {}
         post_text = _get_post_text(post_row) or str(post_row or "")
         pairs.append((seeker_text, post_text))
+    return _blend_rerank(ce, ranked, pairs)
 
+def _blend_rerank(ce: Any, ranked: List[Dict[str, Any]], pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Blend cross-encoder scores for the first len(pairs) rows of `ranked` into their confidence
+    (min-max to 0..100, RERANK_ALPHA toward the vector score), then re-sort. Pairs are always
+    (seeker text, post text), whichever side is the query, so scores and the pair cache are shared.
+    """
+    top = ranked[: len(pairs)]
     try:
-        scores = ce.predict(pairs).tolist()  # type: ignore[attr-defined]
+        scores = _cached_rerank_scores(ce, pairs)
     except Exception:
         return ranked
 
@@ -376,17 +922,64 @@ def _stringify(x: Any) -> str:
     except Exception:
         return str(x)
 
-def _fetch_posts_map(pids: List[str]) -> Dict[str, Dict[str, Any]]:
+def _post_versions(section_results: Dict[str, List[Any]]) -> Dict[str, Tuple[Any, Any]]:
+    """job_post_id -> (updated_at, embedding_checksum) as recorded in the vector metadata."""
+    out: Dict[str, Tuple[Any, Any]] = {}
+    for matches in section_results.values():
+        for m in matches or []:
+            meta = (m.get("metadata") if isinstance(m, dict) else getattr(m, "metadata", None)) or {}
+            pid = meta.get("job_post_id")
+            if pid and str(pid) not in out and (meta.get("updated_at") or meta.get("embedding_checksum")):
+                out[str(pid)] = (meta.get("updated_at"), meta.get("embedding_checksum"))
+    return out
+
+def _fetch_posts_map(
+    pids: List[str],
+    versions: Optional[Dict[str, Tuple[Any, Any]]] = None,
+    full: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    job_post rows by id. Served from _POST_CACHE when the cached entry was fetched under the same
+    metadata version (versions[pid]); misses select JOB_POST_COLUMNS, or "*" when full=True.
+    Returned rows are shallow copies, safe to attach to results.
+    """
     if not pids:
         return {}
-    _, SB_real = _get_clients()
+    versions = versions or {}
     details_map: Dict[str, Any] = {}
+    missing: List[str] = []
+    for pid in dict.fromkeys(pids):
+        entry = _POST_CACHE.get(pid) if POST_CACHE_ENABLE else None
+        # entry = (version, is_full_row, row); an unknown version never validates a cached row
+        if entry is not None and entry[0] is not None and entry[0] == versions.get(pid) and (entry[1] or not full):
+            details_map[pid] = dict(entry[2])
+        else:
+            missing.append(pid)
+    if POST_CACHE_ENABLE:
+        metrics.cache_event("job_post", True, len(details_map))
+        metrics.cache_event("job_post", False, len(missing))
+    if not missing:
+        return details_map
+
+    global _POST_COLUMNS_OK
+    _, SB_real = _get_clients()
     CHUNK = 200
-    for i in range(0, len(pids), CHUNK):
-        chunk = pids[i:i+CHUNK]
-        resp = SB_real.table("job_post").select("*").in_("job_post_id", chunk).execute()
+    for i in range(0, len(missing), CHUNK):
+        chunk = missing[i:i+CHUNK]
+        full_row = full or not _POST_COLUMNS_OK
+        try:
+            resp = SB_real.table("job_post").select("*" if full_row else JOB_POST_COLUMNS).in_("job_post_id", chunk).execute()
+        except Exception as e:
+            if full_row:
+                raise
+            print(f"[WARN] job_post projection rejected, selecting full rows from now on: {e}")
+            _POST_COLUMNS_OK, full_row = False, True
+            resp = SB_real.table("job_post").select("*").in_("job_post_id", chunk).execute()
         for row in (resp.data or []):
-            details_map[str(row.get("job_post_id"))] = row
+            pid = str(row.get("job_post_id"))
+            details_map[pid] = row
+            if POST_CACHE_ENABLE:
+                _POST_CACHE.set(pid, (versions.get(pid), full_row, dict(row)))
     return details_map
 
 def _build_job_context(post: Dict[str, Any]) -> Dict[str, Any]:
@@ -403,19 +996,18 @@ def _build_job_context(post: Dict[str, Any]) -> Dict[str, Any]:
         "experience_req": _stringify(post.get("job_experience")),
         "education_req":  _stringify(post.get("job_education")),
         "licenses_req":   _stringify(post.get("job_licenses_certifications")),
-        "location":    post.get("location") or "",
+        "location":    post.get("job_location") or post.get("location") or "",
         "seniority":   post.get("seniority") or "",
         "education_required": education_required,
         "license_required":   license_required,
     }
 
-def _fetch_seeker_context(job_seeker_id: str) -> Dict[str, Any]:
-    _, SB_real = _get_clients()
-    projection = "full_name,email,skills,experience,education,licenses_certifications,search_document"
-    resp = SB_real.table("job_seeker").select(projection).eq("job_seeker_id", job_seeker_id).limit(1).execute()
-    if not resp.data:
-        return {}
-    row = resp.data[0] or {}
+def _fetch_seeker_context(job_seeker_id: str, snap: Optional[SeekerSnapshot] = None) -> Dict[str, Any]:
+    """LLM judge seeker context, derived once from the request's job_seeker snapshot."""
+    snap = snap or seeker_snapshot.current_or_new()
+    return snap.derived(job_seeker_id, "llm_context", _seeker_context_from_row, {})
+
+def _seeker_context_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "full_name": row.get("full_name") or "",
         "email": row.get("email") or "",
@@ -435,6 +1027,141 @@ def _select_provider() -> str:
         return "gemini"
     raise RuntimeError("No LLM key configured")
 
+# Static judge prompt: system text + instructions + response schema, sent as the system message
+# so it is a byte-identical prefix on every call (eligible for provider-side prompt caching).
+# Only the seeker and jobs go in the user message.
+_JUDGE_SYSTEM = (
+    "You are an expert technical recruiter and hiring manager acting as a STRICT job-matching judge. "
+    "Score realistically on a 0–100 scale for each section (skills, experience, education, licenses) and an overall score. "
+    "Reason with context, not just keywords. Make sure to triple check and recalculate before sending in the final scores. "
+    "OUTPUT ONLY valid JSON and match the provided response_schema_hint exactly—no prose, no markdown, no extra keys.\n\n"
+    "Scoring principles (be conservative and evidence-based):\n"
+    "Add a deduction of appropriate points if the entire list of skills, licenses, experiences, and certificates of the job seeker are nowhere related to the job post requirements. For example, the skills of a carpenter must not reach 10% to the confidence score of tech jobs. Use this for other test cases.\n"
+    "• Prioritize hard/technical requirements (tools, frameworks, languages, platforms, certifications, years, seniority).\n"
+    "• Use deep context alignment: responsibilities, scope/impact, seniority (IC vs lead/manager), domain/industry, and outcomes.\n"
+    "• Synonyms/near-equivalents may count (React ↔ frontend React; Google Cloud ↔ GCP), but generic terms do not.\n"
+    "• Recency matters: recent, hands-on evidence outweighs old or superficial exposure.\n"
+    "• Penalize stack/domain/seniority mismatches and vague or unsubstantiated claims.\n"
+    "• If the job does not require them (flags provided), do not penalize overall; you may keep those section scores low but EXCLUDE them from the overall calculation.\n"
+    "• When evidence is thin or ambiguous, keep scores low and do not guess.\n\n"
+    "Explanations: Provide concise, specific reasons tied to concrete evidence. 1–2 sentences per matched skill, low-jargon.\n\n"
+    "Overall Summary style (IMPORTANT): Produce an 'overall_summary' that reads like a job interviewer’s debrief:\n"
+    "• 3–6 sentences, plain language, professional and candid.\n"
+    "• Start with a one-line verdict (Strong fit / Moderate fit / Weak fit) and why.\n"
+    "• Call out 2–3 concrete strengths tied to the posting.\n"
+    "• Call out 1–2 notable gaps or risks (years, tools, domain, seniority).\n"
+    "• End with a clear next step (e.g., proceed to phone screen / hold for upskilling / reject with rationale).\n"
+)
+
+_JUDGE_SCHEMA_HINT = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "required": ["job_post_id", "section_scores", "overall", "matched_skills", "missing_skills", "domain_mismatch", "overall_summary"],
+        "properties": {
+            "job_post_id": {"type": "string"},
+            "section_scores": {
+                "type": "object",
+                "properties": {
+                    "skills": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "experience": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "education": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "licenses": {"type": "integer", "minimum": 0, "maximum": 100},
+                }
+            },
+            "overall": {"type": "integer", "minimum": 0, "maximum": 100},
+            "matched_skills": {"type": "array", "items": {"type": "string"}},
+            "missing_skills": {"type": "array", "items": {"type": "string"}},
+            "matched_explanations": {"type": "object", "additionalProperties": {"type": "string"}},
+            "domain_mismatch": {"type": "boolean", "description": "True if candidate's domain is completely unrelated to the job"},
+            "overall_summary": {"type": "string"}
+        }
+    }
+}
+
+_JUDGE_INSTRUCTIONS = {
+    "explanation_style": "1–2 sentences per matched skill; simple, specific, low-jargon",
+    "overall_weighting": "Compute overall as ~40% skills, 30% experience, 15% education/licenses; IF education_required=false or license_required=false for a job, exclude that section from the overall weighting.",
+    "strictness": "Be EXTREMELY conservative. Unrelated domains must not exceed 5%. Similar but different domains must not exceed 15%.",
+    "domain_rules": "Set domain_mismatch=true if backgrounds are completely unrelated (e.g., construction worker applying to software dev).",
+    "overall_summary_voice": "Write overall_summary like a job interviewer’s debrief: concise, professional, evidence-based, with a final recommendation."
+}
+
+_JUDGE_SYSTEM_PROMPT: Optional[str] = None
+
+def _judge_system_prompt() -> str:
+    global _JUDGE_SYSTEM_PROMPT
+    if _JUDGE_SYSTEM_PROMPT is None:
+        _JUDGE_SYSTEM_PROMPT = (
+            _JUDGE_SYSTEM
+            + "\nInput: a JSON object {\"seeker\": {...}, \"jobs\": [...]}. Long job and seeker text may be "
+            "abridged (marked with …); do not treat abridged text as missing evidence.\n"
+            + "Instructions: " + json.dumps(_JUDGE_INSTRUCTIONS, ensure_ascii=False, separators=(",", ":")) + "\n"
+            + "response_schema_hint: " + json.dumps(_JUDGE_SCHEMA_HINT, ensure_ascii=False, separators=(",", ":"))
+        )
+    return _JUDGE_SYSTEM_PROMPT
+
+_PROMPT_TOKENS = metrics.histogram(
+    "llm_prompt_tokens", "Prompt tokens per LLM call (part = system|user|raw_user|provider|provider_cached)",
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+)
+
+def _record_prompt_tokens(system: str, user: str, seeker_ctx: Dict[str, Any],
+                          jobs_ctx: List[Dict[str, Any]], usage: Dict[str, Optional[int]]) -> None:
+    """Log/measure judge prompt size: local counts, the uncompacted baseline and provider-reported usage."""
+    sys_t = context_compactor.count_tokens(system)
+    user_t = context_compactor.count_tokens(user)
+    raw_t = context_compactor.count_tokens(json.dumps({"seeker": seeker_ctx, "jobs": jobs_ctx}, ensure_ascii=False)) \
+        if LLM_COMPACT_CONTEXT else user_t
+    for part, n in (("system", sys_t), ("user", user_t), ("raw_user", raw_t),
+                    ("provider", usage.get("prompt")), ("provider_cached", usage.get("cached"))):
+        if n is not None:
+            _PROMPT_TOKENS.observe(n, component="matcher", part=part)
+    print(f"[INFO] judge prompt: jobs={len(jobs_ctx)} system={sys_t} user={user_t} (uncompacted {raw_t}) "
+          f"provider_prompt={usage.get('prompt')} cached={usage.get('cached')}")
+
+def _judge_user_message(seeker_ctx: Dict[str, Any], jobs_ctx: List[Dict[str, Any]]) -> str:
+    seeker_payload, jobs_payload = seeker_ctx, jobs_ctx
+    if LLM_COMPACT_CONTEXT:
+        seeker_payload = context_compactor.compact_seeker(seeker_ctx)
+        jobs_payload = [context_compactor.compact_job(c) for c in jobs_ctx]
+    return json.dumps({"seeker": seeker_payload, "jobs": jobs_payload}, ensure_ascii=False, separators=(",", ":"))
+
+def _gemini_judge_model(system: str) -> Any:
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai.GenerativeModel(
+        GEMINI_MODEL,
+        generation_config={"temperature": 0.2, "response_mime_type": "application/json"},
+        system_instruction=system,
+    )
+
+def _openai_judge_kwargs(system: str, text: str) -> Dict[str, Any]:
+    return {
+        "model": OPENAI_MODEL,
+        "temperature": 0.2,
+        "response_format": {"type": "json_object"},
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": text},
+        ],
+    }
+
+def _gemini_output(resp: Any) -> Tuple[str, Dict[str, Optional[int]]]:
+    meta = getattr(resp, "usage_metadata", None)
+    return (resp.text or "").strip(), {
+        "prompt": getattr(meta, "prompt_token_count", None),
+        "cached": getattr(meta, "cached_content_token_count", None),
+    }
+
+def _openai_output(resp: Any) -> Tuple[str, Dict[str, Optional[int]]]:
+    u = getattr(resp, "usage", None)
+    details = getattr(u, "prompt_tokens_details", None)
+    return (resp.choices[0].message.content or "").strip(), {
+        "prompt": getattr(u, "prompt_tokens", None),
+        "cached": getattr(details, "cached_tokens", None),
+    }
+
 def _llm_score_candidates(seeker_ctx: Dict[str, Any], jobs_ctx: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Strict, context-aware LLM scoring for top candidates.
@@ -442,96 +1169,32 @@ def _llm_score_candidates(seeker_ctx: Dict[str, Any], jobs_ctx: List[Dict[str, A
     matched_skills, missing_skills, matched_explanations, notes.
     """
     provider = _select_provider()
-
-    SYSTEM = (
-        "You are an expert technical recruiter and hiring manager acting as a STRICT job-matching judge. "
-        "Score realistically on a 0–100 scale for each section (skills, experience, education, licenses) and an overall score. "
-        "Reason with context, not just keywords. Make sure to triple check and recalculate before sending in the final scores. "
-        "OUTPUT ONLY valid JSON and match the provided response_schema_hint exactly—no prose, no markdown, no extra keys.\n\n"
-        "Scoring principles (be conservative and evidence-based):\n"
-        "Add a deduction of appropriate points if the entire list of skills, licenses, experiences, and certificates of the job seeker are nowhere related to the job post requirements. For example, the skills of a carpenter must not reach 10% to the confidence score of tech jobs. Use this for other test cases.\n"
-        "• Prioritize hard/technical requirements (tools, frameworks, languages, platforms, certifications, years, seniority).\n"
-        "• Use deep context alignment: responsibilities, scope/impact, seniority (IC vs lead/manager), domain/industry, and outcomes.\n"
-        "• Synonyms/near-equivalents may count (React ↔ frontend React; Google Cloud ↔ GCP), but generic terms do not.\n"
-        "• Recency matters: recent, hands-on evidence outweighs old or superficial exposure.\n"
-        "• Penalize stack/domain/seniority mismatches and vague or unsubstantiated claims.\n"
-        "• If the job does not require them (flags provided), do not penalize overall; you may keep those section scores low but EXCLUDE them from the overall calculation.\n"
-        "• When evidence is thin or ambiguous, keep scores low and do not guess.\n\n"
-        "Explanations: Provide concise, specific reasons tied to concrete evidence. 1–2 sentences per matched skill, low-jargon.\n\n"
-        "Overall Summary style (IMPORTANT): Produce an 'overall_summary' that reads like a job interviewer’s debrief:\n"
-        "• 3–6 sentences, plain language, professional and candid.\n"
-        "• Start with a one-line verdict (Strong fit / Moderate fit / Weak fit) and why.\n"
-        "• Call out 2–3 concrete strengths tied to the posting.\n"
-        "• Call out 1–2 notable gaps or risks (years, tools, domain, seniority).\n"
-        "• End with a clear next step (e.g., proceed to phone screen / hold for upskilling / reject with rationale).\n"
-    )
-    schema_hint = {
-        "type": "array",
-        "items": {
-            "type": "object",
-            "required": ["job_post_id", "section_scores", "overall", "matched_skills", "missing_skills", "domain_mismatch", "overall_summary"],
-            "properties": {
-                "job_post_id": {"type": "string"},
-                "section_scores": {
-                    "type": "object",
-                    "properties": {
-                        "skills": {"type": "integer", "minimum": 0, "maximum": 100},
-                        "experience": {"type": "integer", "minimum": 0, "maximum": 100},
-                        "education": {"type": "integer", "minimum": 0, "maximum": 100},
-                        "licenses": {"type": "integer", "minimum": 0, "maximum": 100},
-                    }
-                },
-                "overall": {"type": "integer", "minimum": 0, "maximum": 100},
-                "matched_skills": {"type": "array", "items": {"type": "string"}},
-                "missing_skills": {"type": "array", "items": {"type": "string"}},
-                "matched_explanations": {"type": "object", "additionalProperties": {"type": "string"}},
-                "domain_mismatch": {"type": "boolean", "description": "True if candidate's domain is completely unrelated to the job"},
-                "overall_summary": {"type": "string"}
-            }
-        }
-    }
-
-    user_payload = {
-        "seeker": seeker_ctx,
-        "jobs": jobs_ctx,
-        "instructions": {
-            "explanation_style": "1–2 sentences per matched skill; simple, specific, low-jargon",
-            "overall_weighting": "Compute overall as ~40% skills, 30% experience, 15% education/licenses; IF education_required=false or license_required=false for a job, exclude that section from the overall weighting.",
-            "strictness": "Be EXTREMELY conservative. Unrelated domains must not exceed 5%. Similar but different domains must not exceed 15%.",
-            "domain_rules": "Set domain_mismatch=true if backgrounds are completely unrelated (e.g., construction worker applying to software dev).",
-            "overall_summary_voice": "Write overall_summary like a job interviewer’s debrief: concise, professional, evidence-based, with a final recommendation."
-        },
-        "response_schema_hint": schema_hint,
-    }
-
-    text = json.dumps(user_payload, ensure_ascii=False)
+    text = _judge_user_message(seeker_ctx, jobs_ctx)
+    SYSTEM = _judge_system_prompt()
 
     try:
         if provider == "gemini":
-            import google.generativeai as genai
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            model = genai.GenerativeModel(
-                GEMINI_MODEL,
-                generation_config={"temperature": 0.2, "response_mime_type": "application/json"},
-                system_instruction=SYSTEM,
-            )
-            resp = model.generate_content(text)
-            out = (resp.text or "").strip()
+            out, usage = _gemini_output(_gemini_judge_model(SYSTEM).generate_content(text))
         else:
             from openai import OpenAI
             client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            resp = client.chat.completions.create(
-                model=OPENAI_MODEL,
-                temperature=0.2,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": SYSTEM},
-                    {"role": "user", "content": text},
-                ],
-            )
-            out = (resp.choices[0].message.content or "").strip()
+            out, usage = _openai_output(client.chat.completions.create(**_openai_judge_kwargs(SYSTEM, text)))
     except Exception as e:
         raise RuntimeError(f"LLM scoring failed: {e}")
+    return _parse_judge_output(out, SYSTEM, text, seeker_ctx, jobs_ctx, usage)
+
+def _parse_judge_output(
+    out: str,
+    system: str,
+    text: str,
+    seeker_ctx: Dict[str, Any],
+    jobs_ctx: List[Dict[str, Any]],
+    usage: Dict[str, Optional[int]],
+) -> List[Dict[str, Any]]:
+    try:
+        _record_prompt_tokens(system, text, seeker_ctx, jobs_ctx, usage)
+    except Exception as e:
+        print(f"[WARN] prompt token accounting failed: {e}")
 
     try:
         data = json.loads(out)
@@ -547,6 +1210,158 @@ def _llm_score_candidates(seeker_ctx: Dict[str, Any], jobs_ctx: List[Dict[str, A
 
     raise RuntimeError("LLM returned unexpected JSON shape")
 
+def _llm_score_sharded(seeker_ctx: Dict[str, Any], jobs_ctx: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run _llm_score_candidates over shards of LLM_JUDGE_SHARD_SIZE jobs concurrently.
+    Failed shards are logged and dropped; raises only if every shard fails.
+    Returns raw verdicts in shard order (calibration happens on the merged set).
+    """
+    size = max(1, LLM_JUDGE_SHARD_SIZE)
+    shards = [jobs_ctx[i:i+size] for i in range(0, len(jobs_ctx), size)]
+    t0 = time.perf_counter()
+    if len(shards) <= 1:
+        out = _llm_score_candidates(seeker_ctx, jobs_ctx)
+        if jobs_ctx:
+            _observe_latency("judge_job", (time.perf_counter() - t0) * 1000.0 / len(jobs_ctx))
+        return out
+
+    # Per-call bound: a shard is submitted only when one of this request's slots frees up, so
+    # waiting shards hold no pool thread and other requests' shards interleave with ours
+    pool = _get_llm_pool()
+    slots = threading.BoundedSemaphore(max(1, LLM_JUDGE_MAX_CONCURRENCY))
+    futs = []
+    for shard in shards:
+        slots.acquire()
+        fut = pool.submit(_llm_score_candidates, seeker_ctx, shard)
+        fut.add_done_callback(lambda _f: slots.release())
+        futs.append(fut)
+    merged: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    for idx, (shard, fut) in enumerate(zip(shards, futs)):
+        try:
+            merged.extend(fut.result())
+        except Exception as e:
+            errors.append(str(e))
+            print(f"[WARN] LLM judge shard {idx + 1}/{len(shards)} ({len(shard)} jobs) failed: {e}")
+    if len(errors) == len(shards):
+        raise RuntimeError(f"LLM scoring failed for all {len(shards)} shards: {errors[0]}")
+    _observe_latency("judge_job", (time.perf_counter() - t0) * 1000.0 / _judge_units(shards))
+    return merged
+
+# Async judge: shards are awaited concurrently (LLM_JUDGE_MAX_CONCURRENCY per call, as in the sync
+# path, so the latency model is shared) under a process-wide cap on in-flight LLM requests.
+ASYNC_LLM_MAX_INFLIGHT = int(os.getenv("ASYNC_LLM_MAX_INFLIGHT", "256"))
+
+async def _allm_score_candidates(seeker_ctx: Dict[str, Any], jobs_ctx: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Async _llm_score_candidates (AsyncOpenAI / Gemini async); holds no thread while waiting."""
+    provider = _select_provider()
+    text = _judge_user_message(seeker_ctx, jobs_ctx)
+    SYSTEM = _judge_system_prompt()
+    inflight = aio.loop_local("llm_inflight", lambda: asyncio.Semaphore(max(1, ASYNC_LLM_MAX_INFLIGHT)))
+    try:
+        async with inflight:
+            if provider == "gemini":
+                resp = await _gemini_judge_model(SYSTEM).generate_content_async(text)
+                out, usage = _gemini_output(resp)
+            else:
+                from openai import AsyncOpenAI
+                client = aio.loop_local("openai", lambda: AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+                out, usage = _openai_output(await client.chat.completions.create(**_openai_judge_kwargs(SYSTEM, text)))
+    except Exception as e:
+        raise RuntimeError(f"LLM scoring failed: {e}")
+    return _parse_judge_output(out, SYSTEM, text, seeker_ctx, jobs_ctx, usage)
+
+async def _allm_score_sharded(seeker_ctx: Dict[str, Any], jobs_ctx: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Async _llm_score_sharded: same sharding, failure handling and latency observations."""
+    size = max(1, LLM_JUDGE_SHARD_SIZE)
+    shards = [jobs_ctx[i:i+size] for i in range(0, len(jobs_ctx), size)]
+    t0 = time.perf_counter()
+    sem = asyncio.Semaphore(max(1, LLM_JUDGE_MAX_CONCURRENCY))
+
+    async def _one(shard: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async with sem:
+            return await _allm_score_candidates(seeker_ctx, shard)
+
+    results = await asyncio.gather(*(_one(shard) for shard in shards), return_exceptions=True)
+    merged: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    for idx, (shard, res) in enumerate(zip(shards, results)):
+        if isinstance(res, BaseException):
+            if len(shards) == 1:
+                raise res
+            errors.append(str(res))
+            print(f"[WARN] LLM judge shard {idx + 1}/{len(shards)} ({len(shard)} jobs) failed: {res}")
+        else:
+            merged.extend(res)
+    if shards and len(errors) == len(shards):
+        raise RuntimeError(f"LLM scoring failed for all {len(shards)} shards: {errors[0]}")
+    if jobs_ctx:
+        _observe_latency("judge_job", (time.perf_counter() - t0) * 1000.0 / _judge_units(shards))
+    return merged
+
+def _judge_model_name() -> str:
+    return GEMINI_MODEL if _select_provider() == "gemini" else OPENAI_MODEL
+
+def _judge_with_verdict_cache(
+    seeker_ctx: Dict[str, Any],
+    jobs_ctx: List[Dict[str, Any]],
+    seeker_checksum: Optional[str],
+    posts_map: Dict[str, Dict[str, Any]],
+    defer: bool = False,
+) -> Generator[Any, Any, List[Dict[str, Any]]]:
+    """
+    Raw LLM verdicts for jobs_ctx, reusing stored verdicts per
+    (seeker checksum, post, post checksum, model, prompt version).
+    Only uncached pairs are sent to the LLM; fresh verdicts are written back.
+    Returns raw (uncalibrated) verdicts, ready for _calibrate_llm_batch.
+    A pipeline step: use as `judged = yield from _judge_with_verdict_cache(...)` (see _offload).
+    """
+    if not (LLM_VERDICT_CACHE and seeker_checksum):
+        return (yield from _offload(defer, "llm", _llm_score_sharded, seeker_ctx, jobs_ctx))
+
+    model = _judge_model_name()
+    keys: Dict[str, str] = {}
+    for ctx in jobs_ctx:
+        pid = str(ctx.get("job_post_id") or "")
+        post_checksum = (posts_map.get(pid) or {}).get("embedding_checksum")
+        if pid and post_checksum:
+            keys[pid] = llm_verdict_store.verdict_key(
+                seeker_checksum=seeker_checksum,
+                job_post_id=pid,
+                post_checksum=post_checksum,
+                model=model,
+                prompt_version=LLM_PROMPT_VERSION,
+            )
+
+    cached = llm_verdict_store.get_verdicts(keys.values()) if keys else {}
+    misses = [ctx for ctx in jobs_ctx if keys.get(str(ctx.get("job_post_id"))) not in cached]
+    metrics.cache_event("llm_verdict", True, len(jobs_ctx) - len(misses))
+    metrics.cache_event("llm_verdict", False, len(misses))
+
+    fresh_by_pid: Dict[str, Dict[str, Any]] = {}
+    if misses:
+        try:
+            for j in (yield from _offload(defer, "llm", _llm_score_sharded, seeker_ctx, misses)):
+                if isinstance(j, dict) and j.get("job_post_id") is not None:
+                    fresh_by_pid[str(j.get("job_post_id"))] = j
+        except Exception as e:
+            if not cached:
+                raise
+            print(f"[WARN] LLM judge failed for {len(misses)} uncached posts; using {len(cached)} cached verdicts: {e}")
+        llm_verdict_store.put_verdicts(
+            {keys[pid]: v for pid, v in fresh_by_pid.items() if pid in keys},
+            model=model,
+            prompt_version=LLM_PROMPT_VERSION,
+        )
+
+    merged: List[Dict[str, Any]] = []
+    for ctx in jobs_ctx:
+        pid = str(ctx.get("job_post_id"))
+        v = cached.get(keys.get(pid, "")) or fresh_by_pid.get(pid)
+        if v is not None:
+            merged.append({**v, "job_post_id": pid})
+    return merged
+
 # -------------- LLM calibration (normalize to 0..100) --------------
 
 def _calibrate_llm_batch(judged: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
@@ -693,37 +1508,250 @@ def _rescale_sections_uniform(
     f = max(0.0, new_overall / max(1e-6, old_overall))
     return {k: _clamp(round(float(v) * f, 2)) for k, v in sections.items()}
 
+# ========================= RANKING CACHE ==========================
+
+def _fetch_seeker_checksum(job_seeker_id: str, snap: Optional[SeekerSnapshot] = None) -> Optional[str]:
+    row = (snap or seeker_snapshot.current_or_new()).row(job_seeker_id)
+    return (row or {}).get("embedding_checksum")
+
+def _ranking_cache_key(
+    seeker_checksum: str,
+    weights: Dict[str, float],
+    min_sections: int,
+    top_k_per_section: int,
+    include_job_details: bool,
+    filters: Optional[Dict[str, Any]] = None,
+) -> str:
+    payload = {
+        "seeker": seeker_checksum,
+        "corpus": corpus_version(),
+        "weights": {k: round(float(weights.get(k, 0.0)), 6) for k in VALID_SCOPES},
+        "min_sections": int(min_sections),
+        "top_k": int(top_k_per_section),
+        "details": bool(include_job_details),
+        "mode": RETRIEVAL_MODE,
+        "hybrid": HYBRID_ALPHA if _hybrid_active() else None,
+        "filters": filters,  # canonical spec (post_filters.normalize_filters)
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _ranking_cache_get(key: str) -> Optional[List[Dict[str, Any]]]:
+    hit = _RANK_CACHE.get(key)
+    if hit is None:
+        store = sqlite_store("ranking_cache")
+        if store is not None:
+            try:
+                hit = store.get(key)
+            except Exception as e:
+                print(f"[WARN] ranking cache read failed: {e}")
+            if hit is not None:
+                _RANK_CACHE.set(key, hit)
+    # callers mutate result rows; never hand out the cached objects
+    return copy.deepcopy(hit) if hit is not None else None
+
+def _ranking_cache_put(key: str, ranked: List[Dict[str, Any]]) -> None:
+    snapshot = copy.deepcopy(ranked)
+    _RANK_CACHE.set(key, snapshot)
+    store = sqlite_store("ranking_cache")
+    if store is not None:
+        try:
+            store.set(key, snapshot, ttl_s=RANK_CACHE_TTL_S)
+        except Exception as e:
+            print(f"[WARN] ranking cache write failed: {e}")
+
 # ======================== CORE RANKING API ========================
 
-def _collect_candidates(seeker_vecs: Dict[str, List[float]], top_k_per_section: int) -> Dict[str, Dict[str, Any]]:
+_STAGE_OFFLOAD = "offload"  # internal: a pipeline step handed to the async driver
+
+def _offload(defer: bool, kind: str, fn: Any, *args: Any) -> Generator[Any, Any, Any]:
+    """
+    Pipeline step `fn(*args)` of kind "io" | "cpu" | "llm". Run inline by the sync pipeline; with
+    defer=True it is yielded to arank/aiter_rank_posts_for_seeker, which runs it on the matching
+    executor (or awaits the async LLM judge) and resumes the pipeline with the result or error.
+    """
+    if not defer:
+        return fn(*args)
+    return (yield _STAGE_OFFLOAD, (kind, fn, args))
+
+def _collect_candidates(
+    seeker_vecs: Dict[str, List[float]],
+    top_k_per_section: int,
+    full_vec: Optional[List[float]] = None,
+) -> Dict[str, Dict[str, Any]]:
     """
     Per-section queries -> calibration -> weighted aggregation -> ranked list.
     Returns a dict pid -> row {"job_post_id","confidence","section_scores"} ordered later.
     """
     weights_eff = _effective_weights(None)
-    section_results: Dict[str, List[Dict[str, Any]]] = {}
-    for scope, vec in seeker_vecs.items():
-        section_results[scope] = _query_section(scope, vec, top_k=top_k_per_section)
+    section_results = _retrieve_section_results(seeker_vecs, top_k_per_section, full_vec=full_vec)
 
     aggregated = _aggregate_scores(section_results, weights_eff, min_sections=1)
     return {r["job_post_id"]: r for r in aggregated}
 
-def rank_posts_for_seeker(
+# Stage tags yielded by iter_rank_posts_for_seeker (in order; only "final" is guaranteed)
+STAGE_VECTOR   = "vector"     # calibrated weighted aggregation of section similarities
+STAGE_RERANKED = "reranked"   # after the cross-encoder blend (only when RERANK_ENABLE)
+STAGE_FINAL    = "final"      # LLM-blended scores + analysis (or the cached final ranking)
+
+# ========================== LATENCY BUDGET ==========================
+
+_LATENCY_EWMA: Dict[str, float] = {
+    "rerank_pair": BUDGET_RERANK_MS_PER_PAIR,
+    "judge_job":   BUDGET_JUDGE_MS_PER_JOB,
+}
+_LATENCY_SEEN: Dict[str, float] = {}  # key -> monotonic time of the last sample (or probe claim)
+_LATENCY_LOCK = threading.Lock()
+_DEGRADED = metrics.counter("matcher_degraded_total", "Budget-driven stage degradations (action = shrink|skip)")
+
+def _observe_latency(key: str, ms_per_unit: float) -> None:
+    with _LATENCY_LOCK:
+        prev = _LATENCY_EWMA.get(key, ms_per_unit)
+        _LATENCY_EWMA[key] = (1.0 - BUDGET_EWMA_ALPHA) * prev + BUDGET_EWMA_ALPHA * ms_per_unit
+        _LATENCY_SEEN[key] = time.monotonic()
+
+def _judge_units(shards: List[List[Any]]) -> int:
+    """Per-job divisor matching _estimate_judge_ms: waves times the largest shard actually sent."""
+    waves = math.ceil(len(shards) / max(1, LLM_JUDGE_MAX_CONCURRENCY))
+    return max(1, waves * max((len(sh) for sh in shards), default=0))
+
+def _claim_judge_probe() -> bool:
+    """True for one caller once the judge estimate is older than BUDGET_PROBE_INTERVAL_S."""
+    now = time.monotonic()
+    with _LATENCY_LOCK:
+        if now - _LATENCY_SEEN.get("judge_job", -math.inf) < BUDGET_PROBE_INTERVAL_S:
+            return False
+        _LATENCY_SEEN["judge_job"] = now
+        return True
+
+def _estimate_rerank_ms(k: int) -> float:
+    return _LATENCY_EWMA["rerank_pair"] * k
+
+def _estimate_judge_ms(k: int) -> float:
+    """Shards run in waves of LLM_JUDGE_MAX_CONCURRENCY; a wave costs as much as its largest shard."""
+    if k <= 0:
+        return 0.0
+    size = max(1, LLM_JUDGE_SHARD_SIZE)
+    waves = math.ceil(math.ceil(k / size) / max(1, LLM_JUDGE_MAX_CONCURRENCY))
+    return waves * min(k, size) * _LATENCY_EWMA["judge_job"]
+
+def _fit_k(full_k: int, min_k: int, available_ms: float, estimate) -> int:
+    """Largest k <= full_k whose estimate fits available_ms; 0 when even min_k does not fit."""
+    k = full_k
+    while k >= min_k and estimate(k) > available_ms:
+        k -= 1
+    return k if k >= min_k else 0
+
+def _remaining_ms(deadline: Optional[float]) -> float:
+    return math.inf if deadline is None else max(0.0, (deadline - time.perf_counter()) * 1000.0)
+
+def _plan_rerank_k(n_ranked: int, deadline: Optional[float]) -> int:
+    """Rerank window under the deadline; the judge is planned after it, on what is left."""
+    full_k = min(RERANK_TOP_K, n_ranked)
+    if deadline is None:
+        return full_k
+    available = _remaining_ms(deadline) * BUDGET_SAFETY
+    # Keep room for a minimal judge when one is wanted, but never give up the reranker for it
+    reserve = _estimate_judge_ms(min(BUDGET_MIN_JUDGE_K, n_ranked)) if LLM_ENABLE else 0.0
+    if _estimate_rerank_ms(full_k) + reserve <= available:
+        return full_k
+    return _fit_k(full_k, min(BUDGET_MIN_RERANK_K, full_k), available, _estimate_rerank_ms)
+
+def _plan_judge_k(n_ranked: int, deadline: Optional[float]) -> int:
+    full_k = min(LLM_JUDGE_TOP_K, n_ranked)
+    if deadline is None:
+        return full_k
+    available = _remaining_ms(deadline) * BUDGET_SAFETY
+    k = _fit_k(full_k, min(BUDGET_MIN_JUDGE_K, full_k), available, _estimate_judge_ms)
+    if k == 0 and full_k > 0 and available > 0 and _claim_judge_probe():
+        return min(BUDGET_MIN_JUDGE_K, full_k)  # re-measure; reported as a shrink
+    return k
+
+def iter_rank_posts_for_seeker(
     job_seeker_id: str,
     top_k_per_section: int = DEFAULT_TOP_K_PER_SECTION,
     include_job_details: bool = False,
     min_sections: int = 1,  # used in aggregation (stricter coverage)
     weights: Optional[Dict[str, float]] = None,
-) -> List[Dict[str, Any]]:
+    budget_ms: Optional[float] = None,
+    stage_report: Optional[Dict[str, Any]] = None,
+    snapshot: Optional[SeekerSnapshot] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    copy_stages: bool = True,
+) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
     """
-    Hybrid pipeline:
-      1) Per-section Pinecone queries
-      2) Strict calibrated weighted aggregation
-      3) Optional cross-encoder reranker (blends with aggregation)
-      4) LLM judge on top-K: *section-level* fusion, overall from sections, HARSH penalties applied with uniform rescale
+    Hybrid pipeline, yielding (stage, ranking) as each stage completes so callers can
+    render early and refine in place. Intermediate rankings are independent copies; callers
+    that only keep the final stage pass copy_stages=False to skip the copying.
+      1) Per-section Pinecone queries (issued concurrently), or two-stage
+         `full` recall + exact local section cosines (MATCHER_RETRIEVAL_MODE=two_stage)
+      2) Strict calibrated weighted aggregation                      -> "vector"
+      3) Optional cross-encoder reranker (blends with aggregation)    -> "reranked"
+      4) LLM judge on top-K: *section-level* fusion, overall from sections,
+         HARSH penalties applied with uniform rescale                 -> "final"
+    With budget_ms, the reranker window and judge top-K are sized (or skipped) to fit the time
+    left after retrieval. stage_report, when given, is filled with what ran (see _new_stage_report).
+    The job_seeker row is read once, through `snapshot` (default: the request's seeker snapshot);
+    pass it explicitly when the generator is consumed outside the request scope (streaming).
+    `filters` (post_filters.normalize_filters: location, seniority, posted within) is
+    pushed down into the vector queries and is part of the ranking-cache key.
     """
+    yield from _rank_stages(
+        job_seeker_id, top_k_per_section, include_job_details, min_sections, weights,
+        budget_ms, stage_report, snapshot, defer=False, filters=filters, copy_stages=copy_stages,
+    )
+
+def _rank_stages(
+    job_seeker_id: str,
+    top_k_per_section: int,
+    include_job_details: bool,
+    min_sections: int,
+    weights: Optional[Dict[str, float]],
+    budget_ms: Optional[float],
+    stage_report: Optional[Dict[str, Any]],
+    snapshot: Optional[SeekerSnapshot],
+    defer: bool,
+    filters: Optional[Dict[str, Any]] = None,
+    copy_stages: bool = True,
+) -> Iterator[Tuple[str, Any]]:
+    """Body of iter_rank_posts_for_seeker; with defer=True the reranker and judge are _offload steps."""
+    t_start = time.perf_counter()
+    snap = snapshot or seeker_snapshot.current_or_new()
+    deadline = t_start + budget_ms / 1000.0 if budget_ms is not None else None
+    report = stage_report if stage_report is not None else {}
+    report.update(_new_stage_report(budget_ms))
+
+    def _finish(ranked_out: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        report["elapsed_ms"] = round((time.perf_counter() - t_start) * 1000.0, 1)
+        return ranked_out
+
+    # 0) Serve repeat calls from the ranking cache while neither the seeker's embedding nor the
+    #    post corpus has changed (skips retrieval, reranker and LLM judge entirely).
+    cache_key: Optional[str] = None
+    need_checksum = RANK_CACHE_ENABLE or LLM_ENABLE or seeker_vector_cache.SEEKER_VEC_CACHE_ENABLE
+    seeker_checksum = _fetch_seeker_checksum(job_seeker_id, snap) if need_checksum else None
+    if RANK_CACHE_ENABLE:
+        if seeker_checksum:
+            cache_key = _ranking_cache_key(
+                seeker_checksum, _effective_weights(weights), min_sections, top_k_per_section, include_job_details,
+                filters,
+            )
+            cached = _ranking_cache_get(cache_key)
+            metrics.cache_event("ranking", cached is not None)
+            if cached is not None:
+                report["ran"].append("cache")
+                yield STAGE_FINAL, _finish(cached)
+                return
+
+    # Seeker text/context for the reranker and LLM judge don't depend on retrieval:
+    # derive them on the pool (from the snapshot row) so they overlap the Pinecone round-trips below.
+    pool = _get_pool()
+    seeker_text_fut = pool.submit(_get_seeker_text, job_seeker_id, snap) if RERANK_ENABLE else None
+    seeker_ctx_fut = pool.submit(_fetch_seeker_context, job_seeker_id, snap) if LLM_ENABLE else None
+    sparse_fut = pool.submit(_seeker_sparse_vectors, job_seeker_id, snap) if _hybrid_active() else None
+
     # Ensure seeker vectors exist; else enqueue best-effort and return []
-    seeker_vecs = get_seeker_vectors(job_seeker_id)
+    with metrics.timed("matcher", "seeker_vectors"):
+        seeker_vecs, full_vec = _get_seeker_retrieval_vectors(job_seeker_id, seeker_checksum)
     if not seeker_vecs:
         try:
             _, sb = _get_clients()
@@ -733,36 +1761,56 @@ def rank_posts_for_seeker(
 
     # 1–2) Aggregate with stricter calibration
     weights_eff = _effective_weights(weights)
-    section_results: Dict[str, List[Dict[str, Any]]] = {}
-    for scope, vec in seeker_vecs.items():
-        section_results[scope] = _query_section(scope, vec, top_k=top_k_per_section)
-    ranked = _aggregate_scores(section_results, weights_eff, min_sections=min_sections)
+    with metrics.timed("matcher", "retrieval"):
+        section_results = _retrieve_section_results(
+            seeker_vecs, top_k_per_section, full_vec=full_vec,
+            sparse_by_scope=sparse_fut.result() if sparse_fut is not None else None,
+            filters=filters,
+        )
+    with metrics.timed("matcher", "aggregate"):
+        ranked = _aggregate_scores(section_results, weights_eff, min_sections=min_sections)
+    report["ran"].append("vector")
 
     if not ranked:
-        return []
+        yield STAGE_FINAL, _finish([])
+        return
 
     # 3) Fetch job details (for reranker + LLM context)
     pids = [r["job_post_id"] for r in ranked]
-    posts_map = _fetch_posts_map(pids)
-
-    # Cross-encoder reranker (preliminary ordering/boost)
-    ranked = _apply_reranker(job_seeker_id, ranked, posts_map)
+    with metrics.timed("matcher", "fetch_posts"):
+        posts_map = _fetch_posts_map(pids, versions=_post_versions(section_results), full=include_job_details)
 
     # Filter out job posts that do not exist in the job_post table
     valid_post_ids = set(posts_map.keys())
     ranked = [r for r in ranked if r["job_post_id"] in valid_post_ids]
+    yield STAGE_VECTOR, _stage_snapshot(ranked, posts_map, include_job_details) if copy_stages else ranked
+
+    # Cross-encoder reranker (preliminary ordering/boost)
+    rerank_k = _plan_rerank_k(len(ranked), deadline) if RERANK_ENABLE else 0
+    if RERANK_ENABLE and ranked:
+        _note_stage(report, "rerank", rerank_k, min(RERANK_TOP_K, len(ranked)))
+    if rerank_k and ranked:
+        with metrics.timed("matcher", "rerank"):
+            seeker_text = seeker_text_fut.result() if seeker_text_fut is not None else None
+            ranked = yield from _offload(defer, "cpu", _apply_reranker, job_seeker_id, ranked, posts_map, seeker_text, rerank_k)
+        yield STAGE_RERANKED, _stage_snapshot(ranked, posts_map, include_job_details) if copy_stages else ranked
 
     # 4) LLM judge on the top subset, then SECTION-LEVEL fusion; overall from sections; harsh penalties + uniform rescale
+    judge_k = _plan_judge_k(len(ranked), deadline) if LLM_ENABLE else 0
     if LLM_ENABLE and ranked:
-        top = ranked[: min(LLM_JUDGE_TOP_K, len(ranked))]
+        _note_stage(report, "llm_judge", judge_k, min(LLM_JUDGE_TOP_K, len(ranked)))
+    if judge_k and ranked:
+        top = ranked[:judge_k]
         jobs_ctx = [_build_job_context(posts_map.get(r["job_post_id"], {})) for r in top]
-        seeker_ctx = _fetch_seeker_context(job_seeker_id)
+        seeker_ctx = seeker_ctx_fut.result() if seeker_ctx_fut is not None else _fetch_seeker_context(job_seeker_id, snap)
 
         try:
-            judged_raw = _llm_score_candidates(seeker_ctx, jobs_ctx)
+            with metrics.timed("matcher", "llm_judge"):
+                judged_raw = yield from _judge_with_verdict_cache(seeker_ctx, jobs_ctx, seeker_checksum, posts_map, defer)
             judged_by_pid = _calibrate_llm_batch(judged_raw)
         except Exception as e:
             judged_by_pid = {}
+            report["failed"].append("llm_judge")
             print(f"[WARN] LLM judge failed: {e}")
 
         for r in top:
@@ -852,14 +1900,159 @@ def rank_posts_for_seeker(
             r["job_post"] = posts_map.get(r["job_post_id"])
 
     ranked.sort(key=lambda d: d.get("confidence", 0.0), reverse=True)
+    if cache_key and not report["degraded"] and not report["failed"]:
+        _ranking_cache_put(cache_key, ranked)
+    yield STAGE_FINAL, _finish(ranked)
+
+def _new_stage_report(budget_ms: Optional[float]) -> Dict[str, Any]:
+    """
+    What a ranking call actually did: stages that ran ("cache" | "vector" | "rerank" | "llm_judge"),
+    stages skipped or failed, the rerank/judge sizes used, and whether the budget forced a degrade.
+    """
+    return {
+        "budget_ms": budget_ms,
+        "elapsed_ms": None,
+        "ran": [],
+        "skipped": [],
+        "failed": [],
+        "rerank_top_k": None,
+        "judge_top_k": None,
+        "degraded": False,
+    }
+
+def _note_stage(report: Dict[str, Any], stage: str, k: int, full_k: int) -> None:
+    report["rerank_top_k" if stage == "rerank" else "judge_top_k"] = k
+    report["ran" if k else "skipped"].append(stage)
+    if k < full_k:
+        report["degraded"] = True
+        _DEGRADED.inc(stage=stage, action="shrink" if k else "skip")
+
+def _stage_snapshot(
+    ranked: List[Dict[str, Any]],
+    posts_map: Dict[str, Dict[str, Any]],
+    include_job_details: bool,
+) -> List[Dict[str, Any]]:
+    """Independent copy of an intermediate ranking (later stages mutate rows in place)."""
+    snap = copy.deepcopy(ranked)
+    if include_job_details:
+        for r in snap:
+            r["job_post"] = posts_map.get(r["job_post_id"])
+    return snap
+
+def rank_posts_for_seeker(
+    job_seeker_id: str,
+    top_k_per_section: int = DEFAULT_TOP_K_PER_SECTION,
+    include_job_details: bool = False,
+    min_sections: int = 1,  # used in aggregation (stricter coverage)
+    weights: Optional[Dict[str, float]] = None,
+    budget_ms: Optional[float] = None,
+    stage_report: Optional[Dict[str, Any]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run the full hybrid pipeline (see iter_rank_posts_for_seeker) and return the final ranking.
+    budget_ms degrades the reranker/judge to fit; pass a dict as stage_report to learn what ran.
+    filters (post_filters.normalize_filters) restrict retrieval to matching posts.
+    """
+    ranked: List[Dict[str, Any]] = []
+    with metrics.timed("matcher", "total"):
+        for _stage, ranked in iter_rank_posts_for_seeker(
+            job_seeker_id,
+            top_k_per_section=top_k_per_section,
+            include_job_details=include_job_details,
+            min_sections=min_sections,
+            weights=weights,
+            budget_ms=budget_ms,
+            stage_report=stage_report,
+            filters=filters,
+            copy_stages=False,
+        ):
+            pass
+    return ranked
+
+def _pipeline_step(gen: Iterator[Any], value: Any, error: Optional[BaseException]) -> Tuple[bool, Any]:
+    # StopIteration can't cross an executor future, so completion is returned as a flag
+    try:
+        return False, (gen.throw(error) if error is not None else gen.send(value))
+    except StopIteration:
+        return True, None
+
+async def aiter_rank_posts_for_seeker(
+    job_seeker_id: str,
+    top_k_per_section: int = DEFAULT_TOP_K_PER_SECTION,
+    include_job_details: bool = False,
+    min_sections: int = 1,
+    weights: Optional[Dict[str, float]] = None,
+    budget_ms: Optional[float] = None,
+    stage_report: Optional[Dict[str, Any]] = None,
+    snapshot: Optional[SeekerSnapshot] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    copy_stages: bool = True,
+) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Async iter_rank_posts_for_seeker: same stages and results. Retrieval/fetch steps run on the
+    async I/O executor, the cross-encoder on the CPU executor, and the LLM judge is awaited on
+    async clients, so a request waiting on the LLM holds no thread.
+    """
+    snap = snapshot or seeker_snapshot.current_or_new()
+    gen = _rank_stages(
+        job_seeker_id, top_k_per_section, include_job_details, min_sections, weights,
+        budget_ms, stage_report, snap, defer=True, filters=filters, copy_stages=copy_stages,
+    )
+    value: Any = None
+    error: Optional[BaseException] = None
+    while True:
+        done, item = await aio.run_io(_pipeline_step, gen, value, error)
+        if done:
+            return
+        value, error = None, None
+        stage, payload = item
+        if stage != _STAGE_OFFLOAD:
+            yield stage, payload
+            continue
+        kind, fn, args = payload
+        try:
+            if kind == "llm":
+                value = await _allm_score_sharded(*args)
+            elif kind == "cpu":
+                value = await aio.run_cpu(fn, *args)
+            else:
+                value = await aio.run_io(fn, *args)
+        except Exception as e:
+            error = e
+
+async def arank_posts_for_seeker(
+    job_seeker_id: str,
+    top_k_per_section: int = DEFAULT_TOP_K_PER_SECTION,
+    include_job_details: bool = False,
+    min_sections: int = 1,
+    weights: Optional[Dict[str, float]] = None,
+    budget_ms: Optional[float] = None,
+    stage_report: Optional[Dict[str, Any]] = None,
+    snapshot: Optional[SeekerSnapshot] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Async rank_posts_for_seeker (see aiter_rank_posts_for_seeker)."""
+    ranked: List[Dict[str, Any]] = []
+    with metrics.timed("matcher", "total"):
+        async for _stage, ranked in aiter_rank_posts_for_seeker(
+            job_seeker_id,
+            top_k_per_section=top_k_per_section,
+            include_job_details=include_job_details,
+            min_sections=min_sections,
+            weights=weights,
+            budget_ms=budget_ms,
+            stage_report=stage_report,
+            snapshot=snapshot,
+            filters=filters,
+            copy_stages=False,
+        ):
+            pass
     return ranked
 
 def get_seeker_id_by_email(email: str) -> Optional[str]:
-    _, SB_real = _get_clients()
-    resp = SB_real.table("job_seeker").select("job_seeker_id").eq("email", email).limit(1).execute()
-    if not resp.data:
-        return None
-    return resp.data[0]["job_seeker_id"]
+    """Resolve by email; inside a seeker_snapshot.scope() the row is kept for the later stages."""
+    return seeker_snapshot.current_or_new().id_for_email(email)
 
 def rank_posts_for_seeker_by_email(
     email: str,
@@ -868,16 +2061,17 @@ def rank_posts_for_seeker_by_email(
     min_sections: int = 1,
     weights: Optional[Dict[str, float]] = None,
 ) -> List[Dict[str, Any]]:
-    js_id = get_seeker_id_by_email(email)
-    if not js_id:
-        return []
-    results = rank_posts_for_seeker(
-        job_seeker_id=js_id,
-        top_k_per_section=top_k_per_section,
-        include_job_details=include_job_details,
-        min_sections=min_sections,
-        weights=weights,
-    )
+    with seeker_snapshot.scope():
+        js_id = get_seeker_id_by_email(email)
+        if not js_id:
+            return []
+        results = rank_posts_for_seeker(
+            job_seeker_id=js_id,
+            top_k_per_section=top_k_per_section,
+            include_job_details=include_job_details,
+            min_sections=min_sections,
+            weights=weights,
+        )
     # Ensure required analysis fields for all results
     for r in results:
         r.setdefault("analysis", {})
@@ -899,6 +2093,154 @@ def rank_posts_for_seeker_by_email(
         r["analysis"]["skills_match_rate"] = round(float(smr), 2)
     return results
 
+# ================== REVERSE RANKING (POST → SEEKERS) ==================
+
+_SEEKER_CANDIDATE_COLS = (
+    "job_seeker_id, full_name, skills, experience, education, licenses_certifications, embedding_checksum"
+)
+
+def get_post_vectors(
+    job_post_id: str,
+    scopes: Iterable[str] = VALID_SCOPES,
+    metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, List[float]]:
+    """Fetch the job post's per-section vectors from Pinecone (and their metadata into `metadata`)."""
+    scopes = tuple(scopes)
+    fetched = _fetch_vectors([f"{job_post_id}:{s}" for s in scopes], POST_NS, metadata=metadata)
+    out: Dict[str, List[float]] = {}
+    for vid, vals in fetched.items():
+        scope = vid.split(":", 1)[1] if ":" in vid else ""
+        if scope in scopes:
+            out[scope] = vals
+    return out
+
+def _fetch_seekers_map(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    if not ids:
+        return {}
+    _, SB_real = _get_clients()
+    out: Dict[str, Dict[str, Any]] = {}
+    for i in range(0, len(ids), 200):
+        resp = SB_real.table("job_seeker").select(_SEEKER_CANDIDATE_COLS).in_("job_seeker_id", ids[i:i+200]).execute()
+        for row in resp.data or []:
+            out[str(row.get("job_seeker_id"))] = row
+    return out
+
+def _candidates_cache_key(
+    post_checksum: str,
+    weights: Dict[str, float],
+    min_sections: int,
+    top_k_per_section: int,
+    include_seeker_details: bool,
+) -> str:
+    payload = {
+        "post": post_checksum,
+        "seekers": corpus_version(SEEKER_CORPUS),
+        "weights": {k: round(float(weights.get(k, 0.0)), 6) for k in VALID_SCOPES},
+        "min_sections": int(min_sections),
+        "top_k": int(top_k_per_section),
+        "details": bool(include_seeker_details),
+        "direction": "post->seekers",
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def rank_seekers_for_post(
+    job_post_id: str,
+    top_k_per_section: int = DEFAULT_TOP_K_PER_SECTION,
+    include_seeker_details: bool = False,
+    min_sections: int = 1,
+    weights: Optional[Dict[str, float]] = None,
+    post_vecs: Optional[Dict[str, List[float]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Employer-side pipeline (roles swapped):
+      1) The post's section vectors query the job_seekers namespace (concurrently)
+      2) Strict calibrated weighted aggregation (same _aggregate_scores)
+      3) Optional cross-encoder reranker on (seeker text, post text) pairs
+      4) Vector-section finalize + HARSH penalties; required-skill coverage from skill_utils
+         (no LLM judge here)
+    Results are cached per (post embedding_checksum, seeker-corpus version, params); the post row
+    is validated against the version its vector metadata records, like the forward path.
+    post_vecs (scope -> vector) skips the vector fetch and the cache, and reads the post row fresh;
+    the embed worker passes the vectors it just upserted, which Pinecone may not serve back yet.
+    Returns [{"job_seeker_id","confidence","section_scores","analysis", "job_seeker"?}], sorted desc.
+    """
+    weights_eff = _effective_weights(weights)
+    pid = str(job_post_id)
+    use_cache = RANK_CACHE_ENABLE and post_vecs is None
+    versions: Dict[str, Tuple[Any, Any]] = {}
+    if post_vecs is None:
+        vec_meta: Dict[str, Dict[str, Any]] = {}
+        post_vecs = get_post_vectors(pid, metadata=vec_meta)
+        versions = _post_versions({"post": [{"metadata": m} for m in vec_meta.values()]})
+    # Without a version (vectors passed in, or no metadata) the cached row can't be trusted: read fresh
+    post = _fetch_posts_map([pid], versions=versions).get(pid)
+    if not post:
+        return []
+
+    cache_key: Optional[str] = None
+    if use_cache and post.get("embedding_checksum"):
+        cache_key = _candidates_cache_key(
+            post["embedding_checksum"], weights_eff, min_sections, top_k_per_section, include_seeker_details
+        )
+        cached = _ranking_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+    post_vecs = {s: v for s, v in post_vecs.items() if s in VALID_SCOPES}
+    if not post_vecs:
+        return []
+
+    section_results = _query_sections(post_vecs, top_k_per_section, namespace=SEEKER_NS)
+    ranked = _aggregate_scores(section_results, weights_eff, min_sections=min_sections)
+    for r in ranked:
+        r["job_seeker_id"] = r.pop("job_post_id")  # aggregation keys rows by the vector-id prefix
+
+    seekers_map = _fetch_seekers_map([r["job_seeker_id"] for r in ranked])
+    ranked = [r for r in ranked if r["job_seeker_id"] in seekers_map]
+
+    ce = _get_cross_encoder() if (RERANK_ENABLE and ranked) else None
+    if ce is not None:
+        post_text = _get_post_text(post) or str(post)
+        top = ranked[: max(1, min(RERANK_TOP_K, len(ranked)))]
+        pairs = [(_seeker_text_from_row(seekers_map[r["job_seeker_id"]]), post_text) for r in top]
+        ranked = _blend_rerank(ce, ranked, pairs)
+
+    req_flags = {
+        "education": bool(post.get("job_education")),
+        "licenses":  bool(post.get("job_licenses_certifications")),
+    }
+    required_skills = _coerce_to_list(post.get("job_skills"))
+    for r in ranked:
+        seeker = seekers_map[r["job_seeker_id"]]
+        skills = analyze_required_vs_seeker(required_skills, _coerce_to_list(seeker.get("skills")))
+        blended_sections, overall = _finalize_scores(
+            vec_sections=r.get("section_scores", {}),
+            llm_sections=None,
+            weights=weights_eff,
+            required=req_flags,
+        )
+        harsh_overall = _compute_penalized_overall(
+            overall=overall,
+            blended_sections=blended_sections,
+            required_skills=skills["required_skills"],
+            matched_skills=skills["matched_skills"],
+        )
+        r["section_scores"] = _rescale_sections_uniform(blended_sections, overall, harsh_overall)
+        r["confidence"] = harsh_overall
+        r["analysis"] = {
+            "required_skills": skills["required_skills"],
+            "matched_skills": skills["matched_skills"],
+            "missing_skills": skills["missing_skills"],
+            "skills_match_rate": skills["skills_match_rate"],
+        }
+        if include_seeker_details:
+            r["job_seeker"] = seeker
+
+    ranked.sort(key=lambda d: d.get("confidence", 0.0), reverse=True)
+    if cache_key:
+        _ranking_cache_put(cache_key, ranked)
+    return ranked
+
 # ==================== HIGH-LEVEL ORCHESTRATION ====================
 
 def match_and_enrich(
@@ -915,15 +2257,46 @@ def match_and_enrich(
       - Retrieve & aggregate
       - Rerank (cross-encoder)
       - LLM judge blend (section-level) + harsh penalties (uniform rescale)
-      - Persist to Supabase (best-effort)
+      - Persist to Supabase (best-effort), with the seeker's auth_user_id
     """
-    results = rank_posts_for_seeker(
+    with seeker_snapshot.scope() as snap:
+        results = rank_posts_for_seeker(
+            job_seeker_id=job_seeker_id,
+            top_k_per_section=top_k_per_section,
+            include_job_details=True,  # required for contexts above
+            min_sections=min_sections,
+            weights=weights,
+        )
+        return _enrich_and_persist(job_seeker_id, results, include_details, weights, snap)
+
+async def amatch_and_enrich(
+    *,
+    job_seeker_id: str,
+    top_k_per_section: int = DEFAULT_TOP_K_PER_SECTION,
+    include_details: bool = False,
+    min_sections: int = 1,
+    include_explanations: bool = True,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """Async match_and_enrich: arank_posts_for_seeker, then persistence on the I/O executor."""
+    snap = seeker_snapshot.current_or_new()
+    results = await arank_posts_for_seeker(
         job_seeker_id=job_seeker_id,
         top_k_per_section=top_k_per_section,
-        include_job_details=True,  # required for contexts above
+        include_job_details=True,
         min_sections=min_sections,
         weights=weights,
+        snapshot=snap,
     )
+    return await aio.run_io(_enrich_and_persist, job_seeker_id, results, include_details, weights, snap)
+
+def _enrich_and_persist(
+    job_seeker_id: str,
+    results: List[Dict[str, Any]],
+    include_details: bool,
+    weights: Optional[Dict[str, float]],
+    snap: SeekerSnapshot,
+) -> List[Dict[str, Any]]:
     if not results:
         return []
 
@@ -938,14 +2311,15 @@ def match_and_enrich(
         # KEEP analysis (Option A)
         out.append(x)
 
-    # Persist (best-effort)
+    # Persist (best-effort, write-behind)
     try:
-        from .data_storer import persist_matcher_results
+        from .persist_queue import enqueue_matcher_results
         provider = "openai" if os.getenv("OPENAI_API_KEY") else ("gemini" if os.getenv("GEMINI_API_KEY") else "none")
         model_name = OPENAI_MODEL if provider == "openai" else (GEMINI_MODEL if provider == "gemini" else "hybrid-only")
         method = "hybrid+rerank" + ("+llm" if LLM_ENABLE else "")
-        persist_matcher_results(
-            auth_user_id=None,
+        # The seeker row is already in the snapshot; queued once, so auth_user_id goes in now
+        enqueue_matcher_results(
+            auth_user_id=(snap.row(job_seeker_id) or {}).get("auth_user_id"),
             job_seeker_id=job_seeker_id,
             matcher_results=out,
             default_weights=weights,
@@ -960,7 +2334,10 @@ def match_and_enrich(
 __all__ = [
     "SB", "VALID_SCOPES", "SEEKER_NS", "POST_NS",
     "rank_posts_for_seeker", "rank_posts_for_seeker_by_email", "get_seeker_id_by_email",
-    "match_and_enrich",
+    "iter_rank_posts_for_seeker", "STAGE_VECTOR", "STAGE_RERANKED", "STAGE_FINAL",
+    "aiter_rank_posts_for_seeker", "arank_posts_for_seeker",
+    "rank_seekers_for_post", "get_post_vectors",
+    "match_and_enrich", "amatch_and_enrich",
 ]
 
 # ============================== CLI ===============================
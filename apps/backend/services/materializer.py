@@ -0,0 +1,128 @@
+# apps/backend/services/materializer.py
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from . import matcher
+from . import seeker_snapshot
+
+# ============================== CONFIG ==============================
+# Push-based match materialization: when the embed worker upserts a job post, score it against
+# the seekers it is nearest to (reverse kNN on the job_seekers namespace) and write every pair at
+# or above MATERIALIZE_MIN_SCORE to job_match_scores. The DB trigger folds those rows into
+# job_match_scores_cache (newest wins), which /match?prefer_cached=true reads.
+MATERIALIZE_ON_UPSERT    = os.getenv("MATERIALIZE_ON_UPSERT", "0") == "1"
+MATERIALIZE_MIN_SCORE    = float(os.getenv("MATERIALIZE_MIN_SCORE", "40"))
+MATERIALIZE_TOP_K        = int(os.getenv("MATERIALIZE_TOP_K", "200"))   # seekers per section query
+MATERIALIZE_MIN_SECTIONS = int(os.getenv("MATERIALIZE_MIN_SECTIONS", "2"))
+MATERIALIZE_METHOD       = "materialized"
+
+CACHED_MATCH_LIMIT = int(os.getenv("CACHED_MATCH_LIMIT", "50"))
+
+# ============================== WRITE ===============================
+
+def materialize_post(job_post_id: str, post_vecs: Optional[Dict[str, List[float]]] = None) -> int:
+    """
+    Score one (new/updated) job post against its nearest seekers and persist pairs above the
+    threshold. Returns the number of rows written. Best-effort: failures are logged, not raised.
+    """
+    from .data_storer import store_post_match_scores_bulk
+
+    try:
+        ranked = matcher.rank_seekers_for_post(
+            str(job_post_id),
+            top_k_per_section=MATERIALIZE_TOP_K,
+            min_sections=MATERIALIZE_MIN_SECTIONS,
+            post_vecs=post_vecs,
+        )
+        keep = [r for r in ranked if float(r.get("confidence", 0.0)) >= MATERIALIZE_MIN_SCORE]
+        if keep:
+            store_post_match_scores_bulk(
+                job_post_id=str(job_post_id),
+                items=keep,
+                default_weights=matcher._effective_weights(None),
+                method=MATERIALIZE_METHOD,
+                model_version="materializer",
+            )
+        print(f"[INFO] materialized post {job_post_id}: {len(keep)}/{len(ranked)} seekers >= {MATERIALIZE_MIN_SCORE}")
+        return len(keep)
+    except Exception as e:
+        print(f"[WARN] materialize post {job_post_id} failed: {e}")
+        return 0
+
+# ============================== READ ================================
+
+def _parse_ts(ts: Any) -> Optional[datetime]:
+    if not ts:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def read_cached_matches(
+    job_seeker_id: str,
+    limit: int = CACHED_MATCH_LIMIT,
+    include_job_details: bool = False,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Materialized matches for a seeker from job_match_scores_cache, shaped like
+    rank_posts_for_seeker output. Rows calculated before the seeker's profile last changed are
+    left out; None when nothing usable remains, so the caller falls back to the live pipeline.
+    """
+    _, sb = matcher._get_clients()
+    seeker = seeker_snapshot.current_or_new().row(job_seeker_id)
+    try:
+        rows = (
+            sb.table("job_match_scores_cache")
+            .select("job_post_id, confidence, section_scores, matched_skills, missing_skills, "
+                    "matched_explanations, overall_summary, calculated_at")
+            .eq("job_seeker_id", job_seeker_id)
+            .order("confidence", desc=True)
+            .limit(limit)
+            .execute()
+        ).data or []
+    except Exception as e:
+        print(f"[WARN] cached match read failed: {e}")
+        return None
+    if not rows:
+        return None
+
+    # Rows scored before the seeker's last profile edit are stale, however new the other rows are
+    seeker_ts = _parse_ts(seeker.get("updated_at")) if seeker else None
+    if seeker_ts:
+        rows = [r for r in rows if (_parse_ts(r.get("calculated_at")) or datetime.min.replace(tzinfo=timezone.utc)) >= seeker_ts]
+        if not rows:
+            return None
+
+    posts_map = matcher._fetch_posts_map([str(r["job_post_id"]) for r in rows], full=include_job_details)
+    out: List[Dict[str, Any]] = []
+    for r in rows:
+        pid = str(r["job_post_id"])
+        post = posts_map.get(pid)
+        if post is None:
+            continue  # post deleted since materialization
+        matched = r.get("matched_skills") or []
+        missing = r.get("missing_skills") or []
+        item = {
+            "job_post_id": pid,
+            "confidence": float(r.get("confidence") or 0.0),
+            "section_scores": r.get("section_scores") or {},
+            "analysis": {
+                "required_skills": matcher._coerce_to_list(post.get("job_skills")),
+                "matched_skills": matched,
+                "missing_skills": missing,
+                "matched_explanations": r.get("matched_explanations") or {},
+                "overall_summary": r.get("overall_summary") or "",
+                "skills_match_rate": round(len(matched) / max(1, len(matched) + len(missing)) * 100.0, 2),
+            },
+        }
+        if include_job_details:
+            item["job_post"] = post
+        out.append(item)
+    return out or None
+
+__all__ = ["MATERIALIZE_ON_UPSERT", "materialize_post", "read_cached_matches"]
@@ -0,0 +1,224 @@
+# apps/backend/services/metrics.py
+from __future__ import annotations
+
+import os
+import time
+import threading
+import inspect
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ============================== CONFIG ==============================
+# In-process metrics, rendered in the Prometheus text exposition format (v0.0.4).
+#   API:          GET /metrics on the FastAPI app
+#   embed worker: EMBED_METRICS_PORT (see start_http_server)
+METRICS_ENABLE = os.getenv("METRICS_ENABLE", "1") == "1"
+METRICS_PREFIX = os.getenv("METRICS_PREFIX", "hiway")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds): sub-ms cache hits up to multi-second LLM/scraper calls
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_LOCK = threading.Lock()
+
+# ============================== METRICS =============================
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+class Counter:
+    """Monotonic counter, one series per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str) -> None:
+        self.name, self.doc = name, doc
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with _LOCK:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in sorted(self._values.items())]
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics: le buckets + _sum + _count)."""
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name, self.doc = name, doc
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}  # [bucket counts..., +Inf, sum]
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with _LOCK:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+            s[-2] += 1
+            s[-1] += value
+
+    def count(self, **labels: Any) -> int:
+        s = self._series.get(_label_key(labels))
+        return int(s[-2]) if s else 0
+
+    def samples(self) -> List[str]:
+        out: List[str] = []
+        for key, s in sorted(self._series.items()):
+            for i, b in enumerate(self.buckets):
+                out.append(f"{self.name}_bucket{_fmt_labels(key, ('le', _fmt_value(b)))} {_fmt_value(s[i])}")
+            out.append(f"{self.name}_bucket{_fmt_labels(key, ('le', '+Inf'))} {_fmt_value(s[-2])}")
+            out.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(s[-1])}")
+            out.append(f"{self.name}_count{_fmt_labels(key)} {_fmt_value(s[-2])}")
+        return out
+
+_REGISTRY: Dict[str, Any] = {}
+
+def counter(name: str, doc: str = "") -> Counter:
+    """Get-or-create a counter (name gets METRICS_PREFIX)."""
+    full = f"{METRICS_PREFIX}_{name}"
+    with _LOCK:
+        m = _REGISTRY.get(full)
+        if m is None:
+            m = _REGISTRY[full] = Counter(full, doc)
+    return m
+
+def histogram(name: str, doc: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Get-or-create a histogram (name gets METRICS_PREFIX)."""
+    full = f"{METRICS_PREFIX}_{name}"
+    with _LOCK:
+        m = _REGISTRY.get(full)
+        if m is None:
+            m = _REGISTRY[full] = Histogram(full, doc, buckets)
+    return m
+
+# Shared stage instruments: every timed() block lands in these, keyed by component + stage.
+# Error rate = stage_errors_total / stage_duration_seconds_count.
+STAGE_SECONDS = histogram("stage_duration_seconds", "Wall time per pipeline stage")
+STAGE_ERRORS  = counter("stage_errors_total", "Stage invocations that raised")
+CACHE_EVENTS  = counter("cache_events_total", "Cache lookups by cache and result (hit|miss)")
+
+# ============================== TIMING ==============================
+
+class timed:
+    """
+    Time a block or function into STAGE_SECONDS; exceptions also bump STAGE_ERRORS and re-raise.
+
+        with metrics.timed("matcher", "rerank"):
+            ...
+
+        @metrics.timed("scraper", "serpapi")
+        def serpapi_search(...): ...
+    """
+
+    def __init__(self, component: str, stage: str) -> None:
+        self.component, self.stage = component, stage
+        self._t0 = 0.0
+
+    def __enter__(self) -> "timed":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if METRICS_ENABLE:
+            STAGE_SECONDS.observe(time.perf_counter() - self._t0, component=self.component, stage=self.stage)
+            if exc_type is not None:
+                STAGE_ERRORS.inc(component=self.component, stage=self.stage)
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def awrapper(*args, **kwargs):
+                with timed(self.component, self.stage):
+                    return await fn(*args, **kwargs)
+            return awrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(self.component, self.stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+def cache_event(cache: str, hit: bool, n: int = 1) -> None:
+    """Count n lookups against a named cache."""
+    if METRICS_ENABLE and n > 0:
+        CACHE_EVENTS.inc(n, cache=cache, result="hit" if hit else "miss")
+
+# ============================== EXPOSITION ==========================
+
+def render() -> str:
+    """Every registered metric in Prometheus text format."""
+    lines: List[str] = []
+    with _LOCK:
+        metrics = sorted(_REGISTRY.values(), key=lambda m: m.name)
+        for m in metrics:
+            if m.doc:
+                lines.append(f"# HELP {m.name} {m.doc}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.samples())
+    return "\n".join(lines) + "\n"
+
+def reset() -> None:
+    """Drop all recorded samples (tests)."""
+    with _LOCK:
+        for m in _REGISTRY.values():
+            if isinstance(m, Counter):
+                m._values.clear()
+            else:
+                m._series.clear()
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:  # keep scrapes out of the worker log
+        return
+
+def start_http_server(port: int, addr: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread (for processes without the FastAPI app)."""
+    server = ThreadingHTTPServer((addr, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+__all__ = [
+    "CONTENT_TYPE", "Counter", "Histogram", "counter", "histogram", "timed", "cache_event",
+    "render", "reset", "start_http_server",
+]
@@ -12,6 +12,8 @@ from apps.backend.services.data_storer import (
     store_seeker_milestone_status,
     _now_iso,
 )
+from apps.backend.services import metrics
+from apps.backend.services import seeker_snapshot
 
 # --------------------------- Supabase client ---------------------------
 _SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -63,14 +65,8 @@ def _fetch_roadmap(roadmap_id: Optional[str], job_seeker_id: str, role: str) ->
     return road
 
 def _fetch_seeker_profile(job_seeker_id: str) -> Tuple[Dict[str, Any], Optional[str]]:
-    sres = (
-        _sb.table("job_seeker")
-        .select("skills, experience, education, licenses_certifications, updated_at")
-        .eq("job_seeker_id", job_seeker_id)
-        .limit(1)
-        .execute()
-    )
-    seeker = (sres.data or [{}])[0]
+    # Shared request snapshot row; copied because the defaults below are filled in place
+    seeker = dict(seeker_snapshot.current_or_new().row(job_seeker_id) or {})
     updated_at = seeker.get("updated_at")
     # Ensure arrays exist
     for k in ("skills", "experience", "education", "licenses_certifications"):
@@ -349,6 +345,7 @@ def _select_provider() -> str:
             raise RuntimeError("No LLM API key found. Set GEMINI_API_KEY or OPENAI_API_KEY.")
     return provider
 
+@metrics.timed("milestone_locator", "llm")
 def _call_llm(prompt: str) -> Dict[str, Any]:
     provider = _select_provider()
     if provider == "openai":
@@ -494,6 +491,7 @@ def _pick_current_next(scored: List[Dict[str, Any]]) -> Tuple[int, int]:
     return current_idx, next_idx
 
 # --------------------------- Public entrypoint ---------------------------
+@metrics.timed("milestone_locator", "total")
 def locate_milestone_with_llm(
     *,
     job_seeker_id: str,
@@ -0,0 +1,133 @@
+# apps/backend/services/onnx_reranker.py
+from __future__ import annotations
+
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Optional: onnxruntime (+ transformers tokenizer). Export/quantization additionally need torch,
+# which sentence-transformers already pulls in, and onnx. See apps/backend/requirements-optional.txt
+try:
+    import onnxruntime as ort
+except Exception:  # pragma: no cover - optional dependency
+    ort = None
+
+# ============================== CONFIG ==============================
+# Exported models are cached per model id under RERANK_ONNX_DIR:
+#   <dir>/<model-slug>/model.onnx        (fp32 export)
+#   <dir>/<model-slug>/model.int8.onnx   (dynamic int8 quantization, RERANK_ONNX_QUANTIZE=1)
+RERANK_ONNX_DIR      = os.getenv("RERANK_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hiway", "onnx"))
+RERANK_ONNX_QUANTIZE = os.getenv("RERANK_ONNX_QUANTIZE", "1") == "1"
+RERANK_ONNX_THREADS  = int(os.getenv("RERANK_ONNX_THREADS", "0"))  # 0 -> onnxruntime default
+RERANK_MAX_LENGTH    = 512
+
+def available() -> bool:
+    return ort is not None
+
+def _model_dir(model_name: str, base_dir: str) -> str:
+    return os.path.join(base_dir, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+
+def export_onnx(model_name: str, out_path: str) -> str:
+    """Export a HF sequence-classification cross-encoder to ONNX (dynamic batch/sequence axes)."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tok = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    sample = tok(["query"], ["document"], padding=True, truncation=True, return_tensors="pt")
+    input_names = [k for k in ("input_ids", "attention_mask", "token_type_ids") if k in sample]
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp = out_path + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[k] for k in input_names),
+            tmp,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={**{k: {0: "batch", 1: "seq"} for k in input_names}, "logits": {0: "batch"}},
+            opset_version=14,
+        )
+    os.replace(tmp, out_path)
+    return out_path
+
+def quantize_int8(src_path: str, out_path: str) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp = out_path + ".tmp"
+    quantize_dynamic(src_path, tmp, weight_type=QuantType.QInt8)
+    os.replace(tmp, out_path)
+    return out_path
+
+def ensure_onnx_model(model_name: str, quantize: bool = RERANK_ONNX_QUANTIZE, base_dir: str = RERANK_ONNX_DIR) -> str:
+    """Path to the (optionally int8) ONNX model for model_name, exporting it on first use."""
+    d = _model_dir(model_name, base_dir)
+    fp32 = os.path.join(d, "model.onnx")
+    if not os.path.exists(fp32):
+        print(f"[INFO] exporting {model_name} to ONNX at {fp32}")
+        export_onnx(model_name, fp32)
+    if not quantize:
+        return fp32
+    int8 = os.path.join(d, "model.int8.onnx")
+    if not os.path.exists(int8):
+        print(f"[INFO] quantizing {fp32} -> {int8} (dynamic int8)")
+        quantize_int8(fp32, int8)
+    return int8
+
+class OnnxCrossEncoder:
+    """
+    Drop-in for sentence_transformers.CrossEncoder.predict on CPU via onnxruntime.
+    Mirrors CrossEncoder's default activation (sentence-transformers 5.x, as pinned; unchanged
+    since 2.x): Sigmoid for single-logit models, Identity (raw logits) for multi-label models.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = RERANK_ONNX_QUANTIZE,
+        onnx_path: Optional[str] = None,
+        max_length: int = RERANK_MAX_LENGTH,
+        num_threads: int = RERANK_ONNX_THREADS,
+    ):
+        if ort is None:
+            raise RuntimeError("onnxruntime is not installed")
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = max_length
+        self.onnx_path = onnx_path or ensure_onnx_model(model_name, quantize=quantize)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            opts.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(self.onnx_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 32, **_: object) -> np.ndarray:
+        pairs = list(pairs)
+        if not pairs:
+            return np.zeros((0,), dtype=np.float32)
+        out: List[np.ndarray] = []
+        for i in range(0, len(pairs), batch_size):
+            chunk = pairs[i:i+batch_size]
+            enc = self.tokenizer(
+                [a for a, _ in chunk],
+                [b for _, b in chunk],
+                padding=True,
+                truncation="longest_first",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self._input_names}
+            out.append(self.session.run(["logits"], feeds)[0])
+        logits = np.concatenate(out, axis=0)
+        if logits.shape[1] == 1:
+            return 1.0 / (1.0 + np.exp(-logits[:, 0]))
+        return logits
+
+__all__ = ["available", "ensure_onnx_model", "export_onnx", "quantize_int8", "OnnxCrossEncoder"]
@@ -2,14 +2,17 @@
 from __future__ import annotations
 
 import os
-from typing import Dict, Any, Optional, List
+import asyncio
+from typing import Dict, Any, Optional, List, Tuple
 
 from supabase import create_client
 
-from .matcher import match_and_enrich, get_seeker_id_by_email
-from .scraper import generate_and_store_roadmap
-from .data_storer import persist_matcher_results
+from .matcher import match_and_enrich, amatch_and_enrich, get_seeker_id_by_email
+from .scraper import generate_and_store_roadmap, agenerate_and_store_roadmap
 from .milestone_locator import locate_milestone_with_llm  # <-- LLM-only
+from . import metrics
+from . import seeker_snapshot
+from . import aio
 
 # ---------------- Supabase client ----------------
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -22,19 +25,9 @@ sb = create_client(SUPABASE_URL, SUPABASE_KEY)
 # ---------------- Helpers ----------------
 def _fetch_job_seeker(job_seeker_id: str) -> Optional[Dict[str, Any]]:
     """
-    Fetch seeker; tolerate singular/plural table naming if needed.
+    Fetch seeker from the request's snapshot (already read by the email lookup).
     """
-    for tbl in ("job_seeker", "job_seeker"):  # kept as-is for your current schema
-        resp = (
-            sb.table(tbl)
-            .select("*")
-            .eq("job_seeker_id", job_seeker_id)
-            .limit(1)
-            .execute()
-        )
-        if resp.data:
-            return resp.data[0]
-    return None
+    return seeker_snapshot.current_or_new().row(job_seeker_id)
 
 
 def _fetch_latest_match(job_seeker_id: str) -> Optional[Dict[str, Any]]:
@@ -210,6 +203,7 @@ def _enrich_roadmap_milestones(roadmap_doc: Optional[Dict[str, Any]]) -> Optiona
 
 
 # ---------------- Orchestrator ----------------
+@metrics.timed("orchestrator", "total")
 def orchestrate_user_update(email: str, role: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
     """
     Main orchestrator:
@@ -219,7 +213,13 @@ def orchestrate_user_update(email: str, role: Optional[str] = None, force: bool
       4) Run LLM-based milestone locator (idempotent: recomputes only if needed).
       5) Return the roadmap document + current milestone status (always).
          **Milestones are enriched with resources/certs/groups.**
+    The job_seeker row is read once and shared by the matcher and milestone locator.
     """
+    with seeker_snapshot.scope():
+        return _orchestrate_user_update(email, role, force)
+
+
+def _orchestrate_user_update(email: str, role: Optional[str], force: bool) -> Dict[str, Any]:
     job_seeker_id = get_seeker_id_by_email(email)
     if not job_seeker_id:
         return {"status": "error", "message": f"No job_seeker found for {email}"}
@@ -241,21 +241,8 @@ def orchestrate_user_update(email: str, role: Optional[str] = None, force: bool
 
     # -------- 2) Matcher update (job posts confidence snapshots) --------
     if needs_match_update:
-        results = match_and_enrich(
-            job_seeker_id=job_seeker_id,
-            top_k_per_section=20,
-            include_details=True,
-            min_sections=1,
-            include_explanations=True,
-        )
-        persist_matcher_results(
-            auth_user_id=seeker_row.get("auth_user_id"),
-            job_seeker_id=job_seeker_id,
-            matcher_results=results,
-            default_weights=None,
-            method="pinecone+rerank",
-            model_version="orchestrator",
-        )
+        with metrics.timed("orchestrator", "match"):
+            results = match_and_enrich(**_MATCH_KWARGS, job_seeker_id=job_seeker_id)
     else:
         results = []
 
@@ -270,10 +257,11 @@ def orchestrate_user_update(email: str, role: Optional[str] = None, force: bool
 
     if not roadmap_id:
         # No roadmap yet (or role changed) -> create one
-        roadmap_id = generate_and_store_roadmap(
-            job_seeker_id=job_seeker_id,
-            role=target_role,
-        )
+        with metrics.timed("orchestrator", "generate_roadmap"):
+            roadmap_id = generate_and_store_roadmap(
+                job_seeker_id=job_seeker_id,
+                role=target_role,
+            )
         # We just created it; fetch the doc to return
         roadmap_doc = _fetch_roadmap_doc_by_id(roadmap_id)
         needs_roadmap_or_locate = True  # definitely locate after creation
@@ -284,19 +272,39 @@ def orchestrate_user_update(email: str, role: Optional[str] = None, force: bool
 
     # -------- 4) Locate current milestone (LLM service; idempotent) --------
     # Even on cached runs, calling this is cheap: it will re-use the latest snapshot unless needed.
-    milestone_status = locate_milestone_with_llm(
-        job_seeker_id=job_seeker_id,
-        role=target_role,
-        roadmap_id=roadmap_id,
-        force=force or needs_roadmap_or_locate,
-        model_version="orchestrator",
-    )
+    with metrics.timed("orchestrator", "locate_milestone"):
+        milestone_status = locate_milestone_with_llm(
+            job_seeker_id=job_seeker_id,
+            role=target_role,
+            roadmap_id=roadmap_id,
+            force=force or needs_roadmap_or_locate,
+            model_version="orchestrator",
+        )
 
     # -------- Enrich roadmap milestones with stored resources/certs/groups ------
     roadmap_doc = _enrich_roadmap_milestones(roadmap_doc)
 
     # -------- 5) Assemble response --------
     did_update = bool(results) or (force or needs_roadmap_or_locate)
+    return _response(job_seeker_id, target_role, results, roadmap_doc, milestone_status, did_update)
+
+
+_MATCH_KWARGS: Dict[str, Any] = dict(
+    top_k_per_section=20,
+    include_details=True,
+    min_sections=1,
+    include_explanations=True,
+)
+
+
+def _response(
+    job_seeker_id: str,
+    target_role: str,
+    results: List[Dict[str, Any]],
+    roadmap_doc: Optional[Dict[str, Any]],
+    milestone_status: Optional[Dict[str, Any]],
+    did_update: bool,
+) -> Dict[str, Any]:
     return {
         "status": "updated" if did_update else "cached",
         "job_seeker_id": job_seeker_id,
@@ -305,3 +313,71 @@ def orchestrate_user_update(email: str, role: Optional[str] = None, force: bool
         "roadmap": roadmap_doc or {},
         "milestone_status": milestone_status or {},
     }
+
+
+# ---------------- Async orchestrator ----------------
+@metrics.timed("orchestrator", "total")
+async def aorchestrate_user_update(email: str, role: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Async orchestrate_user_update (same steps and response). Supabase reads/writes and the
+    milestone locator run on the I/O executor; the matcher and roadmap generator use their async
+    paths. The match update and the roadmap lookup/creation don't depend on each other, so they
+    run concurrently.
+    """
+    with seeker_snapshot.scope():
+        job_seeker_id = await aio.run_io(get_seeker_id_by_email, email)
+        if not job_seeker_id:
+            return {"status": "error", "message": f"No job_seeker found for {email}"}
+
+        seeker_row = await aio.run_io(_fetch_job_seeker, job_seeker_id)
+        if not seeker_row:
+            return {"status": "error", "message": f"Job seeker record missing for {email}"}
+
+        target_role = role or seeker_row.get("target_role", "Generalist")
+
+        last_match, last_status = await asyncio.gather(
+            aio.run_io(_fetch_latest_match, job_seeker_id),
+            aio.run_io(_fetch_latest_status_for_role, job_seeker_id, target_role),
+        )
+        needs_match_update = force or _profile_changed(seeker_row, last_match)
+        needs_roadmap_or_locate = force or (last_status is None) or _profile_changed(seeker_row, last_status)
+
+        async def _update_matches() -> List[Dict[str, Any]]:
+            if not needs_match_update:
+                return []
+            with metrics.timed("orchestrator", "match"):
+                results = await amatch_and_enrich(**_MATCH_KWARGS, job_seeker_id=job_seeker_id)
+            return results
+
+        async def _ensure_roadmap() -> Tuple[Optional[str], Optional[Dict[str, Any]], bool]:
+            roadmap_id: Optional[str] = (last_status or {}).get("roadmap_id")
+            roadmap_doc: Optional[Dict[str, Any]] = None
+            created = False
+            if not roadmap_id:
+                roadmap_doc = await aio.run_io(_fetch_latest_roadmap_doc_for_role, job_seeker_id, target_role)
+                roadmap_id = (roadmap_doc or {}).get("roadmap_id")
+            if not roadmap_id:
+                with metrics.timed("orchestrator", "generate_roadmap"):
+                    roadmap_id = await agenerate_and_store_roadmap(job_seeker_id=job_seeker_id, role=target_role)
+                roadmap_doc = None
+                created = True
+            if roadmap_doc is None and roadmap_id:
+                roadmap_doc = await aio.run_io(_fetch_roadmap_doc_by_id, roadmap_id)
+            return roadmap_id, roadmap_doc, created
+
+        results, (roadmap_id, roadmap_doc, created) = await asyncio.gather(_update_matches(), _ensure_roadmap())
+        needs_roadmap_or_locate = needs_roadmap_or_locate or created
+
+        with metrics.timed("orchestrator", "locate_milestone"):
+            milestone_status = await aio.run_io(
+                locate_milestone_with_llm,
+                job_seeker_id=job_seeker_id,
+                role=target_role,
+                roadmap_id=roadmap_id,
+                force=force or needs_roadmap_or_locate,
+                model_version="orchestrator",
+            )
+
+        roadmap_doc = await aio.run_io(_enrich_roadmap_milestones, roadmap_doc)
+        did_update = bool(results) or (force or needs_roadmap_or_locate)
+        return _response(job_seeker_id, target_role, results, roadmap_doc, milestone_status, did_update)
@@ -0,0 +1,321 @@
+# apps/backend/services/persist_queue.py
+from __future__ import annotations
+
+import os
+import time
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+from .cache_store import LRUTTLCache
+
+# ============================== CONFIG ==============================
+# Write-behind persistence for match snapshots (job_match_scores). Callers hand over a ranking
+# and return immediately; a background thread writes queued rankings in batched inserts.
+# A ranking is identified by (seeker, fingerprint of its post ids + scores): the same ranking
+# queued twice in one request (matcher + orchestrator) or re-queued within PERSIST_DEDUP_TTL_S
+# is written once.
+#   PERSIST_QUEUE_ENABLE=0  -> write inline, as before
+#   PERSIST_QUEUE_MAX_JOBS  -> bound on queued rankings; beyond it the caller writes inline
+#   PERSIST_TOP_N           -> rows kept per ranking, by confidence (0 = all)
+PERSIST_QUEUE_ENABLE     = os.getenv("PERSIST_QUEUE_ENABLE", "1") == "1"
+PERSIST_QUEUE_MAX_JOBS   = int(os.getenv("PERSIST_QUEUE_MAX_JOBS", "1000"))
+PERSIST_TOP_N            = int(os.getenv("PERSIST_TOP_N", "50"))
+PERSIST_BATCH_ROWS       = int(os.getenv("PERSIST_BATCH_ROWS", "500"))
+PERSIST_FLUSH_INTERVAL_S = float(os.getenv("PERSIST_FLUSH_INTERVAL_S", "0.5"))
+PERSIST_DEDUP_TTL_S      = float(os.getenv("PERSIST_DEDUP_TTL_S", "120"))
+
+_JOBS   = metrics.counter("persist_queue_jobs_total", "Persistence jobs by result (queued|deduped|overflow|inline)")
+_ROWS   = metrics.counter("persist_queue_rows_total", "job_match_scores rows by result (written|failed)")
+_ERRORS = metrics.counter("persist_queue_flush_errors_total", "Batched inserts that raised")
+
+JobKey = Tuple[str, str]
+
+# ============================== HELPERS =============================
+
+def fingerprint(results: List[Dict[str, Any]]) -> str:
+    """Stable id of a ranking: post ids and their (2dp) confidences, in rank order."""
+    blob = "|".join(f"{r.get('job_post_id')}:{float(r.get('confidence') or 0.0):.2f}" for r in results)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def top_n(results: List[Dict[str, Any]], n: int = PERSIST_TOP_N) -> List[Dict[str, Any]]:
+    ranked = sorted(results or [], key=lambda r: float(r.get("confidence") or 0.0), reverse=True)
+    return ranked[:n] if n > 0 else ranked
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _default_build_rows(job: "_Job") -> List[Dict[str, Any]]:
+    from .data_storer import match_score_rows
+    return match_score_rows(
+        auth_user_id=job.auth_user_id,
+        job_seeker_id=job.job_seeker_id,
+        items=job.results,
+        default_weights=job.default_weights,
+        method=job.method,
+        model_version=job.model_version,
+        calculated_at_iso=job.calculated_at_iso,
+    )
+
+def _default_insert_rows(rows: List[Dict[str, Any]]) -> Any:
+    from .data_storer import insert_match_score_rows
+    return insert_match_score_rows(rows)
+
+# ============================== QUEUE ===============================
+
+class _Job:
+    __slots__ = ("job_seeker_id", "results", "auth_user_id", "default_weights", "method",
+                 "model_version", "calculated_at_iso")
+
+    def __init__(self, job_seeker_id: str, results: List[Dict[str, Any]], auth_user_id: Optional[str],
+                 default_weights: Optional[Dict[str, float]], method: str, model_version: Optional[str]) -> None:
+        self.job_seeker_id = job_seeker_id
+        self.results = results
+        self.auth_user_id = auth_user_id
+        self.default_weights = default_weights
+        self.method = method
+        self.model_version = model_version
+        # Stamped at submit, so a delayed flush doesn't make the snapshot look newer than it is
+        self.calculated_at_iso = _now_iso()
+
+class WriteBehindQueue:
+    """
+    Bounded, deduplicating write-behind buffer of match rankings. A daemon thread flushes when
+    PERSIST_BATCH_ROWS rows are pending or PERSIST_FLUSH_INTERVAL_S has passed; flush() drains
+    synchronously (shutdown, tests). A failed batch is retried job by job; rankings that still
+    fail are dropped (counted) and may be queued again.
+    """
+
+    def __init__(
+        self,
+        build_rows: Callable[[_Job], List[Dict[str, Any]]] = _default_build_rows,
+        insert_rows: Callable[[List[Dict[str, Any]]], Any] = _default_insert_rows,
+        max_jobs: int = PERSIST_QUEUE_MAX_JOBS,
+        batch_rows: int = PERSIST_BATCH_ROWS,
+        flush_interval_s: float = PERSIST_FLUSH_INTERVAL_S,
+        top_n_rows: int = PERSIST_TOP_N,
+        dedup_ttl_s: float = PERSIST_DEDUP_TTL_S,
+    ) -> None:
+        self.build_rows, self.insert_rows = build_rows, insert_rows
+        self.max_jobs = max(1, max_jobs)
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval_s = flush_interval_s
+        self.top_n_rows = top_n_rows
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # one batch at a time; flush() waits for the worker's
+        self._pending: "OrderedDict[JobKey, _Job]" = OrderedDict()
+        self._pending_rows = 0
+        self._first_at = 0.0
+        self._seen = LRUTTLCache(max_entries=self.max_jobs * 4, ttl_s=dedup_ttl_s)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(
+        self,
+        job_seeker_id: str,
+        results: List[Dict[str, Any]],
+        auth_user_id: Optional[str] = None,
+        default_weights: Optional[Dict[str, float]] = None,
+        method: str = "pinecone",
+        model_version: Optional[str] = None,
+    ) -> str:
+        """Queue one ranking; returns "queued" | "deduped" | "overflow" (written inline) | "empty"."""
+        kept = top_n(results, self.top_n_rows)
+        if not kept:
+            return "empty"
+        key: JobKey = (str(job_seeker_id), fingerprint(kept))
+        job = _Job(str(job_seeker_id), kept, auth_user_id, default_weights, method, model_version)
+        with self._cond:
+            pending = self._pending.get(key)
+            if pending is not None or self._seen.get(key) is not None:
+                if pending is not None and not pending.auth_user_id:
+                    pending.auth_user_id = auth_user_id  # the orchestrator's copy knows the auth user
+                _JOBS.inc(result="deduped")
+                return "deduped"
+            if self._closed or len(self._pending) >= self.max_jobs:
+                overflow = True
+            else:
+                overflow = False
+                if not self._pending:
+                    self._first_at = time.monotonic()
+                self._pending[key] = job
+                self._pending_rows += len(kept)
+                self._seen.set(key, True)
+                self._ensure_worker()
+                self._cond.notify()
+        if overflow:
+            # Backpressure: the caller pays for its own write rather than dropping it
+            _JOBS.inc(result="overflow")
+            self._write([(key, job)])
+            return "overflow"
+        _JOBS.inc(result="queued")
+        return "queued"
+
+    def flush(self) -> int:
+        """Write everything queued so far (in the caller's thread). Returns rows written."""
+        written = 0
+        while True:
+            batch = self._take(force=True)
+            if not batch:
+                break
+            written += self._write(batch)
+        with self._write_lock:  # wait out a batch the worker already took
+            pass
+        return written
+
+    def close(self, timeout: float = 10.0) -> int:
+        """Stop accepting work, flush and stop the worker (app shutdown / process exit)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        worker = self._thread
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+        return self.flush()
+
+    # ---- internals ----
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="persist-queue", daemon=True)
+            self._thread.start()
+
+    def _take(self, force: bool) -> List[Tuple[JobKey, _Job]]:
+        """Pop up to batch_rows rows' worth of jobs (at least one) when due."""
+        with self._cond:
+            if not self._pending:
+                return []
+            due = (
+                force or self._closed
+                or self._pending_rows >= self.batch_rows
+                or time.monotonic() - self._first_at >= self.flush_interval_s
+            )
+            if not due:
+                return []
+            batch: List[Tuple[JobKey, _Job]] = []
+            rows = 0
+            while self._pending and (not batch or rows + len(next(iter(self._pending.values())).results) <= self.batch_rows):
+                key, job = self._pending.popitem(last=False)
+                batch.append((key, job))
+                rows += len(job.results)
+            self._pending_rows -= rows
+            self._first_at = time.monotonic()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed and not self._pending:
+                    return
+                if self._pending_rows < self.batch_rows and not self._closed:
+                    wait = self.flush_interval_s - (time.monotonic() - self._first_at) if self._pending else None
+                    if wait is None or wait > 0:
+                        self._cond.wait(wait)
+            batch = self._take(force=False)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Tuple[JobKey, _Job]]) -> int:
+        with self._write_lock, metrics.timed("persist_queue", "flush"):
+            built: List[Tuple[JobKey, List[Dict[str, Any]]]] = []
+            for key, job in batch:
+                try:
+                    built.append((key, self.build_rows(job)))
+                except Exception as e:
+                    self._failed(key, len(job.results), e)
+            rows = [r for _, job_rows in built for r in job_rows]
+            if not rows:
+                return 0
+            try:
+                self.insert_rows(rows)
+                _ROWS.inc(len(rows), result="written")
+                return len(rows)
+            except Exception as e:
+                _ERRORS.inc()
+                if len(built) == 1:
+                    self._failed(built[0][0], len(rows), e)
+                    return 0
+                print(f"[WARN] persist queue batch of {len(rows)} rows failed, retrying per ranking: {e}")
+            written = 0
+            for key, job_rows in built:
+                try:
+                    self.insert_rows(job_rows)
+                    _ROWS.inc(len(job_rows), result="written")
+                    written += len(job_rows)
+                except Exception as e:
+                    _ERRORS.inc()
+                    self._failed(key, len(job_rows), e)
+            return written
+
+    def _failed(self, key: JobKey, n_rows: int, err: Exception) -> None:
+        _ROWS.inc(n_rows, result="failed")
+        self._seen.pop(key)  # not persisted, so the same ranking may be queued again
+        print(f"[WARN] persist queue dropped {n_rows} rows for seeker {key[0]}: {err}")
+
+# ============================== MODULE API ==========================
+
+_QUEUE: Optional[WriteBehindQueue] = None
+_QUEUE_LOCK = threading.Lock()
+
+def get_queue() -> WriteBehindQueue:
+    global _QUEUE
+    if _QUEUE is None:
+        with _QUEUE_LOCK:
+            if _QUEUE is None:
+                _QUEUE = WriteBehindQueue()
+                atexit.register(_QUEUE.close)
+    return _QUEUE
+
+def enqueue_matcher_results(
+    *,
+    auth_user_id: Optional[str],
+    job_seeker_id: str,
+    matcher_results: List[Dict[str, Any]],
+    default_weights: Optional[Dict[str, float]] = None,
+    method: str = "pinecone",
+    model_version: Optional[str] = None,
+) -> str:
+    """
+    Write-behind persist_matcher_results: returns without waiting on the insert.
+    With PERSIST_QUEUE_ENABLE=0 the rows are written inline ("inline").
+    """
+    if not PERSIST_QUEUE_ENABLE:
+        from .data_storer import persist_matcher_results
+        persist_matcher_results(
+            auth_user_id=auth_user_id,
+            job_seeker_id=job_seeker_id,
+            matcher_results=top_n(matcher_results),
+            default_weights=default_weights,
+            method=method,
+            model_version=model_version,
+        )
+        _JOBS.inc(result="inline")
+        return "inline"
+    return get_queue().submit(
+        job_seeker_id,
+        matcher_results,
+        auth_user_id=auth_user_id,
+        default_weights=default_weights,
+        method=method,
+        model_version=model_version,
+    )
+
+def flush() -> int:
+    return get_queue().flush() if _QUEUE is not None else 0
+
+def shutdown(timeout: float = 10.0) -> int:
+    """Flush and stop the writer (app shutdown)."""
+    return _QUEUE.close(timeout) if _QUEUE is not None else 0
+
+__all__ = [
+    "PERSIST_QUEUE_ENABLE", "PERSIST_TOP_N",
+    "WriteBehindQueue", "fingerprint", "top_n",
+    "get_queue", "enqueue_matcher_results", "flush", "shutdown",
+]
@@ -0,0 +1,169 @@
+# apps/backend/services/post_filters.py
+from __future__ import annotations
+
+import re
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# ============================== CONFIG ==============================
+# Filterable job-post metadata, written by the embed worker onto every post vector and matched by
+# the matcher's Pinecone `filter` (and by the local vector index, which reads the same syntax):
+#   location_terms  place tokens of the comma-separated location parts ("makati", "manila")
+#   seniority       one of SENIORITY_LEVELS (explicit column, else title keywords / years required)
+#   posted_epoch    posting time (unix seconds; Pinecone range filters need numbers)
+# job_post has no status/closed column, so there is no "active" field to filter on.
+# Vectors embedded before these fields existed don't carry them and are excluded by a filter on
+# that field; after deploying, backfill them once:
+#   python -m apps.backend.services.embed_worker --backfill-metadata
+SENIORITY_LEVELS = ("intern", "junior", "mid", "senior", "lead", "executive")
+
+# Checked in order: the first level whose keywords appear in the title wins
+_TITLE_KEYWORDS = (
+    ("executive", r"\b(chief|c[etfo]o|vp|vice president|director)\b"),
+    ("lead",      r"\b(lead|principal|head)\b"),
+    ("senior",    r"\b(senior|sr)\b"),
+    ("intern",    r"\b(intern|internship|ojt|trainee)\b"),
+    ("junior",    r"\b(junior|jr|entry[- ]level|graduate|fresh grad)\b"),
+    ("mid",       r"\b(mid|intermediate)\b"),
+)
+# Locations match by place name: both sides drop City/Province/Metro qualifiers, so "Makati"
+# finds "Makati City" and "Manila" finds "Metro Manila"
+_LOCATION_ALIASES = {
+    "ncr": "manila",
+    "national capital region": "manila",
+    "mm": "manila",
+    "qc": "quezon city",
+    "work from home": "remote",
+    "wfh": "remote",
+}
+_LOCATION_KEEP = {"quezon city"}  # not the same place as Quezon province
+_LOCATION_PREFIX = re.compile(r"^(?:(?:city|province|municipality) of |metro )")
+_LOCATION_SUFFIX = re.compile(r" (?:city|province|municipality)$")
+
+_YEARS_RE = re.compile(r"(\d+)\s*\+?\s*(?:-\s*\d+\s*)?(?:years?|yrs?)", re.I)
+
+Terms = Union[None, str, Iterable[str]]
+
+# ============================== POST SIDE ===========================
+
+def _text(v: Any) -> str:
+    return v if isinstance(v, str) else json.dumps(v or "", ensure_ascii=False)
+
+def _place(part: str) -> str:
+    p = " ".join(part.lower().replace(".", " ").split())
+    p = _LOCATION_ALIASES.get(p, p)
+    if p in _LOCATION_KEEP:
+        return p
+    return _LOCATION_SUFFIX.sub("", _LOCATION_PREFIX.sub("", p)) or p
+
+def location_terms(location: Terms) -> List[str]:
+    """De-duplicated place tokens of the location parts ("Makati City, Metro Manila" -> makati, manila)."""
+    if not location:
+        return []
+    parts = location.split(",") if isinstance(location, str) else [p for x in location for p in str(x).split(",")]
+    return list(dict.fromkeys(_place(p) for p in parts if p.strip()))
+
+def _level_from_text(text: str) -> Optional[str]:
+    t = (text or "").lower()
+    if t in SENIORITY_LEVELS:
+        return t
+    for level, pattern in _TITLE_KEYWORDS:
+        if re.search(pattern, t):
+            return level
+    return None
+
+def _level_from_years(text: str) -> Optional[str]:
+    m = _YEARS_RE.search(text or "")
+    if not m:
+        return None
+    years = int(m.group(1))
+    if years <= 1:
+        return "junior"
+    if years <= 4:
+        return "mid"
+    if years <= 7:
+        return "senior"
+    return "lead"
+
+def derive_seniority(post: Dict[str, Any]) -> str:
+    """Explicit seniority column, else title keywords, else years of experience asked for; "mid" when nothing says."""
+    for key in ("seniority", "job_level", "experience_level"):
+        level = _level_from_text(str(post.get(key) or ""))
+        if level:
+            return level
+    return (
+        _level_from_text(str(post.get("job_title") or post.get("title") or ""))
+        or _level_from_years(_text(post.get("job_experience")))
+        or "mid"
+    )
+
+def _epoch(value: Any) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def post_filter_metadata(post: Dict[str, Any]) -> Dict[str, Any]:
+    """Filterable metadata for a job_post row (fields without a value are left out)."""
+    md: Dict[str, Any] = {"seniority": derive_seniority(post)}
+    terms = location_terms(post.get("job_location") or post.get("location"))
+    if terms:
+        md["location_terms"] = terms
+    posted = _epoch(post.get("posted_at") or post.get("created_at"))
+    if posted is not None:
+        md["posted_epoch"] = posted
+    return md
+
+# ============================== QUERY SIDE ==========================
+
+def normalize_filters(
+    location: Terms = None,
+    seniority: Terms = None,
+    posted_within_days: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Canonical filter spec for the matcher (sorted, lower-cased; None when nothing is filtered),
+    so equal requests share a ranking-cache key. Unknown seniority values raise ValueError.
+    """
+    spec: Dict[str, Any] = {}
+    locs = location_terms(location)
+    if locs:
+        spec["location"] = sorted(locs)
+    if seniority:
+        levels = [seniority] if isinstance(seniority, str) else list(seniority)
+        levels = sorted({s.strip().lower() for lv in levels for s in str(lv).split(",") if s.strip()})
+        bad = [s for s in levels if s not in SENIORITY_LEVELS]
+        if bad:
+            raise ValueError(f"Unknown seniority {bad}; expected any of {list(SENIORITY_LEVELS)}")
+        if levels:
+            spec["seniority"] = levels
+    if posted_within_days is not None and int(posted_within_days) > 0:
+        spec["posted_within_days"] = int(posted_within_days)
+    return spec or None
+
+def pinecone_filter(scope: str, spec: Optional[Dict[str, Any]] = None, now: Optional[float] = None) -> Dict[str, Any]:
+    """The query `filter` for one scope plus the spec's post constraints."""
+    clauses: List[Dict[str, Any]] = [{"scope": {"$eq": scope}}]
+    spec = spec or {}
+    if spec.get("location"):
+        clauses.append({"location_terms": {"$in": list(spec["location"])}})
+    if spec.get("seniority"):
+        clauses.append({"seniority": {"$in": list(spec["seniority"])}})
+    if spec.get("posted_within_days"):
+        cutoff = (now if now is not None else time.time()) - int(spec["posted_within_days"]) * 86400
+        clauses.append({"posted_epoch": {"$gte": int(cutoff)}})
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+__all__ = [
+    "SENIORITY_LEVELS", "location_terms", "derive_seniority", "post_filter_metadata",
+    "normalize_filters", "pinecone_filter",
+]
@@ -0,0 +1,140 @@
+# apps/backend/services/reranker_service.py
+from __future__ import annotations
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# ============================== CONFIG ==============================
+# Cross-encoder micro-batching: pairs from all in-flight requests are queued and scored
+# together by one worker thread, flushed when RERANK_BATCH_MAX pairs are pending or the
+# oldest request has waited RERANK_BATCH_WAIT_MS. One large predict() uses the CPU far
+# better than many small concurrent ones fighting over the same cores.
+RERANK_MICROBATCH    = os.getenv("RERANK_MICROBATCH", "1") == "1"
+RERANK_BATCH_MAX     = int(os.getenv("RERANK_BATCH_MAX", "256"))
+RERANK_BATCH_WAIT_MS = float(os.getenv("RERANK_BATCH_WAIT_MS", "5"))
+
+Pair = Tuple[str, str]
+
+class MicroBatchReranker:
+    """
+    Coalesces predict() calls from many threads into batched calls of `predict_fn`.
+
+    `predict_fn(pairs) -> sequence of floats` is any cross-encoder-like scorer.
+    `submit(pairs)` returns a Future resolving to that request's scores (same order);
+    `predict(pairs)` blocks for them. A failing batch fails every request in it.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Pair]], Sequence[float]],
+        max_batch: int = RERANK_BATCH_MAX,
+        max_wait_ms: float = RERANK_BATCH_WAIT_MS,
+        name: str = "reranker-batch",
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[List[Pair], Future]]]" = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.pairs_scored = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, pairs: Sequence[Pair]) -> "Future[List[float]]":
+        fut: "Future[List[float]]" = Future()
+        pairs = list(pairs)
+        if not pairs:
+            fut.set_result([])
+            return fut
+        if self._closed:
+            fut.set_exception(RuntimeError("reranker service is closed"))
+            return fut
+        self._queue.put((pairs, fut))
+        return fut
+
+    def predict(self, pairs: Sequence[Pair], timeout: Optional[float] = None) -> List[float]:
+        return self.submit(pairs).result(timeout=timeout)
+
+    def close(self) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+
+    # -------------------------- worker --------------------------
+
+    def _collect(self, first: Tuple[List[Pair], Future]) -> Tuple[List[Tuple[List[Pair], Future]], bool]:
+        """Gather requests after `first` until the batch is full or the wait budget is spent."""
+        batch = [first]
+        n = len(first[0])
+        deadline = time.monotonic() + self.max_wait_s
+        while n < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            n += len(item[0])
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            batch = [(pairs, fut) for pairs, fut in batch if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            flat: List[Pair] = [p for pairs, _ in batch for p in pairs]
+            try:
+                scores = [float(s) for s in self.predict_fn(flat)]
+                if len(scores) != len(flat):
+                    raise RuntimeError(f"reranker returned {len(scores)} scores for {len(flat)} pairs")
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.pairs_scored += len(flat)
+            offset = 0
+            for pairs, fut in batch:
+                fut.set_result(scores[offset:offset + len(pairs)])
+                offset += len(pairs)
+
+        # Fail anything still queued after close()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("reranker service is closed"))
+
+_SERVICE: Optional[MicroBatchReranker] = None
+_SERVICE_LOCK = threading.Lock()
+
+def get_batch_reranker(model: Any) -> MicroBatchReranker:
+    """Process-wide micro-batcher around `model.predict` (created on first use)."""
+    global _SERVICE
+    if _SERVICE is not None:
+        return _SERVICE
+    with _SERVICE_LOCK:
+        if _SERVICE is None:
+            _SERVICE = MicroBatchReranker(model.predict)
+    return _SERVICE
+
+__all__ = [
+    "RERANK_MICROBATCH", "RERANK_BATCH_MAX", "RERANK_BATCH_WAIT_MS",
+    "MicroBatchReranker", "get_batch_reranker",
+]
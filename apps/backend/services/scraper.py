@@ -3,8 +3,11 @@ from __future__ import annotations
 import os
 import re
 import json
-from typing import List, Dict, Any, Optional, Tuple, Set
+import asyncio
+from typing import Callable, List, Dict, Any, Optional, Tuple, Set
 from .data_storer import persist_scraper_roadmap_with_resources
+from . import metrics
+from . import aio
 
 import requests
 import urllib.parse
@@ -261,10 +264,10 @@ def _is_likely_cert_domain(domain: str, title: str) -> bool:
 # -------- SerpAPI helper --------
 SERPAPI_ENDPOINT = "https://serpapi.com/search.json"
 
-def serpapi_search(query: str, serpapi_key: str, num: int = 10) -> Dict[str, Any]:
+def _serpapi_params(query: str, serpapi_key: str, num: int) -> Dict[str, Any]:
     if not serpapi_key:
         raise RuntimeError("SERPAPI_API_KEY not set in environment")
-    params = {
+    return {
         "api_key": serpapi_key,
         "engine": "google",
         "q": query,
@@ -274,11 +277,28 @@ def serpapi_search(query: str, serpapi_key: str, num: int = 10) -> Dict[str, Any
         "location": "Philippines",
         "google_domain": "google.com",
     }
+
+@metrics.timed("scraper", "serpapi")
+def serpapi_search(query: str, serpapi_key: str, num: int = 10) -> Dict[str, Any]:
+    params = _serpapi_params(query, serpapi_key, num)
     resp = requests.get(SERPAPI_ENDPOINT, params=params, timeout=30)
     if resp.status_code != 200:
         raise RuntimeError(f"SerpAPI error {resp.status_code}: {resp.text}")
     return resp.json()
 
+@metrics.timed("scraper", "serpapi")
+async def aserpapi_search(query: str, serpapi_key: str, num: int = 10) -> Dict[str, Any]:
+    """Async serpapi_search on the shared httpx client (I/O executor when httpx is missing)."""
+    client = aio.http_client()
+    if client is None:
+        return await aio.run_io(serpapi_search, query, serpapi_key, num)
+    resp = await client.get(SERPAPI_ENDPOINT, params=_serpapi_params(query, serpapi_key, num))
+    if resp.status_code != 200:
+        raise RuntimeError(f"SerpAPI error {resp.status_code}: {resp.text}")
+    return resp.json()
+
+SearchFn = Callable[..., Dict[str, Any]]
+
 # -------- Scoring for resources/groups (PH-first, free-first) --------
 def _score_domain_for_free_ph(domain: str, title: str) -> float:
     d = (domain or "").lower()
@@ -388,6 +408,7 @@ def _safe_parse_roadmap_json(text: str) -> List[Dict[str, Any]]:
             pass
     return []
 
+@metrics.timed("scraper", "llm_roadmap")
 def _llm_generate_roadmap(
     role: str,
     max_milestones: int,
@@ -428,30 +449,98 @@ def _llm_generate_roadmap(
     else:
         return []
 
+@metrics.timed("scraper", "llm_roadmap")
+async def _allm_generate_roadmap(
+    role: str,
+    max_milestones: int,
+    provider: str,
+    gemini_api_key: str,
+    openai_api_key: str,
+    openai_model: str,
+    gemini_model: str,
+) -> List[Dict[str, Any]]:
+    """Async _llm_generate_roadmap (AsyncOpenAI / Gemini async)."""
+    selected = _select_provider(provider, gemini_api_key, openai_api_key)
+    prompt = _compose_roadmap_prompt(role, max_milestones)
+
+    if selected == "gemini":
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=gemini_api_key)
+            model = genai.GenerativeModel(gemini_model)
+            resp = await model.generate_content_async(prompt)
+            text = (getattr(resp, "text", None) or "").strip()
+            return _safe_parse_roadmap_json(text)[:max_milestones]
+        except Exception as e:
+            print(f"Gemini API Error: {e}")
+            return []
+    elif selected == "openai":
+        try:
+            from openai import AsyncOpenAI
+            client = aio.loop_local(f"openai:{openai_api_key}", lambda: AsyncOpenAI(api_key=openai_api_key))
+            resp = await client.chat.completions.create(
+                model=openai_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+            )
+            text = (resp.choices[0].message.content or "").strip()
+            return _safe_parse_roadmap_json(text)[:max_milestones]
+        except Exception as e:
+            print(f"OpenAI API Error: {e}")
+            return []
+    else:
+        return []
+
 # -------- Page verification (best-effort; never hard-fails) --------
 _VERIFICATION_KEYWORDS = (
     "enroll", "register", "start course", "get started", "take exam",
     "start learning", "begin", "apply now", "earn certificate", "get certified",
 )
+# Failures are swallowed below, so count outcomes explicitly (result = ok|http_error|error)
+_VERIFY_RESULTS = metrics.counter("scraper_verify_results_total", "Page verification outcomes")
 
+def _page_has_enroll_cues(html: str) -> bool:
+    soup = _best_soup(html)
+    text = html.lower()
+    if any(k in text for k in _VERIFICATION_KEYWORDS):
+        return True
+    if soup:
+        for a in soup.find_all(["a", "button"]):
+            t = (a.get_text() or "").strip().lower()
+            if t in _VERIFICATION_KEYWORDS or any(k in t for k in _VERIFICATION_KEYWORDS):
+                return True
+    # If we've already passed issuer + token checks, allow
+    return True
+
+@metrics.timed("scraper", "verify_page")
 def _scrape_and_verify_page(url: str) -> bool:
     """Best-effort verification; never raises. Returns True on weak positive too."""
     try:
         r = requests.get(url, timeout=8)
         if r.status_code != 200:
+            _VERIFY_RESULTS.inc(result="http_error")
             return False
-        soup = _best_soup(r.text)
-        text = r.text.lower()
-        if any(k in text for k in _VERIFICATION_KEYWORDS):
-            return True
-        if soup:
-            for a in soup.find_all(["a", "button"]):
-                t = (a.get_text() or "").strip().lower()
-                if t in _VERIFICATION_KEYWORDS or any(k in t for k in _VERIFICATION_KEYWORDS):
-                    return True
-        # If we've already passed issuer + token checks, allow
+        _VERIFY_RESULTS.inc(result="ok")
+        return _page_has_enroll_cues(r.text)
+    except Exception:
+        _VERIFY_RESULTS.inc(result="error")
         return True
+
+@metrics.timed("scraper", "verify_page")
+async def _ascrape_and_verify_page(url: str) -> bool:
+    """Async _scrape_and_verify_page; never raises."""
+    client = aio.http_client()
+    if client is None:
+        return await aio.run_io(_scrape_and_verify_page, url)
+    try:
+        r = await client.get(url, timeout=8)
+        if r.status_code != 200:
+            _VERIFY_RESULTS.inc(result="http_error")
+            return False
+        _VERIFY_RESULTS.inc(result="ok")
+        return _page_has_enroll_cues(r.text)
     except Exception:
+        _VERIFY_RESULTS.inc(result="error")
         return True
 
 # -------- IMPROVED Cert name → URL resolution --------
@@ -463,14 +552,19 @@ def _build_cert_query_flexible(name: str) -> Tuple[str, str]:
     flexible = f'"{name}" (certification OR certificate OR exam OR credential OR training)'
     return restricted, flexible
 
-def _search_cert_name_flexible(name: str, serpapi_key: str, num: int = 20) -> List[Dict[str, Any]]:
+def _search_cert_name_flexible(
+    name: str,
+    serpapi_key: str,
+    num: int = 20,
+    search: SearchFn = serpapi_search,
+) -> List[Dict[str, Any]]:
     """Search with restricted first, then flexible fallback."""
     restricted_query, flexible_query = _build_cert_query_flexible(name)
     results: List[Dict[str, Any]] = []
 
     try:
         print(f"[cert-search] Restricted query: {restricted_query[:100]}...")
-        data = serpapi_search(restricted_query, serpapi_key=serpapi_key, num=max(10, num // 2))
+        data = search(restricted_query, serpapi_key=serpapi_key, num=max(10, num // 2))
         results = data.get("organic_results", []) or []
         print(f"[cert-search] Restricted results: {len(results)}")
         if len(results) >= 3:
@@ -481,7 +575,7 @@ def _search_cert_name_flexible(name: str, serpapi_key: str, num: int = 20) -> Li
 
     try:
         print(f"[cert-search] Flexible query: {flexible_query[:100]}...")
-        data_flex = serpapi_search(flexible_query, serpapi_key=serpapi_key, num=num)
+        data_flex = search(flexible_query, serpapi_key=serpapi_key, num=num)
         flex_results = data_flex.get("organic_results", []) or []
         results.extend(flex_results)
         print(f"[cert-search] Flexible results: {len(flex_results)}")
@@ -513,6 +607,8 @@ def _resolve_one_cert_improved(
     used_urls: Set[str],
     used_cert_names: Set[str],
     serpapi_key: str,
+    search: SearchFn = serpapi_search,
+    verify: Callable[[str], Any] = _scrape_and_verify_page,
 ) -> Dict[str, Optional[str]]:
     """Improved certificate resolution with relaxed filtering + issuer hints."""
     name_key = " ".join(_tokens(name))
@@ -520,7 +616,7 @@ def _resolve_one_cert_improved(
         print(f'[cert-resolve] SKIP duplicate cert name: "{name}"')
         return {"title": name, "url": None, "source": "duplicate-cert-name"}
 
-    candidates = _search_cert_name_flexible(name, serpapi_key=serpapi_key, num=30)
+    candidates = _search_cert_name_flexible(name, serpapi_key=serpapi_key, num=_CERT_SEARCH_NUM, search=search)
     print(f'[cert-resolve] Found {len(candidates)} candidates for "{name}"')
 
     chosen: Optional[Tuple[float, Dict[str, Optional[str]], str]] = None
@@ -583,7 +679,7 @@ def _resolve_one_cert_improved(
         debug_filters["considered"] += 1
 
         # Optional: soft verification for enroll/exam cues (non-blocking)
-        _ = _scrape_and_verify_page(link)
+        _ = verify(link)
 
         sim = _title_similarity(name, title)
         item = {"title": title, "url": link, "source": dom}
@@ -620,31 +716,49 @@ def resolve_cert_names_to_urls(
     used_cert_names: Set[str],
     serpapi_key: str,
     k: int = 3,
+    search: SearchFn = serpapi_search,
+    verify: Callable[[str], Any] = _scrape_and_verify_page,
 ) -> List[Dict[str, Optional[str]]]:
     """Resolve up to k cert names into official URLs (dicts for Pydantic/FastAPI)."""
     out: List[Dict[str, Optional[str]]] = []
     for name in names:
         if len(out) >= k:
             break
-        cert = _resolve_one_cert_improved(name, used_urls, used_cert_names, serpapi_key=serpapi_key)
+        cert = _resolve_one_cert_improved(
+            name, used_urls, used_cert_names, serpapi_key=serpapi_key, search=search, verify=verify
+        )
         if cert is not None and cert.get("url"):  # Only add certificates that have a URL
             out.append(cert)
     return out
 
 # -------- Section search using milestone title + provided cert names --------
+_SECTION_SEARCH_NUM = 12
+_CERT_SEARCH_NUM = 30
+
+def _milestone_queries(milestone_title: str) -> Tuple[str, str]:
+    """(resources query, network groups query) for a milestone."""
+    q_resources = (
+        f'{milestone_title} learning resources (articles OR "youtube" OR video OR tutorial OR course) '
+        f'("free" OR open) (Philippines OR site:.ph)'
+    )
+    q_group = (
+        f'{milestone_title} network groups ("Facebook group" OR "FB group" OR "LinkedIn group" OR reddit OR forum OR community OR meetup) '
+        f'(Philippines OR site:.ph)'
+    )
+    return q_resources, q_group
+
 def search_sections_for_milestone(
     milestone_title: str,
     cert_names: List[str],
     used_urls: Set[str],
     used_cert_names: Set[str],
     serpapi_key: str,
+    search: SearchFn = serpapi_search,
+    verify: Callable[[str], Any] = _scrape_and_verify_page,
 ) -> Tuple[List[Dict[str, Optional[str]]], List[Dict[str, Optional[str]]], List[Dict[str, Optional[str]]]]:
     # Resources (exclude issuer domains so we don't "steal" cert pages)
-    q_resources = (
-        f'{milestone_title} learning resources (articles OR "youtube" OR video OR tutorial OR course) '
-        f'("free" OR open) (Philippines OR site:.ph)'
-    )
-    res_data = serpapi_search(q_resources, serpapi_key=serpapi_key, num=12)
+    q_resources, q_group = _milestone_queries(milestone_title)
+    res_data = search(q_resources, serpapi_key=serpapi_key, num=_SECTION_SEARCH_NUM)
     resources = _pick_top_scored(
         res_data.get("organic_results", []),
         used_urls=used_urls,
@@ -659,14 +773,12 @@ def search_sections_for_milestone(
         used_cert_names=used_cert_names,
         serpapi_key=serpapi_key,
         k=3,
+        search=search,
+        verify=verify,
     )
 
     # Network groups (PH-first)
-    q_group = (
-        f'{milestone_title} network groups ("Facebook group" OR "FB group" OR "LinkedIn group" OR reddit OR forum OR community OR meetup) '
-        f'(Philippines OR site:.ph)'
-    )
-    grp_data = serpapi_search(q_group, serpapi_key=serpapi_key, num=12)
+    grp_data = search(q_group, serpapi_key=serpapi_key, num=_SECTION_SEARCH_NUM)
 
     prioritized: List[Tuple[float, Dict[str, Optional[str]], str]] = []
     for item in grp_data.get("organic_results", []) or []:
@@ -699,6 +811,106 @@ def search_sections_for_milestone(
 
     return resources, certs, network_groups
 
+class _PrefetchedSearch:
+    """serpapi_search stand-in serving prefetched results; anything not prefetched is fetched inline."""
+
+    def __init__(self, results: Dict[Tuple[str, int], Dict[str, Any]]) -> None:
+        self.results = results
+
+    def __call__(self, query: str, serpapi_key: str, num: int = 10) -> Dict[str, Any]:
+        hit = self.results.get((query, num))
+        if isinstance(hit, Exception):
+            raise hit
+        return hit if hit is not None else serpapi_search(query, serpapi_key=serpapi_key, num=num)
+
+async def _aprefetch(queries: List[Tuple[str, int]], serpapi_key: str, into: Dict[Tuple[str, int], Any]) -> None:
+    todo = [q for q in dict.fromkeys(queries) if q not in into]
+    results = await asyncio.gather(
+        *(aserpapi_search(q, serpapi_key=serpapi_key, num=n) for q, n in todo), return_exceptions=True
+    )
+    for key, res in zip(todo, results):
+        into[key] = res
+
+async def asearch_sections_for_milestones(
+    milestones: List[Tuple[str, List[str]]],
+    used_urls: Set[str],
+    used_cert_names: Set[str],
+    serpapi_key: str,
+) -> List[Tuple[List[Dict[str, Optional[str]]], List[Dict[str, Optional[str]]], List[Dict[str, Optional[str]]]]]:
+    """
+    search_sections_for_milestone over (title, cert_names) pairs, with the same picks and global
+    URL dedup. SerpAPI queries don't depend on earlier picks, so they are issued concurrently up
+    front (flexible cert queries only where the restricted one came back short, as in the sync
+    path); selection then runs in order and the soft page checks run concurrently at the end.
+    """
+    cert_num = max(10, _CERT_SEARCH_NUM // 2)
+    prefetched: Dict[Tuple[str, int], Any] = {}
+    queries: List[Tuple[str, int]] = []
+    restricted: Dict[str, Tuple[str, int]] = {}
+    for title, cert_names in milestones:
+        queries.extend((q, _SECTION_SEARCH_NUM) for q in _milestone_queries(title))
+        for name in (cert_names or [])[:3]:
+            restricted_q, _ = _build_cert_query_flexible(name)
+            restricted[name] = (restricted_q, cert_num)
+    await _aprefetch(queries + list(restricted.values()), serpapi_key, prefetched)
+    short = [
+        (_build_cert_query_flexible(name)[1], _CERT_SEARCH_NUM)
+        for name, key in restricted.items()
+        if isinstance(prefetched.get(key), Exception) or len((prefetched.get(key) or {}).get("organic_results") or []) < 3
+    ]
+    await _aprefetch(short, serpapi_key, prefetched)
+
+    to_verify: List[str] = []
+
+    def _select() -> List[Tuple[Any, Any, Any]]:
+        search = _PrefetchedSearch(prefetched)
+        return [
+            search_sections_for_milestone(
+                title, cert_names, used_urls, used_cert_names, serpapi_key, search=search, verify=to_verify.append
+            )
+            for title, cert_names in milestones
+        ]
+
+    sections = await aio.run_io(_select)
+    await asyncio.gather(*(_ascrape_and_verify_page(u) for u in dict.fromkeys(to_verify)))
+    return sections
+
+async def agenerate_and_store_roadmap(
+    job_seeker_id: str,
+    role: str,
+    max_milestones: int = 10,
+    provider: str = "auto",
+    gemini_api_key: Optional[str] = os.getenv("GEMINI_API_KEY"),
+    openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY"),
+    openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+    gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
+    serpapi_key: Optional[str] = os.getenv("SERPAPI_API_KEY"),
+) -> str:
+    """Async generate_and_store_roadmap: async LLM + SerpAPI, persistence on the I/O executor."""
+    milestones = await _allm_generate_roadmap(
+        role, max_milestones, provider, gemini_api_key, openai_api_key, openai_model, gemini_model
+    )
+    if not milestones:
+        return ""
+    for ms in milestones:
+        if not ms.get("title"):
+            ms["title"] = ms.get("milestone", "")
+
+    milestone_resources = await asearch_sections_for_milestones(
+        [(ms.get("milestone", ""), ms.get("cert_names", [])) for ms in milestones], set(), set(), serpapi_key
+    )
+    return await aio.run_io(
+        persist_scraper_roadmap_with_resources,
+        job_seeker_id=job_seeker_id,
+        role=role,
+        provider=provider,
+        model=(gemini_model if provider == "gemini" else openai_model),
+        milestones=milestones,
+        prompt_template_or_hashable="default-roadmap-prompt",
+        cert_allowlist_or_hashable=CERT_ALLOWED_DOMAINS,
+        milestone_resources=milestone_resources,
+    )
+
 def generate_and_store_roadmap(
     job_seeker_id: str,
     role: str,
@@ -755,7 +967,10 @@ def generate_and_store_roadmap(
 # -------- Re-export for endpoints --------
 __all__ = [
     "_llm_generate_roadmap",
+    "_allm_generate_roadmap",
     "search_sections_for_milestone",
+    "asearch_sections_for_milestones",
     "generate_and_store_roadmap",
+    "agenerate_and_store_roadmap",
 ]
 
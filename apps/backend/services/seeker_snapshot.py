@@ -0,0 +1,166 @@
+# apps/backend/services/seeker_snapshot.py
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    from . import metrics
+except ImportError:  # imported by embed_worker run as a plain script from services/
+    import metrics  # type: ignore
+
+# ============================== CONFIG ==============================
+# One job_seeker read per request. A snapshot holds the rows read in the current request (by id,
+# and by email for email lookups) plus values derived from them (reranker text, LLM context), so
+# the endpoint, matcher stages, orchestrator and milestone locator share a single select.
+# "*" is the union of what they need: the orchestrator reads optional columns (target_role,
+# auth_user_id) that a fixed projection would make fail on schemas without them.
+SEEKER_SNAPSHOT_COLUMNS = os.getenv("SEEKER_SNAPSHOT_COLUMNS", "*")
+
+_CLIENT_FACTORY: Optional[Callable[[], Any]] = None
+_SB: Any = None
+
+def configure_client(factory: Callable[[], Any]) -> None:
+    """Register the Supabase client factory (the matcher shares its lazily created client)."""
+    global _CLIENT_FACTORY
+    _CLIENT_FACTORY = factory
+
+def _client() -> Any:
+    global _SB
+    if _CLIENT_FACTORY is not None:
+        return _CLIENT_FACTORY()
+    if _SB is None:
+        from supabase import create_client
+        _SB = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    return _SB
+
+def _select_one(column: str, value: str) -> Optional[Dict[str, Any]]:
+    try:
+        resp = (
+            _client().table("job_seeker")
+            .select(SEEKER_SNAPSHOT_COLUMNS)
+            .eq(column, value)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        print(f"[WARN] job_seeker snapshot read ({column}) failed: {e}")
+        return None
+    return (resp.data or [None])[0]
+
+# ============================== SNAPSHOT ============================
+
+class SeekerSnapshot:
+    """
+    Memoized job_seeker rows for one request. Thread-safe, so pool workers handed the snapshot
+    share it; failed reads are not memoized (the next caller retries).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._email_ids: Dict[str, str] = {}
+        self._derived: Dict[Tuple[str, str], Any] = {}
+        self.reads = 0
+
+    def _remember(self, row: Dict[str, Any]) -> None:
+        jsid = str(row.get("job_seeker_id") or "")
+        if not jsid:
+            return
+        self._rows[jsid] = row
+        if row.get("email"):
+            self._email_ids[str(row["email"])] = jsid
+        for key in [k for k in self._derived if k[0] == jsid]:
+            del self._derived[key]
+
+    def row(self, job_seeker_id: str, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """The seeker's row (read once; refresh=True re-reads, e.g. while polling for an embed)."""
+        jsid = str(job_seeker_id)
+        with self._lock:
+            if not refresh and jsid in self._rows:
+                metrics.cache_event("seeker_snapshot", True)
+                return self._rows[jsid]
+            metrics.cache_event("seeker_snapshot", False)
+            self.reads += 1
+            row = _select_one("job_seeker_id", jsid)
+            if row is not None:
+                self._remember(row)
+            return row
+
+    def id_for_email(self, email: str) -> Optional[str]:
+        """Resolve a seeker id by email; the whole row is kept so later stages don't re-read it."""
+        with self._lock:
+            if email in self._email_ids:
+                metrics.cache_event("seeker_snapshot", True)
+                return self._email_ids[email]
+            metrics.cache_event("seeker_snapshot", False)
+            self.reads += 1
+            row = _select_one("email", email)
+            if row is None:
+                return None
+            self._remember(row)
+            self._email_ids[email] = str(row["job_seeker_id"])
+            return self._email_ids[email]
+
+    def derived(self, job_seeker_id: str, key: str, build: Callable[[Dict[str, Any]], Any], default: Any = None) -> Any:
+        """build(row) computed once per row version (reranker text, LLM context, ...)."""
+        jsid = str(job_seeker_id)
+        with self._lock:
+            if (jsid, key) in self._derived:
+                return self._derived[(jsid, key)]
+            row = self.row(jsid)
+            if row is None:
+                return default
+            value = self._derived[(jsid, key)] = build(row)
+            return value
+
+    def forget(self, job_seeker_id: str) -> None:
+        """Drop a row that just changed (the embed worker re-embedded it in this request)."""
+        jsid = str(job_seeker_id)
+        with self._lock:
+            row = self._rows.pop(jsid, None)
+            if row is not None and row.get("email"):
+                self._email_ids.pop(str(row["email"]), None)
+            for key in [k for k in self._derived if k[0] == jsid]:
+                del self._derived[key]
+
+# ============================== SCOPE ===============================
+
+_CURRENT: ContextVar[Optional[SeekerSnapshot]] = ContextVar("seeker_snapshot", default=None)
+
+def current() -> Optional[SeekerSnapshot]:
+    return _CURRENT.get()
+
+def current_or_new() -> SeekerSnapshot:
+    """The request's snapshot, or a fresh one scoped to the caller (e.g. batch jobs, scripts)."""
+    return _CURRENT.get() or SeekerSnapshot()
+
+@contextmanager
+def scope(snapshot: Optional[SeekerSnapshot] = None) -> Iterator[SeekerSnapshot]:
+    """
+    Make a snapshot current for the enclosed (synchronous) work; nested scopes reuse the outer
+    one. Generators that outlive the scope (streaming) should be handed the snapshot instead.
+    """
+    snap = snapshot or _CURRENT.get()
+    if snap is not None and snap is _CURRENT.get():
+        yield snap
+        return
+    snap = snap or SeekerSnapshot()
+    token = _CURRENT.set(snap)
+    try:
+        yield snap
+    finally:
+        _CURRENT.reset(token)
+
+def forget(job_seeker_id: str) -> None:
+    snap = _CURRENT.get()
+    if snap is not None:
+        snap.forget(job_seeker_id)
+
+__all__ = [
+    "SEEKER_SNAPSHOT_COLUMNS", "SeekerSnapshot", "configure_client",
+    "current", "current_or_new", "scope", "forget",
+]
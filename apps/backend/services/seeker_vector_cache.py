@@ -0,0 +1,102 @@
+# apps/backend/services/seeker_vector_cache.py
+from __future__ import annotations
+
+import os
+import base64
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .cache_store import LRUTTLCache, sqlite_store
+except ImportError:  # imported by embed_worker run as a plain script from services/
+    from cache_store import LRUTTLCache, sqlite_store  # type: ignore
+
+# ============================== CONFIG ==============================
+# Seeker section vectors (job_seekers namespace) keyed by job_seeker_id and validated against the
+# seeker's embedding_checksum, so a hit is only served for the embedding currently in Supabase.
+# Values are float32 arrays (~1.5 KB per 384-d scope). Memory LRU per process, plus the
+# CACHE_DB_PATH SQLite file when set, which the embed worker writes through on every upsert.
+SEEKER_VEC_CACHE_ENABLE    = os.getenv("SEEKER_VEC_CACHE_ENABLE", "1") == "1"
+SEEKER_VEC_CACHE_MAX       = int(os.getenv("SEEKER_VEC_CACHE_MAX", "20000"))
+SEEKER_VEC_CACHE_MAX_BYTES = int(os.getenv("SEEKER_VEC_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+
+Entry = Tuple[str, Dict[str, np.ndarray]]  # (embedding_checksum, scope -> float32 vector)
+
+def _entry_bytes(entry: Entry) -> int:
+    return 64 + sum(v.nbytes + 64 for v in entry[1].values())
+
+_MEM = LRUTTLCache(
+    max_entries=SEEKER_VEC_CACHE_MAX,
+    max_bytes=SEEKER_VEC_CACHE_MAX_BYTES,
+    sizeof=_entry_bytes,
+)
+
+# ============================== CODEC ===============================
+
+def _encode(entry: Entry) -> Dict[str, object]:
+    return {
+        "c": entry[0],
+        "v": {s: base64.b64encode(a.astype(np.float32).tobytes()).decode("ascii") for s, a in entry[1].items()},
+    }
+
+def _decode(raw: Dict[str, object]) -> Optional[Entry]:
+    try:
+        vecs = {s: np.frombuffer(base64.b64decode(b), dtype=np.float32) for s, b in dict(raw["v"]).items()}
+        return str(raw["c"]), vecs
+    except Exception:
+        return None
+
+# ============================== API =================================
+
+def get(job_seeker_id: str, checksum: Optional[str], scopes: Iterable[str]) -> Optional[Dict[str, List[float]]]:
+    """Vectors for every requested scope, or None (disabled, unknown checksum, stale, or partial)."""
+    if not (SEEKER_VEC_CACHE_ENABLE and checksum):
+        return None
+    entry = _MEM.get(job_seeker_id)
+    if entry is None or entry[0] != checksum:
+        store = sqlite_store("seeker_vectors")
+        if store is not None:
+            try:
+                raw = store.get(job_seeker_id)
+            except Exception as e:
+                print(f"[WARN] seeker vector cache read failed: {e}")
+                raw = None
+            fresh = _decode(raw) if raw else None
+            if fresh is not None and fresh[0] == checksum:
+                entry = fresh
+                _MEM.set(job_seeker_id, entry)
+    if entry is None or entry[0] != checksum:
+        return None
+    scopes = tuple(scopes)
+    if not all(s in entry[1] for s in scopes):
+        return None
+    return {s: entry[1][s].tolist() for s in scopes}
+
+def put(job_seeker_id: str, checksum: Optional[str], vecs: Dict[str, List[float]], persist: bool = True) -> None:
+    """Store vectors under checksum; scopes merge into an entry with the same checksum."""
+    if not (SEEKER_VEC_CACHE_ENABLE and checksum and vecs):
+        return
+    arrays = {s: np.asarray(v, dtype=np.float32) for s, v in vecs.items()}
+    prev = _MEM.get(job_seeker_id)
+    if prev is not None and prev[0] == checksum:
+        arrays = {**prev[1], **arrays}
+    entry: Entry = (checksum, arrays)
+    _MEM.set(job_seeker_id, entry)
+    store = sqlite_store("seeker_vectors") if persist else None
+    if store is not None:
+        try:
+            store.set(job_seeker_id, _encode(entry))
+        except Exception as e:
+            print(f"[WARN] seeker vector cache write failed: {e}")
+
+def invalidate(job_seeker_id: str) -> None:
+    _MEM.pop(job_seeker_id)
+    store = sqlite_store("seeker_vectors")
+    if store is not None:
+        try:
+            store.delete(job_seeker_id)
+        except Exception as e:
+            print(f"[WARN] seeker vector cache delete failed: {e}")
+
+__all__ = ["SEEKER_VEC_CACHE_ENABLE", "get", "put", "invalidate"]
@@ -0,0 +1,462 @@
+# apps/backend/services/vector_index.py
+from __future__ import annotations
+
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Optional ANN graph (requirements-optional.txt); brute-force BLAS matmul is used when hnswlib
+# is missing or disabled.
+try:
+    import hnswlib  # type: ignore
+except Exception:
+    hnswlib = None  # type: ignore
+
+# ============================== CONFIG ==============================
+
+# "pinecone" (default) or "local" — the matcher and embed worker read the same switch
+VECTOR_BACKEND = os.getenv("MATCHER_VECTOR_BACKEND", "pinecone").lower()
+
+# Optional on-disk snapshot shared between the embed worker (writer) and API processes (readers)
+LOCAL_INDEX_PATH      = os.getenv("LOCAL_INDEX_PATH", "")
+LOCAL_INDEX_REFRESH_S = float(os.getenv("LOCAL_INDEX_REFRESH_S", "5"))
+
+# HNSW tuning (only when LOCAL_INDEX_HNSW=1 and hnswlib is installed)
+LOCAL_INDEX_HNSW      = os.getenv("LOCAL_INDEX_HNSW", "0") == "1"
+HNSW_M                = int(os.getenv("LOCAL_INDEX_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION  = int(os.getenv("LOCAL_INDEX_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH        = int(os.getenv("LOCAL_INDEX_HNSW_EF", "128"))
+HNSW_MIN_SELECTIVITY  = 0.10  # below this filtered fraction, brute force beats a filtered graph walk
+
+_INITIAL_CAPACITY = 1024
+
+def enabled() -> bool:
+    return VECTOR_BACKEND == "local"
+
+# ========================= METADATA FILTERS ========================
+
+def _match_op(value: Any, op: str, arg: Any) -> bool:
+    if isinstance(value, (list, tuple)):
+        # List-valued metadata (Pinecone semantics): $in/$eq match when any element matches
+        if op in ("$in", "$eq"):
+            wanted = (arg or []) if op == "$in" else [arg]
+            return any(v in wanted for v in value)
+        if op in ("$nin", "$ne"):
+            return not _match_op(value, "$in" if op == "$nin" else "$eq", arg)
+    if op == "$eq":
+        return value == arg
+    if op == "$ne":
+        return value != arg
+    if op == "$in":
+        return value in (arg or [])
+    if op == "$nin":
+        return value not in (arg or [])
+    if value is None:
+        return False
+    try:
+        if op == "$gt":
+            return float(value) > float(arg)
+        if op == "$gte":
+            return float(value) >= float(arg)
+        if op == "$lt":
+            return float(value) < float(arg)
+        if op == "$lte":
+            return float(value) <= float(arg)
+    except (TypeError, ValueError):
+        return False
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+def _normalize_filter(flt: Optional[Dict[str, Any]]) -> List[Tuple[str, str, Any]]:
+    """Flatten a Pinecone-style filter ({field: {op: arg}}, {field: value}, {"$and": [...]}) to clauses."""
+    clauses: List[Tuple[str, str, Any]] = []
+    for field, cond in (flt or {}).items():
+        if field == "$and":
+            for sub in cond or []:
+                clauses.extend(_normalize_filter(sub))
+        elif isinstance(cond, dict):
+            for op, arg in cond.items():
+                clauses.append((field, op, arg))
+        else:
+            clauses.append((field, "$eq", cond))
+    return clauses
+
+# =========================== NAMESPACE =============================
+
+class _Namespace:
+    """
+    One namespace: ids, a contiguous float32 matrix of unit-normalised rows and metadata.
+    Rows are never moved; deleted slots are marked dead and reused, so row numbers double
+    as HNSW labels.
+    """
+
+    def __init__(self, dim: int, use_hnsw: bool):
+        self.dim = dim
+        self.mat = np.zeros((_INITIAL_CAPACITY, dim), dtype=np.float32)
+        self.alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self.ids: List[Optional[str]] = []
+        self.meta: List[Dict[str, Any]] = []
+        self.pos: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.hnsw = None
+        self._cols: Dict[str, np.ndarray] = {}
+        if use_hnsw and hnswlib is not None:
+            self.hnsw = hnswlib.Index(space="ip", dim=dim)
+            self.hnsw.init_index(max_elements=_INITIAL_CAPACITY, M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION)
+            self.hnsw.set_ef(HNSW_EF_SEARCH)
+
+    @property
+    def size(self) -> int:
+        return len(self.pos)
+
+    def _grow(self, need: int) -> None:
+        cap = self.mat.shape[0]
+        if need <= cap:
+            return
+        new_cap = max(need, cap * 2)
+        mat = np.zeros((new_cap, self.dim), dtype=np.float32)
+        mat[:cap] = self.mat
+        alive = np.zeros(new_cap, dtype=bool)
+        alive[:cap] = self.alive
+        self.mat, self.alive = mat, alive
+        if self.hnsw is not None:
+            self.hnsw.resize_index(new_cap)
+
+    def upsert(self, items: List[Tuple[str, np.ndarray, Dict[str, Any]]]) -> None:
+        rows: List[int] = []
+        for vid, vec, md in items:
+            row = self.pos.get(vid)
+            if row is None:
+                if self.free:
+                    row = self.free.pop()
+                    if self.hnsw is not None:
+                        self.hnsw.unmark_deleted(row)
+                    self.ids[row] = vid
+                    self.meta[row] = md
+                else:
+                    row = len(self.ids)
+                    self._grow(row + 1)
+                    self.ids.append(vid)
+                    self.meta.append(md)
+                self.pos[vid] = row
+            else:
+                self.meta[row] = md
+            self.mat[row] = vec
+            self.alive[row] = True
+            rows.append(row)
+        if self.hnsw is not None and rows:
+            self.hnsw.add_items(self.mat[rows], np.asarray(rows))
+        self._cols.clear()
+
+    def delete(self, ids: Iterable[str]) -> None:
+        for vid in ids:
+            row = self.pos.pop(vid, None)
+            if row is None:
+                continue
+            self.alive[row] = False
+            self.ids[row] = None
+            self.meta[row] = {}
+            self.free.append(row)
+            if self.hnsw is not None:
+                self.hnsw.mark_deleted(row)
+        self._cols.clear()
+
+    def _column(self, field: str) -> np.ndarray:
+        col = self._cols.get(field)
+        if col is None:
+            col = np.empty(len(self.meta), dtype=object)
+            col[:] = [md.get(field) for md in self.meta]
+            self._cols[field] = col
+        return col
+
+    def _has_lists(self, field: str) -> bool:
+        key = f"{field}\0lists"  # cached alongside the column (cleared with it)
+        if key not in self._cols:
+            self._cols[key] = np.asarray(any(isinstance(v, (list, tuple)) for v in self._column(field)))
+        return bool(self._cols[key])
+
+    def update_metadata(self, vid: str, md: Dict[str, Any]) -> bool:
+        row = self.pos.get(vid)
+        if row is None:
+            return False
+        self.meta[row] = {**self.meta[row], **md}
+        self._cols.clear()
+        return True
+
+    def mask(self, flt: Optional[Dict[str, Any]]) -> np.ndarray:
+        n = len(self.ids)
+        mask = self.alive[:n].copy()
+        for field, op, arg in _normalize_filter(flt):
+            col = self._column(field)
+            if op == "$eq" and not self._has_lists(field):
+                mask &= (col == arg)
+            elif op == "$in" and not self._has_lists(field):
+                allowed = set(arg or [])
+                mask &= np.fromiter((v in allowed for v in col), dtype=bool, count=n)
+            else:
+                mask &= np.fromiter((_match_op(v, op, arg) for v in col), dtype=bool, count=n)
+        return mask
+
+    def query(self, vec: np.ndarray, top_k: int, flt: Optional[Dict[str, Any]]) -> List[Tuple[int, float]]:
+        n = len(self.ids)
+        if n == 0 or top_k <= 0:
+            return []
+        mask = self.mask(flt)
+        selected = int(mask.sum())
+        if selected == 0:
+            return []
+        k = min(top_k, selected)
+
+        if self.hnsw is not None and selected >= HNSW_MIN_SELECTIVITY * n:
+            labels, dists = self.hnsw.knn_query(vec, k=k, filter=lambda label: bool(mask[label]))
+            # hnswlib "ip" distance is 1 - dot
+            return [(int(l), float(1.0 - d)) for l, d in zip(labels[0], dists[0])]
+
+        scores = self.mat[:n] @ vec
+        scores = np.where(mask, scores, -np.inf)
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top if mask[i]]
+
+# ============================ INDEX ================================
+
+def _unit(values: Any) -> np.ndarray:
+    v = np.asarray(values, dtype=np.float32).reshape(-1)
+    n = float(np.linalg.norm(v))
+    return v / (n + 1e-12)
+
+def _field(obj: Any, key: str) -> Any:
+    return obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+
+class LocalVectorIndex:
+    """
+    In-process stand-in for the Pinecone Index calls we use (query / fetch / upsert / delete).
+    Responses are plain dicts shaped like Pinecone's, so matcher parsing is unchanged.
+    Scores are cosine similarities (rows and queries are unit-normalised).
+    """
+
+    def __init__(self, use_hnsw: bool = LOCAL_INDEX_HNSW):
+        self.use_hnsw = use_hnsw
+        self._ns: Dict[str, _Namespace] = {}
+        self._lock = threading.RLock()
+        self.dirty = False
+
+    # ---- Pinecone-compatible surface ----
+    def upsert(self, vectors: List[Any], namespace: str = "") -> Dict[str, Any]:
+        items: List[Tuple[str, np.ndarray, Dict[str, Any]]] = []
+        for v in vectors or []:
+            vid = _field(v, "id")
+            vals = _field(v, "values")
+            if not vid or vals is None or len(vals) == 0:
+                continue
+            items.append((str(vid), _unit(vals), dict(_field(v, "metadata") or {})))
+        if not items:
+            return {"upserted_count": 0}
+        with self._lock:
+            ns = self._ns.get(namespace)
+            if ns is None:
+                ns = self._ns[namespace] = _Namespace(items[0][1].shape[0], self.use_hnsw)
+            ns.upsert(items)
+            self.dirty = True
+        return {"upserted_count": len(items)}
+
+    def delete(self, ids: Optional[List[str]] = None, namespace: str = "", **_: Any) -> Dict[str, Any]:
+        with self._lock:
+            ns = self._ns.get(namespace)
+            if ns is not None and ids:
+                ns.delete(ids)
+                self.dirty = True
+        return {}
+
+    def update(self, id: str, set_metadata: Optional[Dict[str, Any]] = None, namespace: str = "", **_: Any) -> Dict[str, Any]:
+        """Merge set_metadata into one vector's metadata (Pinecone Index.update)."""
+        with self._lock:
+            ns = self._ns.get(namespace)
+            if ns is not None and set_metadata and ns.update_metadata(str(id), dict(set_metadata)):
+                self.dirty = True
+        return {}
+
+    def fetch(self, ids: List[str], namespace: str = "", **_: Any) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        with self._lock:
+            ns = self._ns.get(namespace)
+            if ns is not None:
+                for vid in ids or []:
+                    row = ns.pos.get(vid)
+                    if row is not None:
+                        out[vid] = {"id": vid, "values": ns.mat[row].tolist(), "metadata": dict(ns.meta[row])}
+        return {"vectors": out, "namespace": namespace}
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        include_values: bool = False,
+        **_: Any,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            ns = self._ns.get(namespace)
+            if ns is None or not vector:
+                return {"matches": [], "namespace": namespace}
+            hits = ns.query(_unit(vector), int(top_k), filter)
+            matches = []
+            for row, score in hits:
+                m: Dict[str, Any] = {"id": ns.ids[row], "score": score}
+                if include_metadata:
+                    m["metadata"] = dict(ns.meta[row])
+                if include_values:
+                    m["values"] = ns.mat[row].tolist()
+                matches.append(m)
+        return {"matches": matches, "namespace": namespace}
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"namespaces": {k: {"vector_count": ns.size} for k, ns in self._ns.items()}}
+
+    # ---- Bulk helpers ----
+    def namespace_matrix(self, namespace: str, flt: Optional[Dict[str, Any]] = None) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
+        """Copy of (ids, float32 rows, metadata) for live vectors matching flt."""
+        with self._lock:
+            ns = self._ns.get(namespace)
+            if ns is None:
+                return [], np.zeros((0, 0), dtype=np.float32), []
+            rows = np.flatnonzero(ns.mask(flt))
+            return [ns.ids[r] for r in rows], ns.mat[rows].copy(), [dict(ns.meta[r]) for r in rows]
+
+    # ---- Snapshot persistence ----
+    def save(self, path: str) -> None:
+        """Atomic .npz snapshot of every namespace (vectors + ids + metadata)."""
+        arrays: Dict[str, Any] = {}
+        with self._lock:
+            for i, (name, ns) in enumerate(self._ns.items()):
+                rows = np.flatnonzero(ns.alive[:len(ns.ids)])
+                arrays[f"name_{i}"] = np.asarray(name)
+                arrays[f"mat_{i}"] = ns.mat[rows]
+                arrays[f"ids_{i}"] = np.asarray(json.dumps([ns.ids[r] for r in rows]))
+                arrays[f"meta_{i}"] = np.asarray(json.dumps([ns.meta[r] for r in rows], ensure_ascii=False, default=str))
+            self.dirty = False
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, use_hnsw: bool = LOCAL_INDEX_HNSW) -> "LocalVectorIndex":
+        idx = cls(use_hnsw=use_hnsw)
+        with np.load(path, allow_pickle=False) as data:
+            i = 0
+            while f"name_{i}" in data:
+                name = str(data[f"name_{i}"])
+                mat = data[f"mat_{i}"]
+                ids = json.loads(str(data[f"ids_{i}"]))
+                meta = json.loads(str(data[f"meta_{i}"]))
+                idx.upsert(
+                    [{"id": vid, "values": mat[j], "metadata": meta[j]} for j, vid in enumerate(ids)],
+                    namespace=name,
+                )
+                i += 1
+        idx.dirty = False
+        return idx
+
+def load_from_pinecone(pc_index: Any, namespaces: Iterable[str], batch: int = 100) -> LocalVectorIndex:
+    """Warm a local index by listing + fetching every vector in the given Pinecone namespaces."""
+    idx = LocalVectorIndex()
+    for namespace in namespaces:
+        for page in pc_index.list(namespace=namespace):
+            ids = list(page or [])
+            for i in range(0, len(ids), batch):
+                res = pc_index.fetch(ids=ids[i:i+batch], namespace=namespace)
+                vectors = _field(res, "vectors") or {}
+                items = vectors.values() if isinstance(vectors, dict) else vectors
+                idx.upsert(
+                    [
+                        {"id": _field(v, "id"), "values": _field(v, "values"), "metadata": _field(v, "metadata") or {}}
+                        for v in items
+                    ],
+                    namespace=namespace,
+                )
+    idx.dirty = False
+    print(f"[DIAG] local vector index warmed from Pinecone: {idx.describe_index_stats()}")
+    return idx
+
+# ======================= PROCESS-WIDE INSTANCE ======================
+
+_LOCAL: Optional[LocalVectorIndex] = None
+_LOCAL_MTIME: float = 0.0
+_LOCAL_CHECKED: float = 0.0
+_LOCAL_LOCK = threading.Lock()
+_WARM_SOURCE: Optional[Tuple[Any, Tuple[str, ...]]] = None  # (pinecone index factory, namespaces)
+
+def configure_warm_source(pinecone_factory: Any, namespaces: Iterable[str]) -> None:
+    """Register how to build the local index from Pinecone when no snapshot exists yet."""
+    global _WARM_SOURCE
+    _WARM_SOURCE = (pinecone_factory, tuple(namespaces))
+
+def get_local_index() -> LocalVectorIndex:
+    """
+    Process-wide local index. Loads LOCAL_INDEX_PATH when present, else warms from Pinecone
+    via the configured warm source, else starts empty. Reloads the snapshot when the embed
+    worker has rewritten it (checked at most every LOCAL_INDEX_REFRESH_S seconds).
+    """
+    global _LOCAL, _LOCAL_MTIME, _LOCAL_CHECKED
+    now = time.time()
+    if _LOCAL is not None and (not LOCAL_INDEX_PATH or now - _LOCAL_CHECKED < LOCAL_INDEX_REFRESH_S):
+        return _LOCAL
+
+    with _LOCAL_LOCK:
+        _LOCAL_CHECKED = now
+        mtime = os.path.getmtime(LOCAL_INDEX_PATH) if LOCAL_INDEX_PATH and os.path.exists(LOCAL_INDEX_PATH) else 0.0
+        if _LOCAL is not None and (not mtime or mtime <= _LOCAL_MTIME or _LOCAL.dirty):
+            return _LOCAL
+        if mtime:
+            _LOCAL = LocalVectorIndex.load(LOCAL_INDEX_PATH)
+            _LOCAL_MTIME = mtime
+        elif _LOCAL is None:
+            if _WARM_SOURCE is not None:
+                factory, namespaces = _WARM_SOURCE
+                _LOCAL = load_from_pinecone(factory(), namespaces)
+            else:
+                _LOCAL = LocalVectorIndex()
+    return _LOCAL
+
+def set_local_index(idx: Optional[LocalVectorIndex]) -> None:
+    """Install a prebuilt index (tests / offline runs)."""
+    global _LOCAL, _LOCAL_MTIME
+    _LOCAL = idx
+    _LOCAL_MTIME = time.time()
+
+def mirror_upsert(vectors: List[Dict[str, Any]], namespace: str) -> None:
+    """Embed-worker hook: apply an upsert to the local index (no-op unless the local backend is on)."""
+    if enabled():
+        get_local_index().upsert(vectors, namespace=namespace)
+
+def mirror_delete(ids: List[str], namespace: str) -> None:
+    if enabled():
+        get_local_index().delete(ids=ids, namespace=namespace)
+
+def mirror_update(vid: str, set_metadata: Dict[str, Any], namespace: str) -> None:
+    if enabled():
+        get_local_index().update(id=vid, set_metadata=set_metadata, namespace=namespace)
+
+def save_snapshot_if_dirty() -> bool:
+    """Persist the local index to LOCAL_INDEX_PATH if it changed. Returns True when written."""
+    global _LOCAL_MTIME
+    if not (enabled() and LOCAL_INDEX_PATH and _LOCAL is not None and _LOCAL.dirty):
+        return False
+    try:
+        _LOCAL.save(LOCAL_INDEX_PATH)
+        _LOCAL_MTIME = os.path.getmtime(LOCAL_INDEX_PATH)
+        return True
+    except Exception as e:
+        print(f"[WARN] local index snapshot failed: {e}")
+        return False
+
+__all__ = [
+    "LocalVectorIndex", "VECTOR_BACKEND", "enabled", "configure_warm_source", "get_local_index", "set_local_index",
+    "load_from_pinecone", "mirror_upsert", "mirror_delete", "mirror_update", "save_snapshot_if_dirty",
+]
@@ -0,0 +1,100 @@
+# apps/backend/services/warmup.py
+from __future__ import annotations
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# ============================== CONFIG ==============================
+# Startup prewarm (run by app.py in a background thread; /readyz reports 503 until done).
+#   WARMUP_ENABLE=0       -> skip prewarm, report ready immediately
+#   WARMUP_EMBED_MODEL=0  -> don't load the embed worker's SentenceTransformer in the API
+WARMUP_ENABLE      = os.getenv("WARMUP_ENABLE", "1") == "1"
+WARMUP_EMBED_MODEL = os.getenv("WARMUP_EMBED_MODEL", "1") == "1"
+
+# Steps whose failure keeps the instance not-ready (the rest degrade gracefully in the matcher)
+_REQUIRED = ("supabase", "vector_index")
+
+_LOCK = threading.Lock()
+_STATE: Dict[str, Any] = {"ready": False, "running": False, "started_at": None, "finished_at": None, "steps": {}}
+
+# ============================== STEPS ===============================
+
+def _warm_supabase() -> None:
+    from . import matcher
+    _, sb = matcher._get_clients()
+    sb.table("job_post").select("job_post_id").limit(1).execute()
+
+def _warm_vector_index() -> None:
+    from . import matcher
+    matcher._get_index().describe_index_stats()
+
+def _warm_cross_encoder() -> None:
+    from . import matcher
+    if not matcher.RERANK_ENABLE:
+        return
+    ce = matcher._get_cross_encoder()
+    if ce is None:
+        raise RuntimeError(f"cross-encoder {matcher.RERANK_MODEL} failed to load")
+    # Dummy inference through the real path (micro-batcher thread, session/graph init)
+    matcher._rerank_scores(ce, [("warmup query", "warmup document")])
+
+def _warm_embed_model() -> None:
+    if not WARMUP_EMBED_MODEL:
+        return
+    from . import embed_worker
+    embed_worker.get_model()
+    embed_worker.embed_passage("warmup")
+
+STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("supabase", _warm_supabase),
+    ("vector_index", _warm_vector_index),
+    ("cross_encoder", _warm_cross_encoder),
+    ("embed_model", _warm_embed_model),
+]
+
+# ============================== RUNNER ==============================
+
+def run_warmup() -> bool:
+    """Run every step (each best-effort, timed). Returns readiness."""
+    with _LOCK:
+        _STATE.update(running=True, ready=False, started_at=time.time(), finished_at=None, steps={})
+    for name, fn in STEPS:
+        t0 = time.perf_counter()
+        err: Optional[str] = None
+        try:
+            fn()
+        except BaseException as e:  # embed_worker exits via SystemExit on missing env
+            err = f"{type(e).__name__}: {e}"
+            print(f"[WARN] warmup step {name} failed: {err}")
+        ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        with _LOCK:
+            _STATE["steps"][name] = {"ok": err is None, "ms": ms, "error": err}
+        print(f"[INFO] warmup {name}: {'ok' if err is None else 'failed'} in {ms} ms")
+
+    with _LOCK:
+        ready = all(_STATE["steps"].get(k, {}).get("ok") for k in _REQUIRED)
+        _STATE.update(running=False, ready=ready, finished_at=time.time())
+    return ready
+
+def start_background() -> None:
+    """Kick off warmup in a daemon thread (idempotent)."""
+    if not WARMUP_ENABLE:
+        with _LOCK:
+            _STATE.update(ready=True, finished_at=time.time())
+        return
+    with _LOCK:
+        if _STATE["running"] or _STATE["ready"]:
+            return
+        _STATE["running"] = True
+    threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+
+def is_ready() -> bool:
+    return bool(_STATE["ready"])
+
+def status() -> Dict[str, Any]:
+    with _LOCK:
+        return {**_STATE, "steps": {k: dict(v) for k, v in _STATE["steps"].items()}}
+
+__all__ = ["WARMUP_ENABLE", "run_warmup", "start_background", "is_ready", "status"]
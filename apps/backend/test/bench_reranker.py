@@ -0,0 +1,141 @@
+# backend/test/bench_reranker.py
+"""
+Cross-encoder backend benchmark: torch (sentence-transformers) vs ONNX Runtime (fp32 / int8).
+Each backend runs in its own subprocess so peak RSS is measured in isolation.
+
+Reports per backend: load time, pairs/sec, peak RSS; and per ONNX variant the ordering parity
+against torch (Spearman rho over all pairs, mean top-10 overlap per seeker, max |Δscore|).
+
+Usage (from apps/backend/):
+  python test/bench_reranker.py
+  python test/bench_reranker.py --pairs 2000 --batch 64 --backends torch,onnx-int8
+
+Requires: sentence-transformers, onnxruntime, transformers (torch for the one-time export).
+Optional env:
+  RERANK_ONNX_DIR   (where exported models are cached)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import subprocess
+import tempfile
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))  # apps/backend -> `services` importable
+
+MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+GROUP = 50  # pairs per synthetic seeker (≈ RERANK_TOP_K)
+
+_SKILLS = ["python", "sql", "react", "aws", "excel", "welding", "nursing", "autocad", "sales",
+           "customer service", "java", "accounting", "forklift", "photoshop", "kubernetes", "teaching"]
+_TITLES = ["Software Engineer", "Data Analyst", "Registered Nurse", "Welder", "Accountant",
+           "Sales Associate", "Graphic Designer", "Warehouse Operator", "DevOps Engineer", "Teacher"]
+
+
+def synthetic_pairs(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < n:
+        seeker = (f"Skills: {', '.join(rng.sample(_SKILLS, 4))} | "
+                  f"Experience: {rng.randint(0, 12)} years as {rng.choice(_TITLES)} | Education: BS")
+        for _ in range(GROUP):
+            post = (f"{rng.choice(_TITLES)} at Company {rng.randint(1, 999)} | "
+                    f"Required skills: {', '.join(rng.sample(_SKILLS, 3))} | "
+                    f"Experience req: {rng.randint(0, 8)}+ years | " + " ".join(rng.choices(_SKILLS, k=40)))
+            pairs.append((seeker, post))
+    return pairs[:n]
+
+
+def _load(backend: str):
+    if backend == "torch":
+        from sentence_transformers import CrossEncoder
+        return CrossEncoder(MODEL)
+    from services.onnx_reranker import OnnxCrossEncoder
+    return OnnxCrossEncoder(MODEL, quantize=(backend == "onnx-int8"))
+
+
+def run_worker(backend: str, n_pairs: int, batch: int, out_path: str) -> None:
+    pairs = synthetic_pairs(n_pairs)
+    t0 = time.perf_counter()
+    model = _load(backend)
+    load_s = time.perf_counter() - t0
+
+    model.predict(pairs[:batch], batch_size=batch)  # warm-up
+    t0 = time.perf_counter()
+    scores = np.asarray(model.predict(pairs, batch_size=batch), dtype=np.float64)
+    elapsed = time.perf_counter() - t0
+
+    np.save(out_path, scores)
+    print(json.dumps({
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "pairs_per_s": round(len(pairs) / elapsed, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),  # KB on Linux
+    }))
+
+
+def _ranks(x: np.ndarray) -> np.ndarray:
+    r = np.empty(len(x))
+    r[np.argsort(x, kind="stable")] = np.arange(len(x))
+    return r
+
+
+def parity(ref: np.ndarray, other: np.ndarray) -> dict:
+    rho = float(np.corrcoef(_ranks(ref), _ranks(other))[0, 1])
+    overlaps = []
+    for i in range(0, len(ref) - GROUP + 1, GROUP):
+        a = set(np.argsort(-ref[i:i+GROUP])[:10])
+        b = set(np.argsort(-other[i:i+GROUP])[:10])
+        overlaps.append(len(a & b) / 10.0)
+    return {
+        "spearman": round(rho, 4),
+        "top10_overlap": round(float(np.mean(overlaps)) if overlaps else 1.0, 3),
+        "max_abs_diff": round(float(np.max(np.abs(ref - other))), 4),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=1000)
+    ap.add_argument("--batch", type=int, default=32)
+    ap.add_argument("--backends", default="torch,onnx-fp32,onnx-int8")
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    ap.add_argument("--out", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.pairs, args.batch, args.out)
+        return
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    results, scores = [], {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for b in backends:
+            out = os.path.join(tmp, f"{b}.npy")
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", b, "--out", out,
+                 "--pairs", str(args.pairs), "--batch", str(args.batch)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"❌ {b} failed:\n{proc.stderr[-2000:]}")
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            scores[b] = np.load(out)
+
+    print(f"\n{args.pairs} pairs, batch {args.batch}, model {MODEL}\n")
+    print(f"{'backend':<12}{'load s':>8}{'pairs/s':>10}{'peak RSS MB':>13}  parity vs torch")
+    for r in results:
+        p = parity(scores["torch"], scores[r["backend"]]) if ("torch" in scores and r["backend"] != "torch") else None
+        print(f"{r['backend']:<12}{r['load_s']:>8}{r['pairs_per_s']:>10}{r['peak_rss_mb']:>13}  {p or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# backend/test/test_aggregate_parity.py
+"""
+Parity check: the NumPy aggregation path (_aggregate_scores) must produce byte-identical
+rankings to the pure-Python reference loop below (_aggregate_scores_loop).
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_aggregate_parity.py -q
+"""
+
+import os
+import json
+import random
+
+# matcher validates env at import; clients are lazy, so placeholders are enough here
+for _k in ("PINECONE_API_KEY", "PINECONE_INDEX", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(_k, "test")
+
+from apps.backend.services import matcher  # noqa: E402
+
+
+def _aggregate_scores_loop(section_results, weights, min_sections=1):
+    """
+    Reference (pure-Python) aggregation: weighted average of the *calibrated* best score
+    per section per job_post. Returns: [{"job_post_id", "confidence", "section_scores"}], sorted desc.
+    """
+    per_post = {}  # pid -> {scope: best_calibrated_score_0..100}
+    for scope, matches in section_results.items():
+        for m in matches or []:
+            mid = m.get("id", "")
+            if ":" not in mid:
+                continue
+            pid, _ = mid.split(":", 1)
+            cal = matcher._calibrate_cosine_to_100(float(m.get("score", 0.0)))
+            bucket = per_post.setdefault(pid, {})
+            bucket[scope] = max(bucket.get(scope, 0.0), cal)
+
+    ranked = []
+    min_sections = max(1, int(min_sections))
+    for pid, section_best in per_post.items():
+        if len(section_best) < min_sections:
+            continue
+        weight_sum = sum(float(weights.get(s, 0.0)) for s in matcher.VALID_SCOPES)
+        if weight_sum <= 0:
+            continue
+        weighted = 0.0
+        for scope in matcher.VALID_SCOPES:
+            weighted += float(weights.get(scope, 0.0)) * float(section_best.get(scope, 0.0))
+        ranked.append({
+            "job_post_id": pid,
+            "confidence": round(weighted / weight_sum, 2),
+            "section_scores": {k: round(v, 2) for k, v in section_best.items()},
+        })
+    ranked.sort(key=lambda d: d["confidence"], reverse=True)
+    return ranked
+
+
+def _section_results(rng: random.Random, n_posts: int, top_k: int, scopes):
+    out = {}
+    for scope in scopes:
+        matches = []
+        for _ in range(top_k):
+            pid = f"post-{rng.randrange(n_posts)}"
+            score = rng.choice([rng.random(), rng.uniform(0.6, 0.85), round(rng.random(), 3), 0.0, 1.0, 1.2, -0.1])
+            matches.append({"id": f"{pid}:{scope}", "score": score, "metadata": {}})
+        if rng.random() < 0.2:
+            matches.append({"id": "malformed-id", "score": 0.9})
+        out[scope] = matches
+    return out
+
+
+def _dump(rows):
+    return json.dumps(rows, ensure_ascii=False)
+
+
+def test_vectorized_aggregation_matches_reference():
+    rng = random.Random(1234)
+    weight_sets = [
+        None,
+        {"skills": 0.5, "experience": 0.5, "education": 0.0, "licenses": 0.0},
+        {"skills": 1.0, "experience": 0.3333, "education": 0.1, "licenses": 0.07},
+    ]
+    for trial in range(300):
+        scopes = list(matcher.VALID_SCOPES)
+        rng.shuffle(scopes)
+        scopes = scopes[: rng.randint(1, 4)]
+        if trial % 7 == 0:
+            scopes.append("full")  # non-weighted scope still counts toward min_sections
+        results = _section_results(rng, n_posts=rng.randint(1, 300), top_k=rng.randint(1, 200), scopes=scopes)
+        weights = matcher._effective_weights(weight_sets[trial % len(weight_sets)])
+        min_sections = rng.randint(1, 4)
+
+        expected = _aggregate_scores_loop(results, weights, min_sections=min_sections)
+        actual = matcher._aggregate_scores(results, weights, min_sections=min_sections)
+        assert _dump(actual) == _dump(expected)
+
+
+def test_calibration_array_matches_scalar_on_dense_grid():
+    grid = [i / 100000.0 for i in range(100001)]
+    expected = [matcher._calibrate_cosine_to_100(x) for x in grid]
+    assert matcher._calibrate_cosine_array(grid).tolist() == expected
+
+
+def test_empty_and_zero_weight_inputs():
+    assert matcher._aggregate_scores({}, matcher.DEFAULT_WEIGHTS) == []
+    zero = {k: 0.0 for k in matcher.VALID_SCOPES}
+    results = {"skills": [{"id": "p:skills", "score": 0.8}]}
+    assert matcher._aggregate_scores(results, zero) == _aggregate_scores_loop(results, zero) == []
@@ -0,0 +1,70 @@
+# backend/test/test_async_pipeline.py
+"""
+Async request path: the async matcher drives the same stage generator as the sync one,
+running offloaded steps on the aio executors (errors are thrown back into the pipeline), and
+request-scoped state (seeker snapshot) is visible inside executor calls.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_async_pipeline.py -q
+"""
+
+import os
+import asyncio
+import threading
+
+# matcher validates env at import; clients are lazy, so placeholders are enough here
+for _k in ("PINECONE_API_KEY", "PINECONE_INDEX", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(_k, "test")
+
+from apps.backend.services import aio, matcher, metrics, seeker_snapshot  # noqa: E402
+
+
+def _fake_stages(job_seeker_id, top_k, details, min_sections, weights, budget_ms, report, snap, defer, filters=None, copy_stages=True):
+    ranked = yield from matcher._offload(defer, "io", lambda: [{"job_post_id": "a"}, {"job_post_id": "b"}])
+    yield "vector", ranked
+    threads = yield from matcher._offload(defer, "cpu", lambda: threading.current_thread().name)
+    try:
+        yield from matcher._offload(defer, "io", lambda: 1 / 0)
+    except ZeroDivisionError:
+        report["failed"] = ["llm_judge"]
+    report["cpu_thread"] = threads
+    yield "final", ranked[::-1]
+
+
+def test_async_driver_matches_sync_pipeline(monkeypatch):
+    monkeypatch.setattr(matcher, "_rank_stages", _fake_stages)
+
+    sync_report, async_report = {}, {}
+    sync_stages = list(matcher.iter_rank_posts_for_seeker("s1", stage_report=sync_report))
+
+    async def _collect():
+        return [s async for s in matcher.aiter_rank_posts_for_seeker("s1", stage_report=async_report)]
+
+    async_stages = asyncio.run(_collect())
+
+    assert async_stages == sync_stages
+    assert [s for s, _ in async_stages] == ["vector", "final"]
+    assert async_report["failed"] == sync_report["failed"] == ["llm_judge"]
+    assert async_report["cpu_thread"].startswith("aio-cpu")
+
+
+def test_run_io_sees_request_snapshot():
+    async def _main():
+        with seeker_snapshot.scope() as snap:
+            seen = await aio.run_io(seeker_snapshot.current)
+        return snap, seen
+
+    snap, seen = asyncio.run(_main())
+    assert seen is snap
+
+
+def test_timed_wraps_coroutines():
+    metrics.reset()
+
+    @metrics.timed("test", "async_stage")
+    async def _stage():
+        await asyncio.sleep(0)
+        return 7
+
+    assert asyncio.run(_stage()) == 7
+    assert metrics.STAGE_SECONDS.count(component="test", stage="async_stage") == 1
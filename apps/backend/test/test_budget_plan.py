@@ -0,0 +1,75 @@
+# backend/test/test_budget_plan.py
+"""
+Latency-budget planning: the rerank window and judge top-K shrink (or the stage is skipped)
+to fit the time left, using the observed per-unit latency estimates.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_budget_plan.py -q
+"""
+
+import os
+import time
+
+# matcher validates env at import; clients are lazy, so placeholders are enough here
+for _k in ("PINECONE_API_KEY", "PINECONE_INDEX", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(_k, "test")
+
+import pytest  # noqa: E402
+
+from apps.backend.services import matcher  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _latency(monkeypatch):
+    monkeypatch.setattr(matcher, "_LATENCY_EWMA", {"rerank_pair": 2.0, "judge_job": 100.0})
+    # Fresh estimates, so no re-measuring probe unless a test asks for one
+    monkeypatch.setattr(matcher, "_LATENCY_SEEN", {"rerank_pair": time.monotonic(), "judge_job": time.monotonic()})
+    monkeypatch.setattr(matcher, "RERANK_TOP_K", 50)
+    monkeypatch.setattr(matcher, "LLM_JUDGE_TOP_K", 15)
+    monkeypatch.setattr(matcher, "LLM_JUDGE_SHARD_SIZE", 5)
+    monkeypatch.setattr(matcher, "LLM_JUDGE_MAX_CONCURRENCY", 3)
+    monkeypatch.setattr(matcher, "LLM_ENABLE", True)
+
+
+def _deadline(ms):
+    return time.perf_counter() + ms / 1000.0
+
+
+def test_no_deadline_runs_everything():
+    assert matcher._plan_rerank_k(80, None) == 50
+    assert matcher._plan_judge_k(80, None) == 15
+
+
+def test_judge_shrinks_then_skips():
+    # 15 jobs = one wave of 5-job shards = 500 ms; 3 jobs = 300 ms
+    assert matcher._plan_judge_k(80, _deadline(2000)) == 15
+    assert matcher._plan_judge_k(80, _deadline(420)) == 3
+    assert matcher._plan_judge_k(80, _deadline(200)) == 0
+
+
+def test_rerank_keeps_full_window_when_it_fits_and_shrinks_otherwise():
+    # 50 pairs = 100 ms, plus 300 ms reserved for a minimal judge
+    assert matcher._plan_rerank_k(80, _deadline(1000)) == 50
+    assert 10 <= matcher._plan_rerank_k(80, _deadline(80)) < 50
+    assert matcher._plan_rerank_k(80, _deadline(5)) == 0
+
+
+def test_observed_latency_moves_the_estimate():
+    before = matcher._estimate_judge_ms(15)
+    for _ in range(20):
+        matcher._observe_latency("judge_job", 10.0)
+    assert matcher._estimate_judge_ms(15) < before / 2
+
+
+def test_stale_estimate_lets_one_minimal_judge_through(monkeypatch):
+    monkeypatch.setattr(matcher, "_LATENCY_SEEN", {"judge_job": time.monotonic() - 3600})
+    assert matcher._plan_judge_k(80, _deadline(200)) == 3
+    assert matcher._plan_judge_k(80, _deadline(200)) == 0  # probe already claimed
+
+
+def test_judge_latency_divides_by_the_largest_shard_sent():
+    # 15 jobs in shards of 5 at concurrency 3 -> one wave of 5; 7 jobs -> one wave of 5
+    assert matcher._judge_units([[0] * 5] * 3) == 5
+    assert matcher._judge_units([[0] * 5, [0] * 2]) == 5
+    assert matcher._judge_units([[0] * 5] * 4) == 10
+    assert matcher._judge_units([[0] * 2]) == 2
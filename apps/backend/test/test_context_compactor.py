@@ -0,0 +1,69 @@
+# backend/test/test_context_compactor.py
+"""
+LLM judge context compaction: fields deduped, JSON blobs flattened, long text held to the
+per-job token budget without losing the required-skill evidence.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_context_compactor.py -q
+"""
+
+import json
+
+from apps.backend.services import context_compactor as cc
+
+
+def _job(overview: str) -> dict:
+    return {
+        "job_post_id": "p1",
+        "job_title": "Backend Engineer",
+        "company": "",
+        "job_overview": overview,
+        "job_skills": ["Python", "python", "Django", "AWS"],
+        "experience_req": json.dumps([{"id": 7, "updated_at": "2024-01-01", "years": 3,
+                                       "description": "Requires 3+ years of backend experience."}]),
+        "education_req": "",
+        "licenses_req": "",
+        "location": "",
+        "seniority": "",
+        "education_required": False,
+        "license_required": False,
+    }
+
+
+def _tokens(d: dict) -> int:
+    return cc.count_tokens(json.dumps(d, ensure_ascii=False, separators=(",", ":")))
+
+
+def test_compact_job_dedupes_and_drops_empty_fields():
+    out = cc.compact_job(_job("Build APIs in Python. Requires 3+ years of backend experience."))
+    assert out["job_skills"] == ["Python", "Django", "AWS"]
+    assert "company" not in out and "education_req" not in out
+    assert out["experience_req"] == "years: 3; description: Requires 3+ years of backend experience."
+    # the overview's restatement of the experience requirement is kept only once
+    assert out["job_overview"] == "Build APIs in Python."
+    assert out["education_required"] is False
+
+
+def test_long_overview_is_held_to_budget_and_keeps_skill_sentences():
+    filler = " ".join(f"Perk number {i} is available to all staff." for i in range(200))
+    out = cc.compact_job(_job(f"We build backend services. {filler} You must know Django and AWS well."), budget=200)
+    assert _tokens(out) <= 200 + 8  # JSON punctuation around the allocation
+    assert out["job_overview"].startswith("We build backend services.")
+    assert "You must know Django and AWS well." in out["job_overview"]
+    assert out["job_overview"].endswith("…")
+
+
+def test_compact_seeker_drops_email_and_repeated_search_document_text():
+    seeker = {
+        "full_name": "Ana Cruz",
+        "email": "ana@example.com",
+        "skills": ["SQL", "sql", "Excel"],
+        "experience_text": json.dumps([{"company": "Acme", "description": "Built monthly sales dashboards in Excel."}]),
+        "education_text": '""',
+        "licenses_certifications": [],
+        "search_document": "Built monthly sales dashboards in Excel. Enjoys hiking.",
+    }
+    out = cc.compact_seeker(seeker)
+    assert "email" not in out and "education_text" not in out
+    assert out["skills"] == ["SQL", "Excel"]
+    assert out["search_document"] == "Enjoys hiking."
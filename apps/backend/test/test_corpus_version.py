@@ -0,0 +1,24 @@
+# backend/test/test_corpus_version.py
+"""
+Corpus versions: each corpus name has its own counter, so bumping the seeker corpus leaves
+cached post rankings (keyed on the job_posts version) valid, with or without the SQLite store.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_corpus_version.py -q
+"""
+
+import pytest
+
+from apps.backend.services import cache_store
+
+
+@pytest.mark.parametrize("db", [False, True])
+def test_bump_only_moves_its_own_corpus(tmp_path, monkeypatch, db):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.db") if db else "")
+    monkeypatch.setattr(cache_store, "_corpus_version_mem", {})
+
+    posts = cache_store.corpus_version("job_posts")
+    seekers = cache_store.corpus_version("job_seekers")
+    assert cache_store.bump_corpus_version("job_seekers") == cache_store.corpus_version("job_seekers")
+    assert cache_store.corpus_version("job_seekers") > seekers
+    assert cache_store.corpus_version("job_posts") == posts
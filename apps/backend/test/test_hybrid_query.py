@@ -0,0 +1,41 @@
+# backend/test/test_hybrid_query.py
+"""
+Hybrid retrieval config: per-scope alpha parsing and convex dense/sparse weighting.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_hybrid_query.py -q
+"""
+
+import os
+
+# matcher validates env at import; clients are lazy, so placeholders are enough here
+for _k in ("PINECONE_API_KEY", "PINECONE_INDEX", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(_k, "test")
+
+from apps.backend.services import bm25_store, matcher  # noqa: E402
+
+
+def test_scope_alphas_parse_with_default_and_clamp():
+    assert matcher._parse_scope_alphas("0.8") == {"default": 0.8}
+    assert matcher._parse_scope_alphas("skills=0.6, licenses=1.5,default=0.9,bogus=x") == {
+        "default": 0.9, "skills": 0.6, "licenses": 1.0,
+    }
+    assert matcher._parse_scope_alphas("") == {"default": 1.0}
+
+
+def test_hybrid_scale_is_convex():
+    dense, sparse = bm25_store.hybrid_scale([0.5, -0.5], {"indices": [3, 9], "values": [1.0, 2.0]}, 0.75)
+    assert dense == [0.375, -0.375]
+    assert sparse == {"indices": [3, 9], "values": [0.25, 0.5]}
+    dense, sparse = bm25_store.hybrid_scale([1.0], {"indices": [1], "values": [1.0]}, 1.0)
+    assert dense == [1.0] and sparse["values"] == [0.0]
+
+
+def test_hybrid_matches_are_rescored_by_dense_cosine():
+    matches = [
+        {"id": "a:skills", "score": 4.2, "values": [0.0, 1.0], "metadata": {"job_post_id": "a"}},
+        {"id": "b:skills", "score": 0.9, "values": [1.0, 0.0], "metadata": {"job_post_id": "b"}},
+    ]
+    out = matcher._rescore_dense(matches, [1.0, 0.0], matcher.POST_NS)
+    assert [m["id"] for m in out] == ["b:skills", "a:skills"]
+    assert [round(m["score"], 6) for m in out] == [1.0, 0.0]
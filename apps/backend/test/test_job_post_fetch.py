@@ -0,0 +1,96 @@
+# backend/test/test_job_post_fetch.py
+"""
+Job-post fetch for the ranking pipeline: the default column projection carries every field the
+reranker text and LLM judge context read, so they see the same post as a full-row fetch; a
+projection the table rejects falls back to full rows.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_job_post_fetch.py -q
+"""
+
+import os
+
+# matcher validates env at import; clients are lazy, so placeholders are enough here
+for _k in ("PINECONE_API_KEY", "PINECONE_INDEX", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(_k, "test")
+
+from apps.backend.services import matcher  # noqa: E402
+
+_ROW = {
+    "job_post_id": "p1",
+    "job_title": "Senior Accountant",
+    "company": "Acme Corp",
+    "job_overview": "Own the monthly close.",
+    "job_skills": ["SAP", "IFRS"],
+    "job_experience": "5 years",
+    "job_education": "BS Accountancy",
+    "job_licenses_certifications": "CPA",
+    "job_location": "Makati City",
+    "seniority": "senior",
+    "updated_at": "2025-10-01T00:00:00+00:00",
+    "embedding_checksum": "c1",
+    "search_document": "not read by the pipeline",
+}
+
+
+class _Query:
+    def __init__(self, db, cols):
+        self.db, self.cols = db, cols
+
+    def in_(self, col, vals):
+        self.ids = set(vals)
+        return self
+
+    def execute(self):
+        self.db.selects.append(self.cols)
+        if self.cols != "*":
+            unknown = [c for c in self.cols.split(",") if c not in self.db.columns]
+            if unknown:
+                raise RuntimeError(f"column job_post.{unknown[0]} does not exist")
+        rows = [r for r in self.db.rows if r["job_post_id"] in self.ids]
+        if self.cols == "*":
+            return type("Resp", (), {"data": [dict(r) for r in rows]})()
+        keep = self.cols.split(",")
+        return type("Resp", (), {"data": [{k: r[k] for k in keep if k in r} for r in rows]})()
+
+
+class _FakeSB:
+    def __init__(self, rows, columns):
+        self.rows, self.columns, self.selects = rows, set(columns), []
+
+    def table(self, name):
+        assert name == "job_post"
+        return type("T", (), {"select": lambda _t, cols: _Query(self, cols)})()
+
+
+def _use(monkeypatch, sb):
+    monkeypatch.setattr(matcher, "_get_clients", lambda: (None, sb))
+    monkeypatch.setattr(matcher, "_POST_COLUMNS_OK", True)
+    monkeypatch.setattr(matcher, "JOB_POST_COLUMNS", ",".join(matcher._POST_READ_FIELDS))
+    matcher._POST_CACHE.clear()
+
+
+def test_projection_feeds_the_same_context_as_full_rows(monkeypatch):
+    sb = _FakeSB([_ROW], matcher._POST_READ_FIELDS + ("search_document",))
+    _use(monkeypatch, sb)
+
+    projected = matcher._fetch_posts_map(["p1"])["p1"]
+    assert "search_document" not in projected and sb.selects == [matcher.JOB_POST_COLUMNS]
+
+    ctx = matcher._build_job_context(projected)
+    assert ctx == matcher._build_job_context(_ROW)
+    assert ctx["company"] and ctx["location"] == "Makati City" and ctx["seniority"] == "senior"
+    assert matcher._get_post_text(projected) == matcher._get_post_text(_ROW)
+
+
+def test_rejected_projection_falls_back_to_full_rows(monkeypatch):
+    sb = _FakeSB([_ROW], [c for c in _ROW if c != "seniority"] + ["job_post_id"])
+    _use(monkeypatch, sb)
+
+    row = matcher._fetch_posts_map(["p1"])["p1"]
+    assert row == _ROW and sb.selects == [matcher.JOB_POST_COLUMNS, "*"]
+    assert matcher._POST_COLUMNS_OK is False
+
+    matcher._POST_CACHE.clear()
+    matcher._fetch_posts_map(["p1"])
+    assert sb.selects[-1] == "*"
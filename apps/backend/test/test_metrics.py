@@ -0,0 +1,68 @@
+# backend/test/test_metrics.py
+"""
+In-process metrics: timed() stages and cache counters render as valid Prometheus text.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_metrics.py -q
+"""
+
+import urllib.request
+
+import pytest
+
+from apps.backend.services import metrics
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_timed_records_histogram_and_errors():
+    with metrics.timed("matcher", "rerank"):
+        pass
+
+    @metrics.timed("scraper", "serpapi")
+    def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        boom()
+
+    text = metrics.render()
+    assert "# TYPE hiway_stage_duration_seconds histogram" in text
+    assert 'hiway_stage_duration_seconds_count{component="matcher",stage="rerank"} 1' in text
+    assert 'hiway_stage_duration_seconds_bucket{component="matcher",stage="rerank",le="+Inf"} 1' in text
+    assert 'hiway_stage_errors_total{component="scraper",stage="serpapi"} 1' in text
+    assert 'hiway_stage_errors_total{component="matcher"' not in text
+
+
+def test_buckets_are_cumulative_and_counters_accumulate():
+    h = metrics.histogram("test_latency_seconds", "test", buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, op="x")
+    metrics.cache_event("ranking", True, 3)
+    metrics.cache_event("ranking", False)
+
+    lines = metrics.render().splitlines()
+    assert 'hiway_test_latency_seconds_bucket{op="x",le="0.1"} 1' in lines
+    assert 'hiway_test_latency_seconds_bucket{op="x",le="1"} 2' in lines
+    assert 'hiway_test_latency_seconds_bucket{op="x",le="+Inf"} 3' in lines
+    assert 'hiway_test_latency_seconds_sum{op="x"} 5.55' in lines
+    assert 'hiway_cache_events_total{cache="ranking",result="hit"} 3' in lines
+    assert 'hiway_cache_events_total{cache="ranking",result="miss"} 1' in lines
+
+
+def test_standalone_http_exposition():
+    metrics.cache_event("job_post", True)
+    server = metrics.start_http_server(0, addr="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'hiway_cache_events_total{cache="job_post",result="hit"} 1' in body
+    finally:
+        server.shutdown()
@@ -0,0 +1,98 @@
+# backend/test/test_persist_queue.py
+"""
+Write-behind match persistence: rankings are deduplicated by (seeker, fingerprint), trimmed to
+the top-N rows, written in batched inserts, and a failed batch is retried per ranking.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_persist_queue.py -q
+"""
+
+import pytest
+
+from apps.backend.services import metrics
+from apps.backend.services.persist_queue import WriteBehindQueue
+
+
+def _ranking(n, offset=0.0):
+    return [{"job_post_id": f"p{i}", "confidence": 90.0 - i + offset} for i in range(n)]
+
+
+def _build_rows(job):
+    return [{"job_seeker_id": job.job_seeker_id, "auth_user_id": job.auth_user_id, **r} for r in job.results]
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_dedup_top_n_and_batched_flush():
+    inserts = []
+    q = WriteBehindQueue(_build_rows, inserts.append, batch_rows=100, flush_interval_s=60, top_n_rows=3)
+
+    assert q.submit("s1", _ranking(5)) == "queued"
+    # The same ranking queued again (with the auth user) is merged, not re-written
+    assert q.submit("s1", _ranking(5), auth_user_id="u1") == "deduped"
+    assert q.submit("s2", _ranking(5, offset=1.0)) == "queued"
+    assert q.submit("s3", []) == "empty"
+
+    assert q.flush() == 6
+    assert len(inserts) == 1  # both seekers in one insert
+    rows = inserts[0]
+    assert [r["job_post_id"] for r in rows if r["job_seeker_id"] == "s1"] == ["p0", "p1", "p2"]
+    assert {r["auth_user_id"] for r in rows if r["job_seeker_id"] == "s1"} == {"u1"}
+
+    # Recently written rankings are not written again
+    assert q.submit("s1", _ranking(5)) == "deduped"
+    assert q.flush() == 0
+    q.close()
+
+
+def test_failed_batch_retries_per_ranking_and_counts_failures():
+    inserts = []
+
+    def insert(rows):
+        if len(rows) > 2 or rows[0]["job_seeker_id"] == "bad":
+            raise RuntimeError("insert failed")
+        inserts.append(rows)
+
+    q = WriteBehindQueue(_build_rows, insert, batch_rows=100, flush_interval_s=60, top_n_rows=2)
+    q.submit("good", _ranking(2))
+    q.submit("bad", _ranking(2))
+
+    assert q.flush() == 2
+    assert [r["job_seeker_id"] for r in inserts[0]] == ["good", "good"]
+    assert 'result="failed"} 2' in metrics.render()
+    # The failed ranking may be queued again
+    assert q.submit("bad", _ranking(2)) == "queued"
+    q.close()
+
+
+def test_bounded_buffer_overflows_to_inline_write():
+    inserts = []
+    q = WriteBehindQueue(_build_rows, inserts.append, max_jobs=1, batch_rows=100, flush_interval_s=60)
+
+    assert q.submit("s1", _ranking(2)) == "queued"
+    assert q.submit("s2", _ranking(2)) == "overflow"
+    assert [r["job_seeker_id"] for r in inserts[0]] == ["s2", "s2"]
+
+    q.close()  # the worker (or close's own flush) writes what is left
+    assert len(inserts) == 2
+
+
+def test_worker_flushes_in_background():
+    import threading
+    done = threading.Event()
+    inserts = []
+
+    def insert(rows):
+        inserts.append(rows)
+        done.set()
+
+    q = WriteBehindQueue(_build_rows, insert, batch_rows=100, flush_interval_s=0.05)
+    q.submit("s1", _ranking(3))
+    assert done.wait(2.0)
+    assert len(inserts[0]) == 3
+    q.close()
@@ -0,0 +1,86 @@
+# backend/test/test_post_filters.py
+"""
+Post metadata pre-filters: the embed worker's derived metadata (location, seniority, posted
+date) and the matcher's filter spec, evaluated by the local vector backend the same way
+Pinecone evaluates the query `filter`.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_post_filters.py -q
+"""
+
+import numpy as np
+import pytest
+
+from apps.backend.services import post_filters
+from apps.backend.services.vector_index import LocalVectorIndex
+
+_NOW = 1_760_000_000  # fixed clock for posted_within_days
+
+
+def _posts():
+    return [
+        {"job_post_id": "a", "job_title": "Senior Accountant", "job_location": "Makati City, Metro Manila",
+         "created_at": "2025-10-01T00:00:00+00:00"},
+        {"job_post_id": "b", "job_title": "Bookkeeper", "job_experience": "At least 1 year", "job_location": "Cebu City",
+         "created_at": "2025-10-05T00:00:00Z"},
+        {"job_post_id": "c", "job_title": "Accounting Intern", "job_location": "Remote",
+         "created_at": "2024-01-01T00:00:00Z"},
+    ]
+
+
+def _index(posts):
+    rng = np.random.default_rng(0)
+    idx = LocalVectorIndex(use_hnsw=False)
+    idx.upsert(
+        vectors=[
+            {"id": f"{p['job_post_id']}:skills", "values": rng.normal(size=8).tolist(),
+             "metadata": {"job_post_id": p["job_post_id"], "scope": "skills", **post_filters.post_filter_metadata(p)}}
+            for p in posts
+        ],
+        namespace="job_posts",
+    )
+    return idx
+
+
+def _ids(idx, spec):
+    res = idx.query(vector=[1.0] * 8, top_k=10, namespace="job_posts",
+                    filter=post_filters.pinecone_filter("skills", spec, now=_NOW))
+    return sorted(m["metadata"]["job_post_id"] for m in res["matches"])
+
+
+def test_metadata_derivation():
+    a, b, c = (post_filters.post_filter_metadata(p) for p in _posts())
+    assert a == {"seniority": "senior", "location_terms": ["makati", "manila"],
+                 "posted_epoch": 1759276800}
+    assert b["seniority"] == "junior"
+    assert c["seniority"] == "intern"
+    assert post_filters.derive_seniority({"job_title": "Accountant"}) == "mid"
+
+
+def test_location_terms_ignore_place_qualifiers():
+    assert post_filters.location_terms("Makati City, Metro Manila") == ["makati", "manila"]
+    assert post_filters.location_terms(["City of Manila", "NCR"]) == ["manila"]
+    assert post_filters.location_terms("Quezon City, Quezon Province") == ["quezon city", "quezon"]
+
+
+def test_filters_are_pushed_into_the_vector_query():
+    idx = _index(_posts())
+
+    assert _ids(idx, None) == ["a", "b", "c"]
+    assert _ids(idx, post_filters.normalize_filters(location="Manila, Cebu")) == ["a", "b"]
+    assert _ids(idx, post_filters.normalize_filters(location="Makati")) == ["a"]
+    assert _ids(idx, post_filters.normalize_filters(seniority="junior,intern", posted_within_days=30)) == ["b"]
+    assert _ids(idx, post_filters.normalize_filters(posted_within_days=30)) == ["a", "b"]
+
+    # Re-levelling a post only updates its metadata; the next filtered query follows it
+    idx.update(id="a:skills", set_metadata={"seniority": "lead"}, namespace="job_posts")
+    assert _ids(idx, post_filters.normalize_filters(seniority="senior")) == []
+
+
+def test_normalize_filters_is_canonical_and_validated():
+    assert post_filters.normalize_filters() is None
+    assert (post_filters.normalize_filters(location="Remote, Makati City", seniority="Mid,junior")
+            == post_filters.normalize_filters(location=["makati", "remote"], seniority=["junior", "mid"]))
+    assert post_filters.pinecone_filter("skills") == {"scope": {"$eq": "skills"}}
+    with pytest.raises(ValueError):
+        post_filters.normalize_filters(seniority="wizard")
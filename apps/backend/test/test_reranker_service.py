@@ -0,0 +1,62 @@
+# backend/test/test_reranker_service.py
+"""
+Micro-batching reranker: concurrent requests are coalesced and each gets its own scores back.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_reranker_service.py -q
+"""
+
+import threading
+
+import pytest
+
+from apps.backend.services.reranker_service import MicroBatchReranker
+
+
+class _LenScorer:
+    """Scores a pair by len(a) + len(b); records batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+
+    def predict(self, pairs):
+        self.gate.wait(timeout=5)
+        self.batches.append(len(pairs))
+        return [float(len(a) + len(b)) for a, b in pairs]
+
+
+def test_concurrent_requests_are_batched_and_split_back():
+    scorer = _LenScorer()
+    svc = MicroBatchReranker(scorer.predict, max_batch=1000, max_wait_ms=200)
+    try:
+        requests = [[("s" * i, "p" * j) for j in range(1, 4)] for i in range(1, 9)]
+        futs = [svc.submit(r) for r in requests]
+        scorer.gate.set()
+        for req, fut in zip(requests, futs):
+            assert fut.result(timeout=5) == [float(len(a) + len(b)) for a, b in req]
+        assert sum(scorer.batches) == 24
+        assert len(scorer.batches) < len(requests)
+    finally:
+        svc.close()
+
+
+def test_flush_on_size_and_error_propagation():
+    scorer = _LenScorer()
+    scorer.gate.set()
+    svc = MicroBatchReranker(scorer.predict, max_batch=2, max_wait_ms=1000)
+    try:
+        assert svc.predict([("a", "b"), ("c", "d")], timeout=1) == [2.0, 2.0]
+        assert svc.predict([], timeout=1) == []
+    finally:
+        svc.close()
+
+    def boom(pairs):
+        raise ValueError("model failed")
+
+    svc = MicroBatchReranker(boom, max_wait_ms=0)
+    try:
+        with pytest.raises(ValueError):
+            svc.predict([("a", "b")], timeout=5)
+    finally:
+        svc.close()
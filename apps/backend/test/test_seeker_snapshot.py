@@ -0,0 +1,73 @@
+# backend/test/test_seeker_snapshot.py
+"""
+Request-scoped seeker snapshot: within one scope the job_seeker row is selected once and the
+derived reranker text / LLM context are built from it; forget() forces a re-read.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_seeker_snapshot.py -q
+"""
+
+import pytest
+
+from apps.backend.services import seeker_snapshot
+
+
+class _Query:
+    def __init__(self, db):
+        self.db, self.col, self.val = db, None, None
+
+    def select(self, cols):
+        return self
+
+    def eq(self, col, val):
+        self.col, self.val = col, val
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        self.db.selects += 1
+        rows = [r for r in self.db.rows if r.get(self.col) == self.val]
+        return type("Resp", (), {"data": [dict(r) for r in rows]})()
+
+
+class _FakeSB:
+    def __init__(self, rows):
+        self.rows, self.selects = rows, 0
+
+    def table(self, name):
+        assert name == "job_seeker"
+        return _Query(self)
+
+
+@pytest.fixture
+def sb(monkeypatch):
+    fake = _FakeSB([{"job_seeker_id": "s1", "email": "a@x.com", "skills": ["SQL"], "embedding_checksum": "c1"}])
+    monkeypatch.setattr(seeker_snapshot, "_CLIENT_FACTORY", lambda: fake)
+    return fake
+
+
+def test_one_select_per_scope_for_email_lookup_row_and_derived_values(sb):
+    with seeker_snapshot.scope() as snap:
+        assert snap.id_for_email("a@x.com") == "s1"
+        with seeker_snapshot.scope() as inner:  # nested scopes share the request's snapshot
+            assert inner is snap
+            assert inner.row("s1")["embedding_checksum"] == "c1"
+        built = []
+        for _ in range(3):
+            snap.derived("s1", "skills", lambda row: built.append(1) or row["skills"])
+    assert sb.selects == 1 and built == [1]
+    assert seeker_snapshot.current() is None
+
+
+def test_forget_and_refresh_reread_and_missing_rows_are_not_memoized(sb):
+    with seeker_snapshot.scope() as snap:
+        snap.row("s1")
+        sb.rows[0]["embedding_checksum"] = "c2"
+        assert snap.row("s1")["embedding_checksum"] == "c1"
+        seeker_snapshot.forget("s1")
+        assert snap.row("s1")["embedding_checksum"] == "c2"
+        assert snap.row("s1", refresh=True)["embedding_checksum"] == "c2"
+        assert snap.row("nope") is None and snap.row("nope") is None
+    assert sb.selects == 5
@@ -0,0 +1,38 @@
+# backend/test/test_seeker_vector_cache.py
+"""
+Seeker vector cache: hits only under the current embedding_checksum and only when every
+requested scope is present; vectors are held as float32 and survive the SQLite round-trip.
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_seeker_vector_cache.py -q
+"""
+
+import numpy as np
+
+from apps.backend.services import cache_store
+from apps.backend.services import seeker_vector_cache as svc
+
+
+def _vecs(*scopes):
+    return {s: [0.25 * i for i in range(8)] for s in scopes}
+
+
+def test_hit_requires_matching_checksum_and_all_scopes():
+    svc.invalidate("s1")
+    svc.put("s1", "c1", _vecs("skills", "experience"))
+    assert svc.get("s1", "c1", ("skills",)) == {"skills": _vecs("skills")["skills"]}
+    assert svc.get("s1", "c2", ("skills",)) is None          # re-embedded since
+    assert svc.get("s1", "c1", ("skills", "full")) is None   # partial -> fetch everything
+    svc.put("s1", "c1", _vecs("full"))                       # same checksum merges scopes
+    assert set(svc.get("s1", "c1", ("skills", "experience", "full"))) == {"skills", "experience", "full"}
+    assert svc._MEM.get("s1")[1]["skills"].dtype == np.float32
+    svc.invalidate("s1")
+    assert svc.get("s1", "c1", ("skills",)) is None
+
+
+def test_sqlite_write_through_is_shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_store, "CACHE_DB_PATH", str(tmp_path / "cache.db"))
+    svc.put("s2", "c9", _vecs("full"))   # e.g. the embed worker process
+    svc._MEM.clear()                     # a fresh API process
+    assert svc.get("s2", "c9", ("full",)) == _vecs("full")
+    svc.invalidate("s2")
@@ -0,0 +1,68 @@
+# backend/test/test_vector_index.py
+"""
+Offline checks for the in-process vector backend (no Pinecone needed).
+
+Usage (from the repo root):
+  python -m pytest apps/backend/test/test_vector_index.py -q
+"""
+
+import numpy as np
+
+from apps.backend.services.vector_index import LocalVectorIndex
+
+
+def _vectors(n: int, dim: int = 8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        for scope in ("skills", "experience"):
+            out.append({
+                "id": f"p{i}:{scope}",
+                "values": rng.normal(size=dim).tolist(),
+                "metadata": {"job_post_id": f"p{i}", "scope": scope},
+            })
+    return out
+
+
+def test_query_matches_brute_force_cosine_with_scope_filter():
+    vecs = _vectors(50)
+    idx = LocalVectorIndex(use_hnsw=False)
+    idx.upsert(vectors=vecs, namespace="job_posts")
+
+    q = np.random.default_rng(1).normal(size=8)
+    res = idx.query(vector=q.tolist(), top_k=5, namespace="job_posts", filter={"scope": {"$eq": "skills"}})
+
+    skills = [v for v in vecs if v["metadata"]["scope"] == "skills"]
+    mat = np.asarray([v["values"] for v in skills])
+    cos = mat @ q / (np.linalg.norm(mat, axis=1) * np.linalg.norm(q))
+    expected = [skills[i]["id"] for i in np.argsort(-cos)[:5]]
+
+    assert [m["id"] for m in res["matches"]] == expected
+    assert all(m["metadata"]["scope"] == "skills" for m in res["matches"])
+    assert np.isclose(res["matches"][0]["score"], cos.max(), atol=1e-5)
+
+
+def test_incremental_upsert_delete_and_fetch():
+    idx = LocalVectorIndex(use_hnsw=False)
+    idx.upsert(vectors=_vectors(3), namespace="job_posts")
+    idx.delete(ids=["p0:skills"], namespace="job_posts")
+    idx.upsert(vectors=[{"id": "p9:skills", "values": [1.0] + [0.0] * 7, "metadata": {"scope": "skills"}}],
+               namespace="job_posts")
+
+    fetched = idx.fetch(ids=["p0:skills", "p9:skills"], namespace="job_posts")["vectors"]
+    assert set(fetched) == {"p9:skills"}
+
+    res = idx.query(vector=[1.0] + [0.0] * 7, top_k=10, namespace="job_posts", filter={"scope": {"$eq": "skills"}})
+    ids = [m["id"] for m in res["matches"]]
+    assert ids[0] == "p9:skills" and "p0:skills" not in ids and len(ids) == 3
+
+
+def test_snapshot_round_trip(tmp_path):
+    idx = LocalVectorIndex(use_hnsw=False)
+    idx.upsert(vectors=_vectors(4), namespace="job_posts")
+    path = str(tmp_path / "index.npz")
+    idx.save(path)
+
+    loaded = LocalVectorIndex.load(path, use_hnsw=False)
+    q = [0.5] * 8
+    assert loaded.query(vector=q, top_k=3, namespace="job_posts") == idx.query(vector=q, top_k=3, namespace="job_posts")